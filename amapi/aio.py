@@ -0,0 +1,269 @@
+"""Asyncio versions of amapi requests."""
+
+import asyncio
+import datetime as dt
+import time
+from typing import Any, Sequence
+
+from sp_api.asyncio.api import Reports
+from sp_api.asyncio.base import Client
+from sp_api.base import (
+    ApiResponse,
+    Marketplaces,
+    SellingApiException,
+    SellingApiRequestThrottledException,
+)
+
+from . import exceptions, metrics
+from .request import (
+    BaseReportPoller,
+    BaseRequest,
+    GenerateReportRequest,
+    GetDocumentIdRequest,
+    GetDocumentRequest,
+    GetDocumentUrlRequest,
+    GetReportRequest,
+    GetReportsRequest,
+    select_recent_report,
+)
+from .session import AmapiSession
+
+
+class AsyncBaseRequest(BaseRequest):
+    """Base class for asyncio amapi requests.
+
+    Subclasses share request arguments and response handling with their
+    synchronous counterparts and make the request with ASYNC_REQUEST_CLASS.
+    """
+
+    ASYNC_REQUEST_CLASS = Client
+
+    def get_async_request(self) -> Client:
+        """Return the session's instance of the asyncio request class."""
+        return self.session.get_async_client(self.ASYNC_REQUEST_CLASS)
+
+    async def call(self, *args: Any, **kwargs: Any) -> Any:
+        """Make the request, retrying as allowed by RETRY_POLICY."""
+        attempt = 1
+        while True:
+            try:
+                return await self.make_request(**kwargs)
+            except SellingApiException as error:
+                if not self.RETRY_POLICY.should_retry(error, attempt):
+                    raise
+                await asyncio.sleep(self.RETRY_POLICY.get_delay(error, attempt))
+                attempt += 1
+
+    async def make_request(self, **kwargs: Any) -> Any:
+        """Make a single attempt at the request."""
+        response = await self.TRANSPORT.async_send(self, self.request_args(**kwargs))
+        with self.time(metrics.RESPONSE):
+            return self.handle_response(response)
+
+    async def async_send(self, args: dict[str, Any]) -> ApiResponse:
+        """Call REQUEST_METHOD of the asyncio request class with args."""
+        with self.time(metrics.CLIENT):
+            request = self.get_async_request()
+        with self.time(metrics.RATE_LIMIT):
+            delay = self.RATE_LIMITER.reserve(self.REQUEST_METHOD, self.rate_limit_key)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        try:
+            with self.time(metrics.REQUEST):
+                response: ApiResponse = await getattr(request, self.REQUEST_METHOD)(
+                    **args
+                )
+        except SellingApiRequestThrottledException:
+            self.RATE_LIMITER.throttled(self.REQUEST_METHOD, self.rate_limit_key)
+            raise
+        self.RATE_LIMITER.update(self.REQUEST_METHOD, self.rate_limit_key, response)
+        return response
+
+
+class AsyncGenerateReportRequest(AsyncBaseRequest, GenerateReportRequest):
+    """Asyncio request class for generating reports."""
+
+    ASYNC_REQUEST_CLASS = Reports
+
+
+class AsyncGetReportRequest(AsyncBaseRequest, GetReportRequest):
+    """Asyncio request class for retrieving the details of a requested report."""
+
+    ASYNC_REQUEST_CLASS = Reports
+
+
+class AsyncGetReportsRequest(AsyncBaseRequest, GetReportsRequest):
+    """Asyncio request class for listing finished reports of a given type."""
+
+    ASYNC_REQUEST_CLASS = Reports
+
+
+class AsyncGetDocumentIdRequest(AsyncBaseRequest, GetDocumentIdRequest):
+    """Asyncio request class for retriveing the ID of a generated report document."""
+
+    ASYNC_REQUEST_CLASS = Reports
+
+
+class AsyncGetDocumentRequest(AsyncBaseRequest, GetDocumentRequest):
+    """Asyncio request class for retrieving the details of a generated document."""
+
+    ASYNC_REQUEST_CLASS = Reports
+
+
+class AsyncGetDocumentUrlRequest(AsyncBaseRequest, GetDocumentUrlRequest):
+    """Asyncio request class for retrieving document URLs."""
+
+    ASYNC_REQUEST_CLASS = Reports
+
+
+class AsyncReportPoller(BaseReportPoller):
+    """Poll the processing status of a report until it finishes without blocking."""
+
+    def __init__(self, session: AmapiSession, **options: Any) -> None:
+        """Set session and polling options."""
+        super().__init__(**options)
+        self.session = session
+
+    async def get_status(self, report_id: str) -> dict[str, Any]:
+        """Return the current details of a report."""
+        return dict(await AsyncGetReportRequest(self.session).call(report_id=report_id))
+
+    async def poll(self, report_id: str) -> dict[str, Any]:
+        """Wait for a report to finish and return its details.
+
+        Raises:
+            amapi.exceptions.ReportProcessingError: If the report is cancelled or
+                fails.
+            amapi.exceptions.ReportTimeoutError: If the report does not finish
+                before the timeout.
+        """
+        with self.INSTRUMENTATION.time(
+            metrics.WAIT, GetReportRequest.REQUEST_METHOD, self.session.marketplace.name
+        ):
+            deadline = time.monotonic() + self.timeout
+            for delay in self.delays():
+                report = await self.get_status(report_id)
+                if self.is_finished(report_id, report):
+                    return report
+                await asyncio.sleep(self.wait_time(report_id, delay, deadline))
+            raise exceptions.ReportTimeoutError(report_id, self.timeout)
+
+
+async def find_recent_report(
+    session: AmapiSession,
+    report_type: str,
+    max_age: dt.timedelta,
+    marketplaces: Sequence[Marketplaces] | None = None,
+    start: dt.datetime | None = None,
+    end: dt.datetime | None = None,
+) -> str | None:
+    """Return the ID of a finished report created within max_age, or None.
+
+    Args:
+        session (amapi.session.AmapiSession): A session instance.
+        report_type (str): The type of report to find.
+        max_age (datetime.timedelta): The maximum age of a report to return.
+        marketplaces (Sequence[sp_api.base.Marketplaces] | None): The marketplaces
+            the report must cover. Defaults to the session's marketplace.
+        start (datetime.datetime | None): The start of the report's data window.
+        end (datetime.datetime | None): The end of the report's data window.
+    """
+    created_since = dt.datetime.now(dt.timezone.utc) - max_age
+    reports = await AsyncGetReportsRequest(session, marketplaces).call(
+        report_type=report_type, created_since=created_since
+    )
+    return select_recent_report(session, reports, marketplaces, start, end)
+
+
+async def request_generate_report(
+    session: AmapiSession,
+    report_type: str,
+    max_age: dt.timedelta | None = None,
+    marketplaces: Sequence[Marketplaces] | None = None,
+    start: dt.datetime | None = None,
+    end: dt.datetime | None = None,
+) -> str:
+    """Request the generation of a report.
+
+    If max_age is given and a report of the same type for the same marketplaces
+    and data window finished within max_age, its ID is returned instead of
+    creating a new report.
+
+    Args:
+        session (amapi.session.AmapiSession): A session instance.
+        report_type (str): The type of report to genererate.
+        max_age (datetime.timedelta | None): The maximum age of an existing report
+            to reuse. Defaults to always creating a new report.
+        marketplaces (Sequence[sp_api.base.Marketplaces] | None): Marketplaces in
+            the session's region to include in one report. Defaults to the
+            session's marketplace.
+        start (datetime.datetime | None): The start of the report's data window.
+            Defaults to GenerateReportRequest.DEFAULT_WINDOW before now.
+        end (datetime.datetime | None): The end of the report's data window.
+            Defaults to now.
+    """
+    if max_age is not None:
+        existing_id = await find_recent_report(
+            session,
+            report_type,
+            max_age=max_age,
+            marketplaces=marketplaces,
+            start=start,
+            end=end,
+        )
+        if existing_id is not None:
+            return existing_id
+    report_id = await AsyncGenerateReportRequest(session, marketplaces).call(
+        report_type=report_type, date=start, end_date=end
+    )
+    return str(report_id)
+
+
+async def request_document_id(session: AmapiSession, report_id: str) -> str:
+    """
+    Request the ID of a generated report document.
+
+    Args:
+        session (amapi.session.AmapiSession): A session instance.
+        report_id (str): The ID of the report request.
+    """
+    document_id = await AsyncGetDocumentIdRequest(session).call(report_id=report_id)
+    return str(document_id)
+
+
+async def wait_for_report(
+    session: AmapiSession, report_id: str, timeout: float | None = None
+) -> str:
+    """
+    Wait for a report to finish processing and return the ID of its document.
+
+    Args:
+        session (amapi.session.AmapiSession): A session instance.
+        report_id (str): The ID of the report request.
+        timeout (float | None): Seconds to wait before giving up. Defaults to
+            AsyncReportPoller.TIMEOUT.
+    """
+    report = await AsyncReportPoller(session, timeout=timeout).poll(report_id)
+    return str(report["reportDocumentId"])
+
+
+async def request_document(session: AmapiSession, document_id: str) -> dict[str, Any]:
+    """Request the details of a generated document.
+
+    args:
+        session (amapi.session.AmapiSession): A session instance.
+        document_id (str): The ID of the generated document.
+    """
+    document = await AsyncGetDocumentRequest(session).call(document_id=document_id)
+    return dict(document)
+
+
+async def request_document_url(session: AmapiSession, document_id: str) -> str:
+    """Request the URL of a generated document.
+
+    args:
+        session (amapi.session.AmapiSession): A session instance.
+        document_id (str): The ID of the generated document.
+    """
+    url = await AsyncGetDocumentUrlRequest(session).call(document_id=document_id)
+    return str(url)
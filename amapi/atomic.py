@@ -0,0 +1,74 @@
+"""Atomic replacement of files."""
+
+import os
+import tempfile
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any
+
+
+class AtomicWriter:
+    """Context manager writing a file that is only replaced once it is complete.
+
+    Data is written to a temporary file in the same directory, which is renamed
+    to path when the block exits, so readers never see a partial file. If the
+    block raises the temporary file is removed and path is left unchanged. For
+    files named after their contents, path may be set within the block, after
+    writing to temp_path.
+    """
+
+    SUFFIX = ".tmp"
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        mode: str = "wb",
+        directory: Path | str | None = None,
+        suffix: str | None = None,
+    ) -> None:
+        """Set the file to replace and where to write the temporary file.
+
+        Args:
+            path (pathlib.Path | str | None): The path of the file to write.
+            mode (str): The mode in which to open the temporary file.
+            directory (pathlib.Path | str | None): The directory of the temporary
+                file. Defaults to the directory of path.
+            suffix (str | None): The suffix of the temporary file.
+        """
+        self.path = None if path is None else Path(path)
+        self.mode = mode
+        if directory is None:
+            if self.path is None:
+                raise ValueError("A path or directory is needed to write a file.")
+            directory = self.path.parent
+        self.directory = Path(directory)
+        self.suffix = self.SUFFIX if suffix is None else suffix
+
+    def __enter__(self) -> IO[Any]:
+        fd, temp_name = tempfile.mkstemp(dir=self.directory, suffix=self.suffix)
+        self.temp_path = Path(temp_name)
+        try:
+            self.file: IO[Any] = os.fdopen(fd, self.mode)
+        except BaseException:
+            os.close(fd)
+            self.temp_path.unlink(missing_ok=True)
+            raise
+        return self.file
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        try:
+            self.file.close()
+            if exc_type is None:
+                if self.path is None:
+                    raise ValueError("No path was set to write the file to.")
+                os.replace(self.temp_path, self.path)
+        except BaseException:
+            self.temp_path.unlink(missing_ok=True)
+            raise
+        if exc_type is not None:
+            self.temp_path.unlink(missing_ok=True)
@@ -0,0 +1,82 @@
+"""Backfilling long ranges of report data in parallel windows."""
+
+import datetime as dt
+import tempfile
+
+from .batch import ReportBatch, ReportSpec
+from .incremental import DataWindow
+from .parser import ReportTable, parse_report, stitch_tables
+from .request import download_document
+from .session import AmapiSession
+
+
+def split_range(start: dt.datetime, end: dt.datetime, count: int) -> list[DataWindow]:
+    """Split the period from start to end into count consecutive windows.
+
+    Args:
+        start (datetime.datetime): The start of the period.
+        end (datetime.datetime): The end of the period.
+        count (int): The number of windows.
+    """
+    if count < 1:
+        raise ValueError(f"Cannot split a range into {count} windows.")
+    if start >= end:
+        raise ValueError(f"Range start {start} is not before its end {end}.")
+    length = (end - start) / count
+    bounds = [start + length * index for index in range(count)] + [end]
+    return [
+        DataWindow(window_start, window_end)
+        for window_start, window_end in zip(bounds, bounds[1:], strict=False)
+    ]
+
+
+def download_table(
+    session_class: type[AmapiSession], report_type: str, document_id: str
+) -> ReportTable:
+    """Download a report document and return it parsed."""
+    with session_class() as session, tempfile.TemporaryFile() as f:
+        download_document(session, document_id=document_id, dest=f)
+        f.seek(0)
+        return parse_report(f, report_type=report_type)
+
+
+def backfill(
+    session_class: type[AmapiSession],
+    report_type: str,
+    start: dt.datetime,
+    end: dt.datetime,
+    windows: int,
+    timeout: float | None = None,
+) -> ReportTable:
+    """Fetch a long range of report data as several reports generated at once.
+
+    The range is split into windows and a report requested for each. All are
+    generated together in one ReportBatch, so the requests share its rate
+    limits and polling loop, and each document is downloaded and parsed as
+    soon as its report is ready. The tables are then joined in the order of
+    their windows, dropping rows repeated at window boundaries.
+
+    Raises the error of the first window that fails.
+
+    Args:
+        session_class (type[amapi.session.AmapiSession]): The session class of
+            the marketplace.
+        report_type (str): The type of report to fetch.
+        start (datetime.datetime): The start of the range.
+        end (datetime.datetime): The end of the range.
+        windows (int): The number of reports to split the range into.
+        timeout (float | None): Seconds to wait for reports before giving up.
+            Defaults to ReportBatch.TIMEOUT.
+    """
+    specs = [
+        ReportSpec(session_class, report_type, start=window.start, end=window.end)
+        for window in split_range(start, end, windows)
+    ]
+    tables: dict[ReportSpec, ReportTable] = {}
+    for result in ReportBatch(specs, timeout=timeout):
+        if result.error is not None:
+            raise result.error
+        tables[result.spec] = download_table(
+            session_class, report_type, str(result.document_id)
+        )
+    return stitch_tables(tables[spec] for spec in specs)
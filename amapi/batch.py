@@ -0,0 +1,121 @@
+"""Batch generation of many reports at once."""
+
+import datetime as dt
+import time
+from contextlib import ExitStack
+from typing import Any, Iterable, Iterator, NamedTuple
+
+from . import exceptions
+from .request import BaseReportPoller, GenerateReportRequest, request_report
+from .session import AmapiSession
+
+
+class ReportSpec(NamedTuple):
+    """A report to generate for the marketplace of a session class."""
+
+    session: type[AmapiSession]
+    report_type: str
+    start: dt.datetime | None = None
+    end: dt.datetime | None = None
+
+
+class BatchResult(NamedTuple):
+    """The outcome of generating a report in a batch."""
+
+    spec: ReportSpec
+    report_id: str | None = None
+    document_id: str | None = None
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the report was generated without error, otherwise False."""
+        return self.error is None
+
+
+class _PendingReport(NamedTuple):
+    spec: ReportSpec
+    session: AmapiSession
+    report_id: str
+
+
+class ReportBatch(BaseReportPoller):
+    """Generate many reports at once, yielding each as soon as it is ready.
+
+    Every report is requested before any are polled, so reports are generated
+    concurrently. Pending reports are then polled together in one loop, with
+    one delay between rounds shared by all of them.
+    """
+
+    def __init__(self, specs: Iterable[ReportSpec], **options: Any) -> None:
+        """Set the reports to generate and polling options."""
+        super().__init__(**options)
+        self.specs = list(specs)
+
+    def __iter__(self) -> Iterator[BatchResult]:
+        with ExitStack() as stack:
+            sessions: dict[type[AmapiSession], AmapiSession] = {}
+            pending: list[_PendingReport] = []
+            for spec in self.specs:
+                try:
+                    if spec.session not in sessions:
+                        sessions[spec.session] = stack.enter_context(spec.session())
+                    report_id = self.submit(sessions[spec.session], spec)
+                except Exception as error:
+                    yield BatchResult(spec=spec, error=error)
+                    continue
+                pending.append(_PendingReport(spec, sessions[spec.session], report_id))
+            yield from self.poll_all(pending)
+
+    def submit(self, session: AmapiSession, spec: ReportSpec) -> str:
+        """Request the generation of a report and return its ID."""
+        report_id = GenerateReportRequest(session).call(
+            report_type=spec.report_type, date=spec.start, end_date=spec.end
+        )
+        return str(report_id)
+
+    def poll_all(self, pending: list[_PendingReport]) -> Iterator[BatchResult]:
+        """Poll pending reports until each finishes, fails or times out."""
+        deadline = time.monotonic() + self.timeout
+        for delay in self.delays():
+            still_pending = []
+            for report in pending:
+                try:
+                    details = request_report(report.session, report.report_id)
+                    finished = self.is_finished(report.report_id, details)
+                except Exception as error:
+                    yield BatchResult(report.spec, report.report_id, error=error)
+                    continue
+                if finished:
+                    yield BatchResult(
+                        report.spec,
+                        report.report_id,
+                        document_id=str(details["reportDocumentId"]),
+                    )
+                else:
+                    still_pending.append(report)
+            pending = still_pending
+            if not pending:
+                return
+            try:
+                time.sleep(self.wait_time(pending[0].report_id, delay, deadline))
+            except exceptions.ReportTimeoutError:
+                for report in pending:
+                    timeout = exceptions.ReportTimeoutError(
+                        report.report_id, self.timeout
+                    )
+                    yield BatchResult(report.spec, report.report_id, error=timeout)
+                return
+
+
+def generate_reports(
+    specs: Iterable[ReportSpec], timeout: float | None = None
+) -> Iterator[BatchResult]:
+    """Generate many reports at once, yielding each result as soon as it is ready.
+
+    Args:
+        specs (Iterable[amapi.batch.ReportSpec]): The reports to generate.
+        timeout (float | None): Seconds to wait for reports before giving up.
+            Defaults to ReportBatch.TIMEOUT.
+    """
+    return iter(ReportBatch(specs, timeout=timeout))
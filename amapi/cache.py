@@ -0,0 +1,98 @@
+"""On-disk cache of downloaded report documents."""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, cast
+
+from .atomic import AtomicWriter
+
+
+class DocumentCache:
+    """Size-bounded on-disk cache of report documents keyed by document ID.
+
+    Each document is stored as "<key>.<sha256>", where key is derived from the
+    document ID and sha256 is the digest of the file's contents. Documents are
+    written to a temporary file and renamed into place so readers never see a
+    partial file, and are checked against their digest when read. When the
+    cache grows beyond max_size bytes the least recently used documents are
+    removed.
+    """
+
+    MAX_SIZE = 1024**3
+    TEMP_SUFFIX = ".tmp"
+
+    def __init__(self, directory: Path | str, max_size: int | None = None) -> None:
+        """Set the cache directory and maximum size in bytes."""
+        self.directory = Path(directory)
+        self.max_size = self.MAX_SIZE if max_size is None else max_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(document_id: str) -> str:
+        """Return the file name prefix used for a document ID."""
+        return hashlib.sha256(document_id.encode("utf8")).hexdigest()
+
+    @staticmethod
+    def digest(path: Path) -> str:
+        """Return the SHA-256 digest of a file's contents."""
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+    def entries(self) -> list[Path]:
+        """Return the paths of all cached documents."""
+        return [
+            path
+            for path in self.directory.iterdir()
+            if path.is_file() and path.suffix != self.TEMP_SUFFIX
+        ]
+
+    def get(self, document_id: str, verify: bool = True) -> Path | None:
+        """Return the path of a cached document or None if it is not cached.
+
+        If verify is True a document whose contents do not match its digest is
+        removed and None is returned.
+        """
+        for path in self.directory.glob(f"{self.key(document_id)}.*"):
+            if path.suffix == self.TEMP_SUFFIX:
+                continue
+            if verify and self.digest(path) != path.suffix[1:]:
+                path.unlink(missing_ok=True)
+                continue
+            os.utime(path)
+            return path
+        return None
+
+    def put(self, document_id: str, write: Callable[[BinaryIO], Any]) -> Path:
+        """Add a document to the cache and return its path.
+
+        Args:
+            document_id (str): The ID of the document.
+            write (Callable[[BinaryIO], Any]): A function writing the document to
+                the binary file object it is passed.
+        """
+        writer = AtomicWriter(directory=self.directory, suffix=self.TEMP_SUFFIX)
+        with writer as f:
+            write(cast(BinaryIO, f))
+            f.flush()
+            digest = self.digest(writer.temp_path)
+            writer.path = self.directory / f"{self.key(document_id)}.{digest}"
+        self.evict(keep=writer.path)
+        return writer.path
+
+    def remove(self, document_id: str) -> None:
+        """Remove a document from the cache."""
+        for path in self.directory.glob(f"{self.key(document_id)}.*"):
+            path.unlink(missing_ok=True)
+
+    def evict(self, keep: Path | None = None) -> None:
+        """Remove the least recently used documents until within max_size."""
+        entries = [(path, path.stat()) for path in self.entries()]
+        size = sum(stat.st_size for _, stat in entries)
+        for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime):
+            if size <= self.max_size:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            size -= stat.st_size
@@ -0,0 +1,290 @@
+"""Memory-mapped binary columnar files of report data.
+
+A columnar file starts with MAGIC followed by padding to ALIGNMENT bytes. Each
+column follows as one or two aligned segments: DECIMAL and INTEGER columns are
+arrays of native float64 or int64 values, STRING columns are an int64 array of
+offsets followed by their UTF-8 encoded values. Each indexed column has an
+int64 array of row numbers sorted by the column's values. The file ends with a
+JSON footer describing the segments, the length of the footer as a little
+endian uint64 and MAGIC again.
+"""
+
+import bisect
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import IO, Any, BinaryIO, Iterable, Iterator
+
+from . import exceptions
+from .atomic import AtomicWriter
+from .parser import (
+    DECIMAL,
+    ENCODING,
+    INTEGER,
+    ReportSchema,
+    ReportTable,
+    parse_report,
+)
+
+MAGIC = b"AMAPICOL"
+VERSION = 1
+ALIGNMENT = 8
+TRAILER = struct.Struct("<Q8s")
+TYPECODES = {DECIMAL: "d", INTEGER: "q"}
+
+
+def _pad(f: IO[bytes]) -> None:
+    f.write(b"\0" * (-f.tell() % ALIGNMENT))
+
+
+def _write_segment(f: IO[bytes], data: "bytes | array[Any]") -> dict[str, int]:
+    _pad(f)
+    offset = f.tell()
+    f.write(data)
+    return {"offset": offset, "length": f.tell() - offset}
+
+
+def _default_keys(table: ReportTable) -> list[str]:
+    key = table.schema.key
+    return [key] if key is not None and key in table.header else []
+
+
+def write_columnar(
+    table: ReportTable, path: Path | str, keys: Iterable[str] | None = None
+) -> Path:
+    """Write a table to a columnar file and return its path.
+
+    The file is written to a temporary file and renamed into place, so readers
+    never see a partial file.
+
+    Args:
+        table (amapi.parser.ReportTable): The table to write.
+        path (pathlib.Path | str): The path of the file.
+        keys (Iterable[str] | None): The columns to index for lookups. Defaults
+            to the key column of the table's schema.
+    """
+    path = Path(path)
+    keys = _default_keys(table) if keys is None else list(keys)
+    for key in keys:
+        if key not in table.header:
+            raise KeyError(key)
+    columns = []
+    indexes = {}
+    with AtomicWriter(path) as f:
+        f.write(MAGIC)
+        for name in table.header:
+            column_type = table.schema.column_type(name)
+            values = table[name]
+            if column_type in TYPECODES:
+                data = array(TYPECODES[column_type], values)  # type: ignore[arg-type]
+                column = {"values": _write_segment(f, data)}
+            else:
+                encoded = [str(value).encode("utf8") for value in values]
+                offsets = array("q", [0])
+                for value in encoded:
+                    offsets.append(offsets[-1] + len(value))
+                column = {
+                    "offsets": _write_segment(f, offsets),
+                    "values": _write_segment(f, b"".join(encoded)),
+                }
+            columns.append({"name": name, "type": column_type, **column})
+        for key in keys:
+            values = table[key]
+            order = sorted(range(len(table)), key=values.__getitem__)
+            indexes[key] = _write_segment(f, array("q", order))
+        footer = json.dumps(
+            {
+                "version": VERSION,
+                "byteorder": sys.byteorder,
+                "rows": len(table),
+                "columns": columns,
+                "indexes": indexes,
+            }
+        ).encode("utf8")
+        f.write(footer)
+        f.write(TRAILER.pack(len(footer), MAGIC))
+    return path
+
+
+def convert_report(
+    source: BinaryIO | Path | str,
+    path: Path | str,
+    report_type: str | None = None,
+    keys: Iterable[str] | None = None,
+    encoding: str = ENCODING,
+) -> Path:
+    """Convert a report document to a columnar file and return its path.
+
+    Args:
+        source (BinaryIO | pathlib.Path | str): The path of a report document or a
+            binary file-like object containing one.
+        path (pathlib.Path | str): The path of the columnar file.
+        report_type (str | None): The type of the report, used to find its schema.
+        keys (Iterable[str] | None): The columns to index for lookups. Defaults
+            to the key column of the report type's schema.
+        encoding (str): The encoding of the document.
+    """
+    table = parse_report(source, report_type=report_type, encoding=encoding)
+    return write_columnar(table, path, keys=keys)
+
+
+class ColumnarReport:
+    """Read only access to a memory-mapped columnar file.
+
+    Values are read from the mapped file as they are needed, so opening a
+    report and looking up rows does not load the whole file. Lookups of
+    indexed columns use a binary search of the column's index.
+
+    Memory views returned by column must be released before the report is
+    closed.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        """Map a columnar file into memory."""
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            try:
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise exceptions.ColumnarFormatError(
+                    self.path, "file is empty"
+                ) from None
+        try:
+            self.footer = self.read_footer()
+        except BaseException:
+            self.mmap.close()
+            raise
+        self.row_count: int = self.footer["rows"]
+        self.columns: dict[str, dict[str, Any]] = {
+            column["name"]: column for column in self.footer["columns"]
+        }
+        self.indexes: dict[str, dict[str, int]] = self.footer["indexes"]
+        self.header = list(self.columns)
+        self.views: dict[tuple[int, int, str], memoryview] = {}
+
+    def read_footer(self) -> dict[str, Any]:
+        """Return the footer of the file after checking its format."""
+        size = len(self.mmap)
+        if size < len(MAGIC) + TRAILER.size or self.mmap[: len(MAGIC)] != MAGIC:
+            raise exceptions.ColumnarFormatError(self.path, "not a columnar file")
+        length, magic = TRAILER.unpack_from(self.mmap, size - TRAILER.size)
+        if magic != MAGIC:
+            raise exceptions.ColumnarFormatError(self.path, "file is truncated")
+        end = size - TRAILER.size
+        footer: dict[str, Any] = json.loads(self.mmap[end - length : end])
+        if footer["version"] != VERSION:
+            raise exceptions.ColumnarFormatError(
+                self.path, f"unsupported version {footer['version']}"
+            )
+        if footer["byteorder"] != sys.byteorder:
+            raise exceptions.ColumnarFormatError(
+                self.path, f"written on a {footer['byteorder']} endian machine"
+            )
+        return footer
+
+    def __enter__(self) -> "ColumnarReport":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def close(self) -> None:
+        """Release memory views and unmap the file."""
+        for view in self.views.values():
+            view.release()
+        self.views.clear()
+        self.mmap.close()
+
+    def view(self, segment: dict[str, int], typecode: str = "B") -> memoryview:
+        """Return a segment of the file as a memory view of typecode values."""
+        start = segment["offset"]
+        key = (start, segment["length"], typecode)
+        if key not in self.views:
+            view = memoryview(self.mmap)[start : start + segment["length"]]
+            self.views[key] = view.cast(typecode)  # type: ignore[call-overload]
+        return self.views[key]
+
+    def column(self, name: str) -> memoryview:
+        """Return the values of a DECIMAL or INTEGER column without copying."""
+        column_type = self.columns[name]["type"]
+        if column_type not in TYPECODES:
+            raise TypeError(f"{name} is a {column_type} column.")
+        return self.view(self.columns[name]["values"], TYPECODES[column_type])
+
+    def value(self, name: str, index: int) -> Any:
+        """Return the value of a column in one row."""
+        if not 0 <= index < self.row_count:
+            raise IndexError(index)
+        column = self.columns[name]
+        if column["type"] in TYPECODES:
+            return self.column(name)[index]
+        offsets = self.view(column["offsets"], "q")
+        start, end = offsets[index], offsets[index + 1]
+        return str(self.view(column["values"])[start:end], "utf8")
+
+    def row(self, index: int) -> dict[str, Any]:
+        """Return one row as a dict."""
+        return {name: self.value(name, index) for name in self.header}
+
+    def rows(self) -> Iterator[dict[str, Any]]:
+        """Yield each row as a dict."""
+        for index in range(self.row_count):
+            yield self.row(index)
+
+    def default_key(self) -> str:
+        """Return the first indexed column."""
+        if not self.indexes:
+            raise exceptions.ColumnarFormatError(self.path, "no columns are indexed")
+        return next(iter(self.indexes))
+
+    def find(self, value: Any, key: str | None = None) -> list[int]:
+        """Return the numbers of the rows where an indexed column equals value.
+
+        Args:
+            value (Any): The value to find.
+            key (str | None): The indexed column to search. Defaults to the
+                first indexed column.
+        """
+        key = key or self.default_key()
+        if key not in self.indexes:
+            raise KeyError(key)
+        index = self.view(self.indexes[key], "q")
+
+        def row_value(row: int) -> Any:
+            return self.value(key, row)
+
+        start = bisect.bisect_left(index, value, key=row_value)
+        end = bisect.bisect_right(index, value, lo=start, key=row_value)
+        return sorted(index[start:end].tolist())
+
+    def lookup(self, value: Any, key: str | None = None) -> dict[str, Any] | None:
+        """Return the first row where an indexed column equals value, or None.
+
+        Args:
+            value (Any): The value to find, such as a SKU.
+            key (str | None): The indexed column to search. Defaults to the
+                first indexed column.
+        """
+        rows = self.find(value, key=key)
+        return self.row(rows[0]) if rows else None
+
+    def to_table(self) -> ReportTable:
+        """Return the contents of the file as a ReportTable."""
+        schema = ReportSchema(
+            {name: column["type"] for name, column in self.columns.items()},
+            key=next(iter(self.indexes), None),
+        )
+        table = ReportTable(schema, self.header)
+        for name in self.header:
+            if self.columns[name]["type"] not in TYPECODES:
+                values: Any = [self.value(name, i) for i in range(self.row_count)]
+            else:
+                values = self.column(name).tolist()
+            table.columns[name].extend(values)
+        return table
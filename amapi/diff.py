@@ -0,0 +1,275 @@
+"""Streaming comparison of successive snapshots of a report."""
+
+import csv
+import math
+import tempfile
+import zlib
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, NamedTuple, TextIO
+
+from .columnar import ColumnarReport
+from .parser import ENCODING, ReportSchema, _open_text, get_schema
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+PARTITIONS = 16
+
+Row = dict[str, Any]
+
+
+class RowChange(NamedTuple):
+    """A row added, removed or changed between two snapshots of a report."""
+
+    kind: str
+    key: Any
+    old: Row | None
+    new: Row | None
+    columns: tuple[str, ...] = ()
+
+
+def values_equal(a: Any, b: Any) -> bool:
+    """Return True if two values are equal, treating NaN as equal to NaN."""
+    if a == b:
+        return True
+    return (
+        isinstance(a, float)
+        and isinstance(b, float)
+        and math.isnan(a)
+        and math.isnan(b)
+    )
+
+
+def changed_columns(old: Row, new: Row) -> tuple[str, ...]:
+    """Return the names of the columns whose values differ between two rows.
+
+    Columns in only one of the rows are included.
+    """
+    columns = list(new) + [name for name in old if name not in new]
+    return tuple(
+        name
+        for name in columns
+        if name not in old or name not in new or not values_equal(old[name], new[name])
+    )
+
+
+def compare_row(key: Any, old: Row | None, new: Row | None) -> RowChange | None:
+    """Return the change between two versions of a row, or None if it is the same."""
+    if old is None:
+        return RowChange(ADDED, key, None, new)
+    if new is None:
+        return RowChange(REMOVED, key, old, None)
+    columns = changed_columns(old, new)
+    if columns:
+        return RowChange(CHANGED, key, old, new, columns)
+    return None
+
+
+@contextmanager
+def read_rows(
+    source: BinaryIO | Path | str, encoding: str = ENCODING
+) -> Iterator[tuple[list[str], Iterator[list[str]]]]:
+    """Open a tab-separated report and yield its header and an iterator of rows."""
+    text = _open_text(source, encoding)
+    try:
+        reader = csv.reader(text, delimiter="\t", quoting=csv.QUOTE_NONE)
+        header = [name.strip() for name in next(reader, [])]
+        yield header, (row for row in reader if row)
+    finally:
+        if isinstance(source, (str, Path)):
+            text.close()
+        else:
+            text.detach()
+
+
+class Snapshot:
+    """The rows of one snapshot of a report, converted with a schema."""
+
+    def __init__(self, header: list[str], schema: ReportSchema, key: str) -> None:
+        """Set the columns of the snapshot and the column identifying rows."""
+        if key not in header:
+            raise KeyError(key)
+        self.header = header
+        self.key_index = header.index(key)
+        self.converters = [schema.converter(name) for name in header]
+
+    def key(self, row: list[str]) -> str:
+        """Return the key of a row of text values."""
+        return row[self.key_index] if len(row) > self.key_index else ""
+
+    def row(self, values: list[str]) -> Row:
+        """Return a row of text values as a dict of converted values."""
+        values = values + [""] * (len(self.header) - len(values))
+        return {
+            name: convert(value)
+            for name, convert, value in zip(
+                self.header, self.converters, values, strict=False
+            )
+        }
+
+
+def partition(
+    rows: Iterable[list[str]],
+    snapshot: Snapshot,
+    directory: Path,
+    name: str,
+    partitions: int,
+) -> list[Path]:
+    """Split rows into files by the hash of their keys.
+
+    Rows with the same key are always written to the same partition, in their
+    original order.
+    """
+    paths = [directory / f"{name}-{index}.tsv" for index in range(partitions)]
+    with ExitStack() as stack:
+        files: list[TextIO] = [
+            stack.enter_context(open(path, "w", encoding="utf8", newline=""))
+            for path in paths
+        ]
+        for row in rows:
+            key = snapshot.key(row).encode("utf8")
+            files[zlib.crc32(key) % partitions].write("\t".join(row) + "\n")
+    return paths
+
+
+def read_partition(path: Path) -> Iterator[list[str]]:
+    """Yield the rows of a partition file."""
+    with open(path, encoding="utf8", newline="") as f:
+        yield from csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE)
+
+
+def diff_rows(
+    old_rows: Iterable[list[str]],
+    new_rows: Iterable[list[str]],
+    old: Snapshot,
+    new: Snapshot,
+) -> Iterator[RowChange]:
+    """Yield the changes between two sets of rows with no keys in other sets.
+
+    The old rows are held in memory while the new rows are streamed. If a key
+    is repeated in a snapshot only its first row is compared.
+    """
+    previous: dict[str, list[str]] = {}
+    for row in old_rows:
+        previous.setdefault(old.key(row), row)
+    seen = set()
+    for row in new_rows:
+        key = new.key(row)
+        if key in seen:
+            continue
+        seen.add(key)
+        old_row = previous.pop(key, None)
+        change = compare_row(
+            key, None if old_row is None else old.row(old_row), new.row(row)
+        )
+        if change is not None:
+            yield change
+    for key, row in previous.items():
+        yield RowChange(REMOVED, key, old.row(row), None)
+
+
+def diff_reports(
+    old: BinaryIO | Path | str,
+    new: BinaryIO | Path | str,
+    report_type: str | None = None,
+    key: str | None = None,
+    partitions: int = PARTITIONS,
+    encoding: str = ENCODING,
+) -> Iterator[RowChange]:
+    """Yield the rows added, removed or changed between two report documents.
+
+    Rows are matched by their key column and values are compared after being
+    converted with the report type's schema. Both documents are first split
+    into partitions temporary files by the hash of their keys and each
+    partition is compared in turn, so only one partition of the old document
+    is held in memory at a time. If partitions is 1 the documents are compared
+    directly, holding the whole old document in memory. Changes are yielded in
+    no particular order.
+
+    Args:
+        old (BinaryIO | pathlib.Path | str): The earlier report document.
+        new (BinaryIO | pathlib.Path | str): The later report document.
+        report_type (str | None): The type of the reports, used to find their
+            schema.
+        key (str | None): The column identifying rows. Defaults to the key
+            column of the report type's schema.
+        partitions (int): The number of partitions to split the documents into.
+        encoding (str): The encoding of the documents.
+    """
+    schema = get_schema(report_type)
+    key = key or schema.key
+    if key is None:
+        raise ValueError("A key column is needed to compare reports.")
+    with read_rows(old, encoding) as (old_header, old_rows), read_rows(
+        new, encoding
+    ) as (new_header, new_rows):
+        old_snapshot = Snapshot(old_header, schema, key)
+        new_snapshot = Snapshot(new_header, schema, key)
+        if partitions <= 1:
+            yield from diff_rows(old_rows, new_rows, old_snapshot, new_snapshot)
+            return
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory)
+            old_paths = partition(old_rows, old_snapshot, path, "old", partitions)
+            new_paths = partition(new_rows, new_snapshot, path, "new", partitions)
+            for old_path, new_path in zip(old_paths, new_paths, strict=False):
+                yield from diff_rows(
+                    read_partition(old_path),
+                    read_partition(new_path),
+                    old_snapshot,
+                    new_snapshot,
+                )
+
+
+def _first_rows(report: ColumnarReport, key: str) -> Iterator[tuple[Any, int]]:
+    index = report.view(report.indexes[key], "q")
+    previous: Any = None
+    for position, row in enumerate(index):
+        value = report.value(key, row)
+        if position and values_equal(value, previous):
+            continue
+        previous = value
+        yield value, row
+
+
+def diff_columnar(
+    old: ColumnarReport, new: ColumnarReport, key: str | None = None
+) -> Iterator[RowChange]:
+    """Yield the rows added, removed or changed between two columnar reports.
+
+    Both reports must be indexed on the key column. Their indexes are merged in
+    key order, so rows are read from the mapped files as they are compared and
+    changes are yielded in key order. If a key is repeated in a report only its
+    first row is compared.
+
+    Args:
+        old (amapi.columnar.ColumnarReport): The earlier report.
+        new (amapi.columnar.ColumnarReport): The later report.
+        key (str | None): The indexed column identifying rows. Defaults to the
+            first indexed column of the new report.
+    """
+    key = key or new.default_key()
+    for report in (old, new):
+        if key not in report.indexes:
+            raise KeyError(key)
+    old_rows = _first_rows(old, key)
+    new_rows = _first_rows(new, key)
+    old_item = next(old_rows, None)
+    new_item = next(new_rows, None)
+    while old_item is not None or new_item is not None:
+        if old_item is not None and (new_item is None or old_item[0] < new_item[0]):
+            yield RowChange(REMOVED, old_item[0], old.row(old_item[1]), None)
+            old_item = next(old_rows, None)
+        elif new_item is not None and (old_item is None or new_item[0] < old_item[0]):
+            yield RowChange(ADDED, new_item[0], None, new.row(new_item[1]))
+            new_item = next(new_rows, None)
+        elif old_item is not None and new_item is not None:
+            change = compare_row(
+                new_item[0], old.row(old_item[1]), new.row(new_item[1])
+            )
+            if change is not None:
+                yield change
+            old_item = next(old_rows, None)
+            new_item = next(new_rows, None)
@@ -0,0 +1,331 @@
+"""Resumable downloads of report documents in parallel byte ranges."""
+
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, NamedTuple, cast
+
+import requests
+
+from . import exceptions, metrics
+from .atomic import AtomicWriter
+from .request import (
+    DOWNLOAD_CHUNK_SIZE,
+    DOWNLOAD_TIMEOUT,
+    BaseRequest,
+    GetDocumentRequest,
+    request_document,
+    stream_document,
+)
+from .retry import RetryPolicy
+from .session import AmapiSession
+from .transport import Transport
+
+PART_SUFFIX = ".part"
+STATE_SUFFIX = ".json"
+CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+class Chunk(NamedTuple):
+    """A range of bytes of a document, from start to end inclusive."""
+
+    number: int
+    start: int
+    end: int
+
+    @property
+    def length(self) -> int:
+        """Return the number of bytes in the chunk."""
+        return self.end - self.start + 1
+
+    @property
+    def header(self) -> str:
+        """Return the value of the Range header requesting the chunk."""
+        return f"bytes={self.start}-{self.end}"
+
+
+def part_path(path: Path | str) -> Path:
+    """Return the path a document is downloaded to before it is complete."""
+    path = Path(path)
+    return path.with_name(path.name + PART_SUFFIX)
+
+
+def state_path(path: Path | str) -> Path:
+    """Return the path of the file recording the progress of a download."""
+    path = Path(path)
+    return path.with_name(path.name + STATE_SUFFIX)
+
+
+def downloaded_bytes(path: Path | str) -> int:
+    """Return the number of bytes downloaded to path so far."""
+    try:
+        with open(state_path(path)) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        try:
+            return Path(path).stat().st_size
+        except OSError:
+            return 0
+    chunks = split_chunks(state["size"], state["chunk_size"])
+    return sum(chunks[number].length for number in state["done"])
+
+
+def split_chunks(size: int, chunk_size: int) -> list[Chunk]:
+    """Return the chunks of a document of size bytes."""
+    return [
+        Chunk(number, start, min(start + chunk_size, size) - 1)
+        for number, start in enumerate(range(0, size, chunk_size))
+    ]
+
+
+class DownloadRetryPolicy(RetryPolicy):
+    """Retry policy for requests to document URLs.
+
+    Connection errors, timeouts, incomplete responses and HTTP errors with a
+    status code in RETRYABLE_CODES are retried.
+    """
+
+    RETRYABLE_ERRORS = (
+        requests.ConnectionError,
+        requests.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+        exceptions.DownloadSizeError,
+    )
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Return True if a download failing with error may succeed if retried."""
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return error.response.status_code in self.retryable_codes
+        return isinstance(error, self.RETRYABLE_ERRORS)
+
+
+class RangedDownloader:
+    """Download documents in byte ranges fetched in parallel.
+
+    Documents are split into chunks of CHUNK_SIZE bytes, which are downloaded by
+    up to WORKERS threads at once and written in place. The chunks completed
+    are recorded beside the file, so an interrupted download continues with
+    the chunks it is missing. Each chunk is retried as allowed by RETRY_POLICY
+    and checked against the length requested. If the server does not support
+    ranges the document is downloaded in one stream.
+    """
+
+    CHUNK_SIZE = 8 * 1024**2
+    WORKERS = 4
+    TIMEOUT = DOWNLOAD_TIMEOUT
+    RETRY_POLICY: RetryPolicy = DownloadRetryPolicy()
+
+    def __init__(
+        self,
+        chunk_size: int | None = None,
+        workers: int | None = None,
+        timeout: float | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ) -> None:
+        """Set download options."""
+        self.chunk_size = self.CHUNK_SIZE if chunk_size is None else chunk_size
+        self.workers = self.WORKERS if workers is None else workers
+        self.timeout = self.TIMEOUT if timeout is None else timeout
+        self.retry_policy = self.RETRY_POLICY if retry_policy is None else retry_policy
+        self.lock = threading.Lock()
+
+    def get_size(self, url: str) -> int | None:
+        """Return the size of the document at url, or None if ranges are not used."""
+        with requests.get(
+            url, headers={"Range": "bytes=0-0"}, stream=True, timeout=self.timeout
+        ) as response:
+            content_range = response.headers.get("Content-Range", "")
+            if response.status_code == 416 and content_range == "bytes */0":
+                return 0
+            response.raise_for_status()
+            if response.status_code != 206:
+                return None
+            match = CONTENT_RANGE.fullmatch(content_range)
+            if match is None:
+                return None
+            return int(match.group(3))
+
+    def load_done(self, path: Path, size: int) -> set[int]:
+        """Return the indices of the chunks already downloaded to path."""
+        try:
+            with open(state_path(path)) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return set()
+        if (
+            not path.exists()
+            or state.get("size") != size
+            or state.get("chunk_size") != self.chunk_size
+        ):
+            return set()
+        return set(state["done"])
+
+    def save_done(self, path: Path, size: int, done: set[int]) -> None:
+        """Record the indices of the chunks downloaded to path."""
+        state = {"size": size, "chunk_size": self.chunk_size, "done": sorted(done)}
+        with AtomicWriter(state_path(path), "w") as f:
+            json.dump(state, f)
+
+    def with_retries(self, url: str, chunk: Chunk, fd: int) -> None:
+        """Download a chunk, retrying as allowed by the retry policy."""
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return self.fetch_chunk(url, chunk, fd)
+            except Exception as error:
+                if not self.retry_policy.should_retry(error, attempt):
+                    raise
+                time.sleep(self.retry_policy.get_delay(error, attempt))
+
+    def fetch_chunk(self, url: str, chunk: Chunk, fd: int) -> None:
+        """Download a chunk and write it at its offset in the file fd.
+
+        Raises:
+            amapi.exceptions.DownloadSizeError: If the response is not the size
+                of the chunk.
+        """
+        offset = chunk.start
+        with requests.get(
+            url, headers={"Range": chunk.header}, stream=True, timeout=self.timeout
+        ) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise exceptions.DownloadSizeError(url, chunk.length, None)
+            for data in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                data = data[: chunk.end + 1 - offset]
+                offset += os.pwrite(fd, data, offset)
+        if offset != chunk.end + 1:
+            raise exceptions.DownloadSizeError(url, chunk.length, offset - chunk.start)
+
+    def stream(self, url: str, path: Path) -> int:
+        """Download the document at url to path in one stream."""
+        state_path(path).unlink(missing_ok=True)
+        with requests.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            with open(path, "wb") as f:
+                for data in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(data)
+                return f.tell()
+
+    def download(self, url: str, path: Path | str, size: int | None = None) -> int:
+        """Download the document at url to path and return its size.
+
+        A download to path that was interrupted is resumed. The record of its
+        progress is kept until the caller removes it with finish.
+
+        Args:
+            url (str): The URL of the document.
+            path (pathlib.Path | str): The path of the file to write.
+            size (int | None): The expected size of the document in bytes.
+
+        Raises:
+            amapi.exceptions.DownloadSizeError: If the document is not the
+                expected size.
+        """
+        path = Path(path)
+        total = self.get_size(url)
+        if total is None:
+            total = self.stream(url, path)
+        else:
+            if size is not None and total != size:
+                raise exceptions.DownloadSizeError(url, size, total)
+            self.download_chunks(url, path, total)
+        if path.stat().st_size != total:
+            raise exceptions.DownloadSizeError(url, total, path.stat().st_size)
+        return total
+
+    def download_chunks(self, url: str, path: Path, size: int) -> None:
+        """Download the chunks of a document of size bytes missing from path."""
+        done = self.load_done(path, size)
+        missing = [
+            chunk
+            for chunk in split_chunks(size, self.chunk_size)
+            if chunk.number not in done
+        ]
+        fd = os.open(path, os.O_RDWR | os.O_CREAT)
+        try:
+            os.ftruncate(fd, size)
+            self.save_done(path, size, done)
+
+            def fetch(chunk: Chunk) -> None:
+                self.with_retries(url, chunk, fd)
+                with self.lock:
+                    done.add(chunk.number)
+                    self.save_done(path, size, done)
+
+            executor = ThreadPoolExecutor(max_workers=max(self.workers, 1))
+            try:
+                for future in [executor.submit(fetch, chunk) for chunk in missing]:
+                    future.result()
+            finally:
+                executor.shutdown(cancel_futures=True)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def finish(path: Path | str) -> None:
+        """Remove the record of the progress of a download to path."""
+        state_path(path).unlink(missing_ok=True)
+
+
+def decompress(source: Path, dest: Path) -> int:
+    """Write the decompressed contents of a GZIP file to dest atomically."""
+    with AtomicWriter(dest) as f, gzip.open(source, "rb") as compressed:
+        shutil.copyfileobj(compressed, f, DOWNLOAD_CHUNK_SIZE)
+        written = f.tell()
+    return written
+
+
+def download_document_ranged(
+    session: AmapiSession,
+    document_id: str,
+    dest: Path | str,
+    downloader: RangedDownloader | None = None,
+    **kwargs: Any,
+) -> int:
+    """Download a generated document in parallel ranges, resuming earlier attempts.
+
+    The document is downloaded to a ".part" file beside dest, which is renamed,
+    or decompressed if the document is GZIP compressed, to dest once complete.
+    Returns the number of bytes written to dest.
+
+    Transports other than the default one, such as those recording and
+    replaying traffic, handle documents as a stream of chunks, so when one is
+    set the document is streamed to dest with stream_document instead.
+
+    args:
+        session (amapi.session.AmapiSession): A session instance.
+        document_id (str): The ID of the generated document.
+        dest (pathlib.Path | str): The path of the file to write.
+        downloader (amapi.download.RangedDownloader | None): The downloader to
+            use. Defaults to a RangedDownloader with kwargs as its options.
+    """
+    dest = Path(dest)
+    part = part_path(dest)
+    downloader = downloader or RangedDownloader(**kwargs)
+    document = request_document(session, document_id=document_id)
+    with GetDocumentRequest.INSTRUMENTATION.time(
+        metrics.DOWNLOAD, GetDocumentRequest.REQUEST_METHOD, session.marketplace.name
+    ) as measurement:
+        if type(BaseRequest.TRANSPORT) is not Transport:
+            with AtomicWriter(dest) as f:
+                measurement.bytes = stream_document(document, cast(BinaryIO, f))
+            return measurement.bytes
+        downloader.download(document["url"], part)
+        if document.get("compressionAlgorithm") == "GZIP":
+            written = decompress(part, dest)
+            part.unlink()
+        else:
+            written = part.stat().st_size
+            os.replace(part, dest)
+        downloader.finish(part)
+        measurement.bytes = written
+    return written
@@ -1,5 +1,6 @@
 """Exceptions for the amapi package."""
 
+from pathlib import Path
 from typing import Any, Mapping
 
 
@@ -11,3 +12,121 @@ class LoginCredentialsNotSetError(ValueError):
         super().__init__(
             "REFRESH_TOKEN_KEY, APP_ID_KEY and CLIENT_SECRET_KEY must be set."
         )
+
+
+class ReportProcessingError(Exception):
+    """Exception raised when a report finishes without producing a document."""
+
+    def __init__(self, report_id: str, status: str) -> None:
+        """Exception raised when a report finishes without producing a document."""
+        self.report_id = report_id
+        self.status = status
+        super().__init__(report_id, status)
+
+    def __str__(self) -> str:
+        return f"Report {self.report_id} finished with status {self.status}."
+
+
+class ReportTimeoutError(TimeoutError):
+    """Exception raised when a report does not finish before the poll deadline."""
+
+    def __init__(self, report_id: str, timeout: float) -> None:
+        """Exception raised when a report does not finish before the poll deadline."""
+        self.report_id = report_id
+        self.timeout = timeout
+        super().__init__(report_id, timeout)
+
+    def __str__(self) -> str:
+        return f"Report {self.report_id} did not finish within {self.timeout} seconds."
+
+
+class RecordingNotFoundError(LookupError):
+    """Exception raised when a replayed call or document was not recorded."""
+
+    def __init__(self, operation: str, key: str) -> None:
+        """Exception raised when a replayed call or document was not recorded."""
+        self.operation = operation
+        self.key = key
+        super().__init__(operation, key)
+
+    def __str__(self) -> str:
+        return f"No recording of {self.operation} for {self.key}."
+
+
+class ColumnarFormatError(ValueError):
+    """Exception raised when a file cannot be read as a columnar report."""
+
+    def __init__(self, path: Path, reason: str) -> None:
+        """Exception raised when a file cannot be read as a columnar report."""
+        self.path = path
+        self.reason = reason
+        super().__init__(path, reason)
+
+    def __str__(self) -> str:
+        return f"Cannot read {self.path} as a columnar report: {self.reason}."
+
+
+class JobLeaseLostError(Exception):
+    """Exception raised when a worker no longer holds the lease of a job."""
+
+    def __init__(self, job_id: int, worker: str) -> None:
+        """Exception raised when a worker no longer holds the lease of a job."""
+        self.job_id = job_id
+        self.worker = worker
+        super().__init__(job_id, worker)
+
+    def __str__(self) -> str:
+        return f"Worker {self.worker} no longer holds the lease of job {self.job_id}."
+
+
+class ReportPollStoppedError(Exception):
+    """Exception raised when polling a report is stopped before it finishes."""
+
+    def __init__(self, report_id: str) -> None:
+        """Exception raised when polling a report is stopped before it finishes."""
+        self.report_id = report_id
+        super().__init__(report_id)
+
+    def __str__(self) -> str:
+        return f"Polling report {self.report_id} was stopped."
+
+
+class DownloadSizeError(IOError):
+    """Exception raised when a download is not the size expected."""
+
+    def __init__(self, url: str, expected: int, actual: int | None) -> None:
+        """Exception raised when a download is not the size expected."""
+        self.url = url
+        self.expected = expected
+        self.actual = actual
+        super().__init__(url, expected, actual)
+
+    def __str__(self) -> str:
+        url = self.url.split("?")[0]
+        return f"Expected {self.expected} bytes from {url}, got {self.actual}."
+
+
+class SellerNotRegisteredError(LookupError):
+    """Exception raised when a session is requested for an unknown seller."""
+
+    def __init__(self, seller: str, marketplace: str) -> None:
+        """Exception raised when a session is requested for an unknown seller."""
+        self.seller = seller
+        self.marketplace = marketplace
+        super().__init__(seller, marketplace)
+
+    def __str__(self) -> str:
+        return f"No credentials for seller {self.seller} in {self.marketplace}."
+
+
+class MarketplaceRegionError(ValueError):
+    """Exception raised when a request covers marketplaces in another region."""
+
+    def __init__(self, marketplace: str, region: str) -> None:
+        """Exception raised when a request covers marketplaces in another region."""
+        self.marketplace = marketplace
+        self.region = region
+        super().__init__(marketplace, region)
+
+    def __str__(self) -> str:
+        return f"Marketplace {self.marketplace} is not in region {self.region}."
@@ -0,0 +1,221 @@
+"""Incremental fetching of time-series reports."""
+
+import datetime as dt
+import os
+import shutil
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+from .request import (
+    DOWNLOAD_CHUNK_SIZE,
+    GenerateReportRequest,
+    download_document,
+    wait_for_report,
+)
+from .session import AmapiSession
+
+INITIAL_WINDOW = dt.timedelta(hours=72)
+LAG = dt.timedelta(hours=1)
+
+
+class DataWindow(NamedTuple):
+    """The period of data covered by a report."""
+
+    start: dt.datetime
+    end: dt.datetime
+
+
+class WatermarkStore:
+    """SQLite store of the time up to which each report type has been fetched.
+
+    Watermarks are kept for each marketplace and report type, together with
+    the size of the destination file once the rows up to the watermark were
+    written to it. A new connection is made for each operation, so a store may
+    be shared between threads and processes.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS watermarks (
+            marketplace_id TEXT NOT NULL,
+            report_type TEXT NOT NULL,
+            fetched_until TEXT NOT NULL,
+            dest_size INTEGER,
+            PRIMARY KEY (marketplace_id, report_type)
+        )
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        """Set the path of the database, creating it if it does not exist."""
+        self.path = Path(path)
+        with closing(self.connect()) as connection, connection:
+            connection.execute(self.SCHEMA)
+            columns = [
+                row[1] for row in connection.execute("PRAGMA table_info(watermarks)")
+            ]
+            if "dest_size" not in columns:
+                connection.execute(
+                    "ALTER TABLE watermarks ADD COLUMN dest_size INTEGER"
+                )
+
+    def connect(self) -> sqlite3.Connection:
+        """Return a connection to the database."""
+        return sqlite3.connect(self.path, timeout=30.0)
+
+    def get(self, marketplace_id: str, report_type: str) -> dt.datetime | None:
+        """Return the time up to which a report type has been fetched, or None."""
+        with closing(self.connect()) as connection:
+            row = connection.execute(
+                "SELECT fetched_until FROM watermarks "
+                "WHERE marketplace_id = ? AND report_type = ?",
+                (marketplace_id, report_type),
+            ).fetchone()
+        if row is None:
+            return None
+        return dt.datetime.fromisoformat(row[0])
+
+    def get_size(self, marketplace_id: str, report_type: str) -> int | None:
+        """Return the size of the destination when the watermark was set, or None."""
+        with closing(self.connect()) as connection:
+            row = connection.execute(
+                "SELECT dest_size FROM watermarks "
+                "WHERE marketplace_id = ? AND report_type = ?",
+                (marketplace_id, report_type),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def set(
+        self,
+        marketplace_id: str,
+        report_type: str,
+        fetched_until: dt.datetime,
+        dest_size: int | None = None,
+    ) -> None:
+        """Record the time up to which a report type has been fetched.
+
+        Args:
+            marketplace_id (str): The ID of the marketplace.
+            report_type (str): The type of report.
+            fetched_until (datetime.datetime): The end of the data fetched.
+            dest_size (int | None): The size of the destination file once the
+                data up to fetched_until was written to it.
+        """
+        with closing(self.connect()) as connection, connection:
+            connection.execute(
+                "INSERT INTO watermarks "
+                "(marketplace_id, report_type, fetched_until, dest_size) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (marketplace_id, report_type) "
+                "DO UPDATE SET fetched_until = excluded.fetched_until, "
+                "dest_size = excluded.dest_size",
+                (marketplace_id, report_type, fetched_until.isoformat(), dest_size),
+            )
+
+
+def next_window(
+    session: AmapiSession,
+    store: WatermarkStore,
+    report_type: str,
+    end: dt.datetime | None = None,
+    initial_window: dt.timedelta = INITIAL_WINDOW,
+    lag: dt.timedelta = LAG,
+) -> DataWindow | None:
+    """Return the window of data not yet fetched, or None if there is none.
+
+    Args:
+        session (amapi.session.AmapiSession): A session instance.
+        store (amapi.incremental.WatermarkStore): The store of watermarks.
+        report_type (str): The type of report.
+        end (datetime.datetime | None): The end of the window. Defaults to lag
+            before now.
+        initial_window (datetime.timedelta): The length of the window when the
+            report type has not been fetched before.
+        lag (datetime.timedelta): How far the default end trails now, so rows
+            that reach the report late are not missed.
+    """
+    end = end or dt.datetime.now(dt.timezone.utc) - lag
+    start = store.get(session.marketplace.marketplace_id, report_type)
+    if start is None:
+        start = end - initial_window
+    if start >= end:
+        return None
+    return DataWindow(start, end)
+
+
+def append_document(source: BinaryIO, dest: Path) -> int:
+    """Append the rows of a tab-separated document to dest.
+
+    If dest is empty or does not exist the whole document is written, otherwise
+    the header row of source is skipped. Returns the number of bytes written.
+    """
+    with open(dest, "ab+") as f:
+        f.seek(0, 2)
+        if f.tell() > 0:
+            source.readline()
+            f.seek(-1, 2)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        start = f.tell()
+        shutil.copyfileobj(source, f, DOWNLOAD_CHUNK_SIZE)
+        return f.tell() - start
+
+
+def truncate(path: Path, size: int) -> None:
+    """Truncate the file at path to size bytes if it is longer."""
+    if path.exists() and path.stat().st_size > size:
+        os.truncate(path, size)
+
+
+def fetch_incremental(
+    session: AmapiSession,
+    store: WatermarkStore,
+    report_type: str,
+    dest: Path | str,
+    end: dt.datetime | None = None,
+    initial_window: dt.timedelta = INITIAL_WINDOW,
+    lag: dt.timedelta = LAG,
+) -> DataWindow | None:
+    """Fetch the data added since the last fetch and append it to dest.
+
+    A report is requested for the window after the stored watermark, its rows
+    are appended to dest and the watermark is moved to the end of the window.
+    The size of dest is stored with the watermark, and dest is truncated back
+    to it before rows are appended, so rows written by a fetch that failed
+    before the watermark was moved are not appended twice when it is retried.
+    Returns the window fetched, or None if there was no new window to fetch.
+
+    Args:
+        session (amapi.session.AmapiSession): A session instance.
+        store (amapi.incremental.WatermarkStore): The store of watermarks.
+        report_type (str): The type of report to fetch.
+        dest (pathlib.Path | str): The path of the file to append rows to.
+        end (datetime.datetime | None): The end of the window. Defaults to lag
+            before now.
+        initial_window (datetime.timedelta): The length of the window when the
+            report type has not been fetched before.
+        lag (datetime.timedelta): How far the default end trails now.
+    """
+    marketplace_id = session.marketplace.marketplace_id
+    window = next_window(
+        session, store, report_type, end=end, initial_window=initial_window, lag=lag
+    )
+    if window is None:
+        return None
+    report_id = GenerateReportRequest(session).call(
+        report_type=report_type, date=window.start, end_date=window.end
+    )
+    document_id = wait_for_report(session, report_id=str(report_id))
+    dest = Path(dest)
+    with tempfile.TemporaryFile(dir=dest.parent) as f:
+        download_document(session, document_id=document_id, dest=f)
+        f.seek(0)
+        size = store.get_size(marketplace_id, report_type)
+        if size is None:
+            size = dest.stat().st_size if dest.exists() else 0
+            store.set(marketplace_id, report_type, window.start, size)
+        truncate(dest, size)
+        append_document(f, dest)
+    store.set(marketplace_id, report_type, window.end, dest.stat().st_size)
+    return window
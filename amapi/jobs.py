@@ -0,0 +1,447 @@
+"""Durable queue of report jobs and workers resuming them after restarts."""
+
+import argparse
+import datetime as dt
+import importlib
+import os
+import signal
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Any, Iterator, NamedTuple
+
+from . import download, exceptions
+from .request import ReportPoller, request_generate_report
+from .session import AmapiSession
+
+GENERATE = "generate"
+WAIT = "wait"
+DOWNLOAD = "download"
+DONE = "done"
+FAILED = "failed"
+
+
+class StoredJob(NamedTuple):
+    """A report job and the progress made on it.
+
+    stage is the next stage of the job to run. report_id and document_id are
+    set once the report has been requested and finished, and download_offset
+    is the number of bytes of the document downloaded so far.
+    """
+
+    id: int
+    session: str
+    report_type: str
+    destination: str
+    max_age: float | None
+    stage: str
+    report_id: str | None
+    document_id: str | None
+    download_offset: int
+    attempts: int
+    error: str | None
+    worker: str | None
+    lease_until: float | None
+    available_at: float
+    created: float
+    updated: float
+
+    @property
+    def part_path(self) -> Path:
+        """Return the path the document is downloaded to before it is finished."""
+        return download.part_path(self.destination)
+
+
+def session_path(session_class: type[AmapiSession]) -> str:
+    """Return the import path of a session class."""
+    return f"{session_class.__module__}.{session_class.__qualname__}"
+
+
+def load_session(path: str) -> type[AmapiSession]:
+    """Return the session class with an import path."""
+    module, _, name = path.rpartition(".")
+    session_class: type[AmapiSession] = getattr(importlib.import_module(module), name)
+    return session_class
+
+
+class JobQueue:
+    """SQLite queue of report jobs shared by workers in any number of processes.
+
+    Each job records the stage it has reached, so a job interrupted by a crash
+    or restart carries on from where it stopped. A worker claims a job with a
+    lease, which it renews while the job runs. Jobs whose lease has expired may
+    be claimed by another worker.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY,
+            session TEXT NOT NULL,
+            report_type TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            max_age REAL,
+            stage TEXT NOT NULL,
+            report_id TEXT,
+            document_id TEXT,
+            download_offset INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            worker TEXT,
+            lease_until REAL,
+            available_at REAL NOT NULL DEFAULT 0,
+            created REAL NOT NULL,
+            updated REAL NOT NULL
+        )
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        """Set the path of the database, creating it if it does not exist."""
+        self.path = Path(path)
+        with closing(self.connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(self.SCHEMA)
+
+    def connect(self) -> sqlite3.Connection:
+        """Return a connection to the database."""
+        connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Yield a connection in a transaction holding the database's write lock."""
+        with closing(self.connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def add(
+        self,
+        session_class: type[AmapiSession],
+        report_type: str,
+        destination: Path | str,
+        max_age: dt.timedelta | None = None,
+    ) -> int:
+        """Add a job to the queue and return its ID.
+
+        Args:
+            session_class (type[amapi.session.AmapiSession]): The session class of
+                the marketplace. It must be importable by its module and name.
+            report_type (str): The type of report to generate.
+            destination (pathlib.Path | str): The path to download the report to.
+            max_age (datetime.timedelta | None): The maximum age of an existing
+                report to reuse. Defaults to always creating a new report.
+        """
+        now = time.time()
+        with closing(self.connect()) as connection:
+            cursor = connection.execute(
+                "INSERT INTO jobs (session, report_type, destination, max_age, "
+                "stage, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session_path(session_class),
+                    report_type,
+                    str(destination),
+                    None if max_age is None else max_age.total_seconds(),
+                    GENERATE,
+                    now,
+                    now,
+                ),
+            )
+        return int(cursor.lastrowid or 0)
+
+    def get(self, job_id: int) -> StoredJob:
+        """Return a job."""
+        with closing(self.connect()) as connection:
+            row = connection.execute(
+                "SELECT * FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(job_id)
+        return StoredJob(**row)
+
+    def jobs(self, stage: str | None = None) -> list[StoredJob]:
+        """Return every job, or the jobs at stage, in the order they were added."""
+        with closing(self.connect()) as connection:
+            if stage is None:
+                rows = connection.execute("SELECT * FROM jobs ORDER BY id")
+            else:
+                rows = connection.execute(
+                    "SELECT * FROM jobs WHERE stage = ? ORDER BY id", (stage,)
+                )
+            return [StoredJob(**row) for row in rows]
+
+    def claim(self, worker: str, lease: float) -> StoredJob | None:
+        """Lease the oldest unfinished job available to a worker and return it.
+
+        Returns None if no job is available.
+        """
+        now = time.time()
+        with self.transaction() as connection:
+            row = connection.execute(
+                "SELECT id FROM jobs WHERE stage NOT IN (?, ?) AND available_at <= ? "
+                "AND (lease_until IS NULL OR lease_until < ?) ORDER BY id LIMIT 1",
+                (DONE, FAILED, now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE jobs SET worker = ?, lease_until = ?, updated = ? "
+                "WHERE id = ?",
+                (worker, now + lease, now, row["id"]),
+            )
+        return self.get(row["id"])
+
+    def update(self, job: StoredJob, **fields: Any) -> StoredJob:
+        """Set fields of a job leased by its worker and return the updated job.
+
+        Raises:
+            amapi.exceptions.JobLeaseLostError: If the job's lease has been taken
+                by another worker.
+        """
+        fields["updated"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with closing(self.connect()) as connection:
+            cursor = connection.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND worker = ?",
+                (*fields.values(), job.id, job.worker),
+            )
+        if cursor.rowcount == 0:
+            raise exceptions.JobLeaseLostError(job.id, str(job.worker))
+        return job._replace(**fields)
+
+    def renew(self, job: StoredJob, lease: float) -> StoredJob:
+        """Extend the lease of a job by lease seconds from now."""
+        return self.update(job, lease_until=time.time() + lease)
+
+    def release(self, job: StoredJob, **fields: Any) -> StoredJob:
+        """Give up the lease of a job, setting fields."""
+        return self.update(job, worker=None, lease_until=None, **fields)
+
+
+class Worker:
+    """Run the jobs of a JobQueue, one at a time, until stopped.
+
+    Each stage of a job is recorded in the queue as it finishes. A failed job
+    is retried after RETRY_DELAY seconds, doubling with each attempt, until it
+    has been attempted MAX_ATTEMPTS times. A report that fails to process is
+    requested again on the next attempt. Documents are downloaded in ranges
+    to a file beside the destination, so an interrupted download is resumed.
+    A job whose report is still being waited for when the worker is stopped is
+    released without counting as an attempt.
+    """
+
+    LEASE = 60.0
+    MAX_ATTEMPTS = 5
+    RETRY_DELAY = 30.0
+    IDLE_DELAY = 5.0
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        name: str | None = None,
+        lease: float | None = None,
+        max_attempts: int | None = None,
+        retry_delay: float | None = None,
+        idle_delay: float | None = None,
+        **options: Any,
+    ) -> None:
+        """Set the queue and options of the worker.
+
+        Args:
+            queue (amapi.jobs.JobQueue): The queue to take jobs from.
+            name (str | None): The name the worker leases jobs under. Defaults to
+                a unique name.
+            lease (float | None): Seconds a job's lease lasts without renewal.
+            max_attempts (int | None): Attempts made at a job before it fails.
+            retry_delay (float | None): Seconds before a failed job's first retry.
+            idle_delay (float | None): Seconds to wait when no job is available.
+            options: Polling options of amapi.request.ReportPoller.
+        """
+        self.poll_options = options
+        self.queue = queue
+        self.name = name or f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.lease = self.LEASE if lease is None else lease
+        self.max_attempts = self.MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self.retry_delay = self.RETRY_DELAY if retry_delay is None else retry_delay
+        self.idle_delay = self.IDLE_DELAY if idle_delay is None else idle_delay
+
+    @contextmanager
+    def heartbeat(self, job: StoredJob) -> Iterator[None]:
+        """Renew a job's lease and record download progress while it runs."""
+        stop = threading.Event()
+
+        def beat() -> None:
+            while not stop.wait(self.lease / 3):
+                try:
+                    self.queue.renew(job, self.lease)
+                    offset = download.downloaded_bytes(job.part_path)
+                    if offset:
+                        self.queue.update(job, download_offset=offset)
+                except (exceptions.JobLeaseLostError, OSError, sqlite3.Error):
+                    pass
+
+        thread = threading.Thread(target=beat, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def wait(
+        self,
+        session: AmapiSession,
+        job: StoredJob,
+        stop: threading.Event | None = None,
+    ) -> str:
+        """Wait for the report of a job to finish and return its document ID.
+
+        Raises:
+            amapi.exceptions.ReportPollStoppedError: If stop is set first.
+        """
+        poller = ReportPoller(session, stop=stop, **self.poll_options)
+        report = poller.poll(str(job.report_id))
+        return str(report["reportDocumentId"])
+
+    def download(self, session: AmapiSession, job: StoredJob) -> int:
+        """Download the document of a job to its destination."""
+        return download.download_document_ranged(
+            session, document_id=str(job.document_id), dest=job.destination
+        )
+
+    def run_job(self, job: StoredJob, stop: threading.Event | None = None) -> StoredJob:
+        """Run the remaining stages of a leased job.
+
+        Raises:
+            amapi.exceptions.ReportPollStoppedError: If stop is set while the
+                job's report is being waited for.
+        """
+        with load_session(job.session)() as session:
+            if job.stage == GENERATE:
+                max_age = None
+                if job.max_age is not None:
+                    max_age = dt.timedelta(seconds=job.max_age)
+                report_id = request_generate_report(
+                    session, report_type=job.report_type, max_age=max_age
+                )
+                job = self.queue.update(job, stage=WAIT, report_id=report_id)
+            if job.stage == WAIT:
+                document_id = self.wait(session, job, stop)
+                job = self.queue.update(job, stage=DOWNLOAD, document_id=document_id)
+            if job.stage == DOWNLOAD:
+                written = self.download(session, job)
+                job = self.queue.update(job, download_offset=written)
+        return self.queue.release(job, stage=DONE, error=None)
+
+    def handle_error(self, job: StoredJob, error: Exception) -> StoredJob:
+        """Record a failed attempt at a job, failing it if it has no attempts left."""
+        attempts = job.attempts + 1
+        fields: dict[str, Any] = {"attempts": attempts, "error": repr(error)}
+        if isinstance(error, exceptions.ReportProcessingError):
+            fields.update(stage=GENERATE, report_id=None, document_id=None)
+        if attempts >= self.max_attempts:
+            return self.queue.release(job, stage=FAILED, **fields)
+        delay = self.retry_delay * 2 ** (attempts - 1)
+        return self.queue.release(job, available_at=time.time() + delay, **fields)
+
+    def run_once(self, stop: threading.Event | None = None) -> bool:
+        """Claim and run one job, returning False if none were available.
+
+        If stop is set while the job's report is being waited for, the job is
+        released to be resumed later.
+        """
+        job = self.queue.claim(self.name, self.lease)
+        if job is None:
+            return False
+        try:
+            with self.heartbeat(job):
+                self.run_job(job, stop)
+        except exceptions.JobLeaseLostError:
+            pass
+        except exceptions.ReportPollStoppedError:
+            try:
+                self.queue.release(job)
+            except exceptions.JobLeaseLostError:
+                pass
+        except Exception as error:
+            try:
+                self.handle_error(job, error)
+            except exceptions.JobLeaseLostError:
+                pass
+        return True
+
+    def run(self, stop: threading.Event | None = None) -> None:
+        """Run jobs until stop is set, waiting idle_delay when none are available.
+
+        If stop is None jobs are run until none are available. A job waiting for
+        its report when stop is set is released rather than finished.
+        """
+        while stop is None or not stop.is_set():
+            if self.run_once(stop):
+                continue
+            if stop is None:
+                return
+            stop.wait(self.idle_delay)
+
+
+def run_workers(
+    queue: JobQueue,
+    workers: int = 1,
+    stop: threading.Event | None = None,
+    **options: Any,
+) -> None:
+    """Run workers concurrently over a queue until stop is set.
+
+    Args:
+        queue (amapi.jobs.JobQueue): The queue to take jobs from.
+        workers (int): The number of workers to run.
+        stop (threading.Event | None): Set to stop the workers once their current
+            jobs finish. If None the workers stop when no jobs are available.
+        options: Options of amapi.jobs.Worker.
+    """
+    threads = [
+        threading.Thread(target=Worker(queue, **options).run, args=(stop,))
+        for _ in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Add jobs to a queue or run workers over it from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("database", help="The path of the job queue database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="Add a job to the queue.")
+    add.add_argument("session", help="Import path of the session class.")
+    add.add_argument("report_type")
+    add.add_argument("destination")
+    add.add_argument("--max-age", type=float, help="Seconds.")
+    work = commands.add_parser("work", help="Run workers until stopped.")
+    work.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+    queue = JobQueue(args.database)
+    if args.command == "add":
+        max_age = None if args.max_age is None else dt.timedelta(seconds=args.max_age)
+        job_id = queue.add(
+            load_session(args.session), args.report_type, args.destination, max_age
+        )
+        print(job_id)
+        return
+    stop = threading.Event()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signal_number, lambda *args: stop.set())
+    run_workers(queue, workers=args.workers, stop=stop)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""Timing instrumentation for amapi requests."""
+
+import abc
+import bisect
+import math
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, NamedTuple
+
+from sp_api.base import SellingApiException
+
+from .atomic import AtomicWriter
+
+CLIENT = "client"
+RATE_LIMIT = "rate_limit"
+REQUEST = "request"
+RESPONSE = "response"
+WAIT = "wait"
+DOWNLOAD = "download"
+
+OK = "ok"
+
+
+class Event(NamedTuple):
+    """The time taken by one stage of a request."""
+
+    stage: str
+    operation: str
+    marketplace: str | None
+    duration: float
+    status: str = OK
+    bytes: int | None = None
+
+
+Listener = Callable[[Event], None]
+
+
+def error_status(error: BaseException) -> str:
+    """Return the status recorded for a stage that raised error."""
+    if isinstance(error, SellingApiException):
+        return str(error.code)
+    return type(error).__name__
+
+
+class Measurement:
+    """Details of a stage being timed that are known only once it has run."""
+
+    def __init__(self) -> None:
+        """Set the stage's status to OK."""
+        self.status = OK
+        self.bytes: int | None = None
+
+
+class Instrumentation:
+    """Time request stages and pass an Event for each to every listener."""
+
+    def __init__(self) -> None:
+        """Create instrumentation without listeners."""
+        self.listeners: list[Listener] = []
+
+    def add_listener(self, listener: Listener) -> None:
+        """Call listener with every event."""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: Listener) -> None:
+        """Stop calling listener with events."""
+        self.listeners.remove(listener)
+
+    def emit(self, event: Event) -> None:
+        """Pass an event to every listener."""
+        for listener in list(self.listeners):
+            listener(event)
+
+    @contextmanager
+    def time(
+        self, stage: str, operation: str, marketplace: str | None = None
+    ) -> Iterator[Measurement]:
+        """Time the body of a with block as a stage of an operation.
+
+        An error raised in the block is recorded as the stage's status. The
+        number of bytes transferred may be set on the yielded Measurement.
+        """
+        measurement = Measurement()
+        start = time.perf_counter()
+        try:
+            yield measurement
+        except BaseException as error:
+            measurement.status = error_status(error)
+            raise
+        finally:
+            if self.listeners:
+                self.emit(
+                    Event(
+                        stage=stage,
+                        operation=operation,
+                        marketplace=marketplace,
+                        duration=time.perf_counter() - start,
+                        status=measurement.status,
+                        bytes=measurement.bytes,
+                    )
+                )
+
+
+instrumentation = Instrumentation()
+
+
+class Histogram:
+    """Counts of observed durations in cumulative buckets of upper bounds."""
+
+    BUCKETS = (
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+        30.0,
+        60.0,
+        120.0,
+        300.0,
+        600.0,
+        1800.0,
+    )
+
+    def __init__(self, buckets: tuple[float, ...] | None = None) -> None:
+        """Create an empty histogram."""
+        self.buckets = tuple(sorted(self.BUCKETS if buckets is None else buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add an observed value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative_counts(self) -> list[tuple[float, int]]:
+        """Return (upper bound, count of values not above it) for each bucket."""
+        bounds = self.buckets + (math.inf,)
+        totals = []
+        total = 0
+        for bound, count in zip(bounds, self.counts, strict=False):
+            total += count
+            totals.append((bound, total))
+        return totals
+
+    def quantile(self, q: float) -> float:
+        """Return the upper bound of the bucket containing the q quantile.
+
+        Returns NaN if nothing has been observed. Values above the largest
+        bucket are reported as the largest value observed.
+        """
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        for bound, total in self.cumulative_counts():
+            if total >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+MetricKey = tuple[str, str, str | None, str]
+
+
+class HistogramCollector:
+    """Listener keeping histograms of the durations of events.
+
+    A histogram and a total of bytes transferred are kept for each combination
+    of stage, operation, marketplace and status.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] | None = None) -> None:
+        """Create an empty collector."""
+        self.buckets = buckets
+        self.histograms: dict[MetricKey, Histogram] = {}
+        self.bytes: dict[MetricKey, int] = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, event: Event) -> None:
+        """Record an event."""
+        key = (event.stage, event.operation, event.marketplace, event.status)
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(self.buckets)
+            self.histograms[key].observe(event.duration)
+            if event.bytes is not None:
+                self.bytes[key] = self.bytes.get(key, 0) + event.bytes
+
+    def clear(self) -> None:
+        """Forget all recorded events."""
+        with self.lock:
+            self.histograms.clear()
+            self.bytes.clear()
+
+
+class MetricsExporter(abc.ABC):
+    """Base class for exporting the metrics of a HistogramCollector."""
+
+    @abc.abstractmethod
+    def export(self, collector: HistogramCollector) -> None:
+        """Export the current metrics of collector."""
+
+
+class PrometheusExporter(MetricsExporter):
+    """Write metrics in the Prometheus text exposition format.
+
+    The file is replaced atomically, so it can be read by the node exporter's
+    textfile collector.
+    """
+
+    NAME = "amapi_stage_duration_seconds"
+    BYTES_NAME = "amapi_stage_bytes_total"
+
+    def __init__(self, path: Path | str) -> None:
+        """Set the path of the file to write."""
+        self.path = Path(path)
+
+    @staticmethod
+    def labels(key: MetricKey, **extra: str) -> str:
+        """Return the label set for a metric key."""
+        stage, operation, marketplace, status = key
+        labels = {
+            "stage": stage,
+            "operation": operation,
+            "marketplace": marketplace or "",
+            "status": status,
+            **extra,
+        }
+        return ",".join(
+            name + '="' + PrometheusExporter.escape(value) + '"'
+            for name, value in labels.items()
+        )
+
+    @staticmethod
+    def escape(value: str) -> str:
+        """Return a label value escaped for the exposition format."""
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    def render(self, collector: HistogramCollector) -> str:
+        """Return the metrics of collector as text."""
+        lines = [f"# TYPE {self.NAME} histogram"]
+        with collector.lock:
+            histograms = sorted(collector.histograms.items(), key=str)
+            transferred = sorted(collector.bytes.items(), key=str)
+            for key, histogram in histograms:
+                for bound, total in histogram.cumulative_counts():
+                    le = "+Inf" if bound == math.inf else repr(bound)
+                    labels = self.labels(key, le=le)
+                    lines.append(f"{self.NAME}_bucket{{{labels}}} {total}")
+                labels = self.labels(key)
+                lines.append(f"{self.NAME}_sum{{{labels}}} {histogram.sum!r}")
+                lines.append(f"{self.NAME}_count{{{labels}}} {histogram.count}")
+        lines.append(f"# TYPE {self.BYTES_NAME} counter")
+        for key, total in transferred:
+            lines.append(f"{self.BYTES_NAME}{{{self.labels(key)}}} {total}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, collector: HistogramCollector) -> None:
+        """Write the metrics of collector to the file."""
+        with AtomicWriter(self.path, "w") as f:
+            f.write(self.render(collector))
+
+
+class StatsdListener:
+    """Listener sending each event to StatsD as a timing over UDP.
+
+    Metric names are "<prefix>.<stage>.<operation>.<marketplace>.<status>".
+    Bytes transferred are sent as a counter with the suffix ".bytes".
+    """
+
+    PREFIX = "amapi"
+
+    def __init__(
+        self, host: str = "localhost", port: int = 8125, prefix: str | None = None
+    ) -> None:
+        """Set the address of the StatsD server."""
+        self.address = (host, port)
+        self.prefix = self.PREFIX if prefix is None else prefix
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def name(self, event: Event) -> str:
+        """Return the metric name of an event."""
+        parts = (
+            self.prefix,
+            event.stage,
+            event.operation,
+            event.marketplace or "none",
+            event.status,
+        )
+        return ".".join(part for part in parts if part)
+
+    def __call__(self, event: Event) -> None:
+        """Send an event."""
+        name = self.name(event)
+        lines = [f"{name}:{event.duration * 1000:.3f}|ms"]
+        if event.bytes is not None:
+            lines.append(f"{name}.bytes:{event.bytes}|c")
+        try:
+            self.socket.sendto("\n".join(lines).encode("utf8"), self.address)
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        """Close the socket."""
+        self.socket.close()
@@ -0,0 +1,340 @@
+"""Parsers for tab-separated report documents."""
+
+import csv
+import io
+import itertools
+import math
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, TypeAlias
+
+from .request import GET_FBA_ESTIMATE_FEES_REPORT
+
+STRING = "string"
+DECIMAL = "decimal"
+INTEGER = "integer"
+
+CHUNK_ROWS = 10_000
+ENCODING = "utf-8"
+
+Column: TypeAlias = "array[float] | array[int] | list[str]"
+
+
+def to_decimal(value: str) -> float:
+    """Return value as a float, or NaN if it is empty or not a number."""
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+
+def to_integer(value: str) -> int:
+    """Return value as an int, or 0 if it is empty or not a number."""
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+class ReportSchema:
+    """The column types of a report.
+
+    Columns not listed in columns have the type default. STRING columns are
+    stored as lists of interned strings, DECIMAL columns as float64 arrays and
+    INTEGER columns as int64 arrays. Reports covering several marketplaces are
+    split by the value of the marketplace column.
+    """
+
+    TYPECODES = {DECIMAL: "d", INTEGER: "q"}
+    CONVERTERS: dict[str, Callable[[str], Any]] = {
+        STRING: sys.intern,
+        DECIMAL: to_decimal,
+        INTEGER: to_integer,
+    }
+
+    def __init__(
+        self,
+        columns: dict[str, str] | None = None,
+        key: str | None = None,
+        default: str = STRING,
+        marketplace: str | None = None,
+    ) -> None:
+        """Set column types and the columns identifying each row and its marketplace."""
+        self.columns = columns or {}
+        self.key = key
+        self.default = default
+        self.marketplace = marketplace
+
+    def column_type(self, name: str) -> str:
+        """Return the type of a column."""
+        return self.columns.get(name, self.default)
+
+    def new_column(self, name: str) -> Column:
+        """Return an empty container for a column."""
+        column_type = self.column_type(name)
+        if column_type in self.TYPECODES:
+            return array(self.TYPECODES[column_type])  # type: ignore[return-value]
+        return []
+
+    def converter(self, name: str) -> Callable[[str], Any]:
+        """Return the function converting text values of a column."""
+        return self.CONVERTERS[self.column_type(name)]
+
+
+FBA_FEES_SCHEMA = ReportSchema(
+    key="sku",
+    marketplace="amazon-store",
+    columns={
+        "your-price": DECIMAL,
+        "sales-price": DECIMAL,
+        "longest-side": DECIMAL,
+        "median-side": DECIMAL,
+        "shortest-side": DECIMAL,
+        "length-and-girth": DECIMAL,
+        "item-package-weight": DECIMAL,
+        "estimated-fee-total": DECIMAL,
+        "estimated-referral-fee-per-unit": DECIMAL,
+        "estimated-variable-closing-fee": DECIMAL,
+        "estimated-order-handling-fee-per-order": DECIMAL,
+        "estimated-pick-pack-fee-per-unit": DECIMAL,
+        "estimated-weight-handling-fee-per-unit": DECIMAL,
+        "expected-fulfillment-fee-per-unit": DECIMAL,
+        "expected-domestic-fulfilment-fee-per-unit": DECIMAL,
+        "expected-efn-fulfilment-fee-per-unit-uk": DECIMAL,
+        "expected-efn-fulfilment-fee-per-unit-de": DECIMAL,
+        "expected-efn-fulfilment-fee-per-unit-fr": DECIMAL,
+        "expected-efn-fulfilment-fee-per-unit-it": DECIMAL,
+        "expected-efn-fulfilment-fee-per-unit-es": DECIMAL,
+    },
+)
+
+SCHEMAS: dict[str, ReportSchema] = {GET_FBA_ESTIMATE_FEES_REPORT: FBA_FEES_SCHEMA}
+
+
+def register_schema(report_type: str, schema: ReportSchema) -> None:
+    """Set the schema used to parse reports of report_type."""
+    SCHEMAS[report_type] = schema
+
+
+def get_schema(report_type: str | None) -> ReportSchema:
+    """Return the schema for report_type, or a schema of string columns."""
+    if report_type is None:
+        return ReportSchema()
+    return SCHEMAS.get(report_type, ReportSchema())
+
+
+class ReportTable:
+    """Columnar report data."""
+
+    def __init__(self, schema: ReportSchema, header: list[str]) -> None:
+        """Create an empty table with the columns in header."""
+        self.schema = schema
+        self.header = header
+        self.columns: dict[str, Column] = {
+            name: schema.new_column(name) for name in header
+        }
+
+    def __len__(self) -> int:
+        if not self.header:
+            return 0
+        return len(self.columns[self.header[0]])
+
+    def __getitem__(self, name: str) -> Column:
+        return self.columns[name]
+
+    def append_rows(self, rows: list[list[str]]) -> None:
+        """Convert rows of text values and add them to the table."""
+        if not rows:
+            return
+        width = len(self.header)
+        rows = [
+            row + [""] * (width - len(row)) if len(row) < width else row for row in rows
+        ]
+        for name, values in zip(self.header, zip(*rows, strict=False), strict=False):
+            self.columns[name].extend(map(self.schema.converter(name), values))
+
+    def extend(self, other: "ReportTable") -> None:
+        """Add the rows of another table with the same columns."""
+        for name in self.header:
+            self.columns[name].extend(other.columns[name])  # type: ignore[arg-type]
+
+    def select(self, indices: Iterable[int]) -> "ReportTable":
+        """Return a new table containing the rows at indices."""
+        indices = list(indices)
+        table = ReportTable(self.schema, self.header)
+        for name in self.header:
+            values = [self.columns[name][index] for index in indices]
+            table.columns[name].extend(values)  # type: ignore[arg-type]
+        return table
+
+    def row_values(self, index: int) -> tuple[Any, ...]:
+        """Return the values of one row as a tuple."""
+        return tuple(self.columns[name][index] for name in self.header)
+
+    def row(self, index: int) -> dict[str, Any]:
+        """Return one row as a dict."""
+        return {name: self.columns[name][index] for name in self.header}
+
+    def rows(self) -> Iterator[dict[str, Any]]:
+        """Yield each row as a dict."""
+        for index in range(len(self)):
+            yield self.row(index)
+
+
+def _row_key(values: tuple[Any, ...]) -> tuple[Any, ...]:
+    return tuple(
+        None if isinstance(value, float) and math.isnan(value) else value
+        for value in values
+    )
+
+
+def stitch_tables(tables: Iterable[ReportTable]) -> ReportTable:
+    """Concatenate tables in order, dropping rows repeated from earlier tables.
+
+    Rows are compared by all of their values, with empty DECIMAL values equal
+    to each other. A row is only dropped if an identical row was in an earlier
+    table, so repeated rows within one table are kept.
+    """
+    result: ReportTable | None = None
+    seen: set[tuple[Any, ...]] = set()
+    for table in tables:
+        rows = [_row_key(table.row_values(index)) for index in range(len(table))]
+        keep = [index for index, row in enumerate(rows) if row not in seen]
+        seen.update(rows)
+        if result is None:
+            result = table.select(keep)
+        else:
+            result.extend(table.select(keep))
+    if result is None:
+        return ReportTable(ReportSchema(), [])
+    return result
+
+
+def _open_text(source: BinaryIO | Path | str, encoding: str) -> io.TextIOWrapper:
+    if isinstance(source, (str, Path)):
+        return open(source, encoding=encoding, errors="replace", newline="")
+    return io.TextIOWrapper(source, encoding=encoding, errors="replace", newline="")
+
+
+def _batches(rows: Iterable[list[str]], size: int) -> Iterator[list[list[str]]]:
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def parse_report_chunks(
+    source: BinaryIO | Path | str,
+    report_type: str | None = None,
+    chunk_rows: int = CHUNK_ROWS,
+    encoding: str = ENCODING,
+) -> Iterator[ReportTable]:
+    """Yield a report document as tables of at most chunk_rows rows.
+
+    Args:
+        source (BinaryIO | pathlib.Path | str): The path of a report document or a
+            binary file-like object containing one.
+        report_type (str | None): The type of the report, used to find its schema.
+        chunk_rows (int): The maximum number of rows in each table.
+        encoding (str): The encoding of the document.
+    """
+    schema = get_schema(report_type)
+    text = _open_text(source, encoding)
+    try:
+        reader = csv.reader(text, delimiter="\t", quoting=csv.QUOTE_NONE)
+        header = next(reader, None)
+        if header is None:
+            return
+        header = [sys.intern(name.strip()) for name in header]
+        empty = True
+        for batch in _batches(reader, chunk_rows):
+            table = ReportTable(schema, header)
+            table.append_rows(batch)
+            empty = False
+            yield table
+        if empty:
+            yield ReportTable(schema, header)
+    finally:
+        if isinstance(source, (str, Path)):
+            text.close()
+        else:
+            text.detach()
+
+
+def parse_report(
+    source: BinaryIO | Path | str,
+    report_type: str | None = None,
+    chunk_rows: int = CHUNK_ROWS,
+    encoding: str = ENCODING,
+) -> ReportTable:
+    """Return the contents of a report document as a ReportTable.
+
+    Args:
+        source (BinaryIO | pathlib.Path | str): The path of a report document or a
+            binary file-like object containing one.
+        report_type (str | None): The type of the report, used to find its schema.
+        chunk_rows (int): The number of rows to convert at a time.
+        encoding (str): The encoding of the document.
+    """
+    chunks = parse_report_chunks(
+        source, report_type=report_type, chunk_rows=chunk_rows, encoding=encoding
+    )
+    table = next(chunks, None)
+    if table is None:
+        return ReportTable(get_schema(report_type), [])
+    for chunk in chunks:
+        table.extend(chunk)
+    return table
+
+
+def split_by_marketplace(
+    table: ReportTable, column: str | None = None
+) -> dict[str, ReportTable]:
+    """Return the rows of a report covering several marketplaces by marketplace.
+
+    Tables are keyed by the values of the marketplace column, in the order the
+    values first appear.
+
+    Args:
+        table (amapi.parser.ReportTable): A report covering several marketplaces.
+        column (str | None): The column naming the marketplace of each row.
+            Defaults to the marketplace column of the table's schema.
+    """
+    column = column or table.schema.marketplace
+    if column is None:
+        raise ValueError("A marketplace column is needed to split reports.")
+    indices: dict[str, list[int]] = {}
+    for index, value in enumerate(table[column]):
+        indices.setdefault(str(value), []).append(index)
+    return {value: table.select(rows) for value, rows in indices.items()}
+
+
+def parse_report_by_marketplace(
+    source: BinaryIO | Path | str,
+    report_type: str | None = None,
+    column: str | None = None,
+    chunk_rows: int = CHUNK_ROWS,
+    encoding: str = ENCODING,
+) -> dict[str, ReportTable]:
+    """Return a report document covering several marketplaces by marketplace.
+
+    Args:
+        source (BinaryIO | pathlib.Path | str): The path of a report document or a
+            binary file-like object containing one.
+        report_type (str | None): The type of the report, used to find its schema.
+        column (str | None): The column naming the marketplace of each row.
+            Defaults to the marketplace column of the report type's schema.
+        chunk_rows (int): The number of rows to convert at a time.
+        encoding (str): The encoding of the document.
+    """
+    tables: dict[str, ReportTable] = {}
+    chunks = parse_report_chunks(
+        source, report_type=report_type, chunk_rows=chunk_rows, encoding=encoding
+    )
+    for chunk in chunks:
+        for value, table in split_by_marketplace(chunk, column).items():
+            if value in tables:
+                tables[value].extend(table)
+            else:
+                tables[value] = table
+    return tables
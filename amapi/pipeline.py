@@ -0,0 +1,76 @@
+"""Concurrent report pipelines for amapi."""
+
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Iterable, NamedTuple
+
+from .request import download_document, request_generate_report, wait_for_report
+from .session import AmapiSession
+
+
+class ReportJob(NamedTuple):
+    """A report to generate and the destination to download it to.
+
+    If max_age is set, a finished report no older than max_age is reused.
+    """
+
+    session: type[AmapiSession]
+    report_type: str
+    destination: Path | str | BinaryIO
+    max_age: dt.timedelta | None = None
+
+
+class JobResult(NamedTuple):
+    """The outcome of running a ReportJob."""
+
+    job: ReportJob
+    document_id: str | None = None
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the job completed without error, otherwise False."""
+        return self.error is None
+
+
+def fetch_report(job: ReportJob) -> str:
+    """Generate a report, download it and return its document ID.
+
+    Args:
+        job (amapi.pipeline.ReportJob): The report to fetch.
+    """
+    with job.session() as session:
+        report_id = request_generate_report(
+            session, report_type=job.report_type, max_age=job.max_age
+        )
+        document_id = wait_for_report(session, report_id=report_id)
+        download_document(session, document_id=document_id, dest=job.destination)
+    return document_id
+
+
+def run_job(job: ReportJob) -> JobResult:
+    """Run a job, returning its result or the error it raised."""
+    try:
+        return JobResult(job=job, document_id=fetch_report(job))
+    except Exception as error:
+        return JobResult(job=job, error=error)
+
+
+def run_pipeline(
+    jobs: Iterable[ReportJob], max_workers: int | None = None
+) -> list[JobResult]:
+    """Run report jobs concurrently and return their results in the order given.
+
+    A job that fails does not stop the others, its error is returned in its result.
+
+    Args:
+        jobs (Iterable[amapi.pipeline.ReportJob]): The reports to fetch.
+        max_workers (int | None): The maximum number of jobs to run at once.
+            Defaults to running every job at once.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers or len(jobs)) as executor:
+        return list(executor.map(run_job, jobs))
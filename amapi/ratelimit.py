@@ -0,0 +1,117 @@
+"""Rate limiting for amapi requests."""
+
+import threading
+import time
+from typing import Any, Hashable
+
+RATE_LIMIT_HEADER = "x-amzn-RateLimit-Limit"
+
+
+class TokenBucket:
+    """Token bucket allowing up to burst requests at once, refilling at rate per second.
+
+    Tokens are reserved rather than waited for, so a bucket may hold a negative
+    number of tokens. Each caller is told how long to wait for its reservation,
+    which queues concurrent callers in the order they arrive.
+    """
+
+    def __init__(self, rate: float, burst: float) -> None:
+        """Create a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Reserve a token and return the number of seconds to wait before using it."""
+        with self.lock:
+            self._refill()
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def set_rate(self, rate: float) -> None:
+        """Change the rate at which the bucket refills."""
+        with self.lock:
+            self._refill()
+            self.rate = rate
+
+    def empty(self) -> None:
+        """Remove all available tokens."""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0)
+
+
+class RateLimiter:
+    """Schedule requests within the rate limits of each operation and key.
+
+    Keys identify who a limit applies to, such as a region or a selling partner
+    and application in a region. Limits start at the documented usage plan for
+    each operation in LIMITS and are updated from the x-amzn-RateLimit-Limit
+    header of each response. Operations without a known limit are not limited.
+    """
+
+    LIMITS: dict[str, tuple[float, float]] = {
+        "create_report": (0.0167, 15),
+        "get_report": (2.0, 15),
+        "get_reports": (0.0222, 10),
+        "get_report_document": (0.0167, 15),
+        "cancel_report": (0.0222, 10),
+    }
+
+    def __init__(self, limits: dict[str, tuple[float, float]] | None = None) -> None:
+        """Set the (rate, burst) limits for each operation."""
+        self.limits = dict(self.LIMITS if limits is None else limits)
+        self.buckets: dict[tuple[str, Hashable], TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def get_bucket(self, operation: str, region: Hashable) -> TokenBucket | None:
+        """Return the token bucket for an operation and key, such as a region."""
+        if operation not in self.limits:
+            return None
+        key = (operation, region)
+        with self.lock:
+            if key not in self.buckets:
+                self.buckets[key] = TokenBucket(*self.limits[operation])
+            return self.buckets[key]
+
+    def reserve(self, operation: str, region: Hashable) -> float:
+        """Reserve a request and return the number of seconds to wait before making it."""
+        bucket = self.get_bucket(operation, region)
+        if bucket is None:
+            return 0.0
+        return bucket.reserve()
+
+    def wait(self, operation: str, region: Hashable) -> None:
+        """Block until a request may be made."""
+        delay = self.reserve(operation, region)
+        if delay > 0:
+            time.sleep(delay)
+
+    def update(self, operation: str, region: Hashable, response: Any) -> None:
+        """Update the rate of an operation from the rate limit header of a response."""
+        headers = getattr(response, "headers", None) or {}
+        try:
+            rate = float(headers[RATE_LIMIT_HEADER])
+        except (KeyError, TypeError, ValueError):
+            return
+        bucket = self.get_bucket(operation, region)
+        if bucket is not None and rate > 0:
+            bucket.set_rate(rate)
+
+    def throttled(self, operation: str, region: Hashable) -> None:
+        """Record that a request was throttled, holding back further requests."""
+        bucket = self.get_bucket(operation, region)
+        if bucket is not None:
+            bucket.empty()
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,261 @@
+"""Sessions for many seller accounts in one process."""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Iterator, NamedTuple
+
+from sp_api.base import Marketplaces
+
+from . import exceptions
+from .session import AmapiSession
+
+SessionKey = tuple[str, Marketplaces]
+
+
+class SellerCredentials(NamedTuple):
+    """The LWA credentials of a seller account."""
+
+    refresh_token: str
+    app_id: str
+    client_secret: str
+
+
+CredentialsLoader = Callable[[str, Marketplaces], SellerCredentials | None]
+
+
+class SessionRegistry:
+    """Thread safe pool of sessions keyed by seller and marketplace.
+
+    Each session holds its own credentials and cached clients, so requests for
+    different sellers can run at once from different threads. Credentials are
+    registered with register or, for sellers not registered, returned by the
+    loader. Sessions unused for IDLE_TIMEOUT seconds are evicted, as are the
+    least recently used sessions when there are more than MAX_SESSIONS, and
+    their clients are closed. An evicted session is created again the next
+    time it is requested.
+
+    Sessions held with use are in use until the block exits. They are not
+    evicted while in use, and a session removed while in use keeps its clients
+    open until it is released.
+    """
+
+    IDLE_TIMEOUT = 900.0
+    MAX_SESSIONS = 1000
+    SESSION_CLASS: type[AmapiSession] = AmapiSession
+
+    def __init__(
+        self,
+        loader: CredentialsLoader | None = None,
+        idle_timeout: float | None = None,
+        max_sessions: int | None = None,
+        session_class: type[AmapiSession] | None = None,
+    ) -> None:
+        """Set registry options.
+
+        Args:
+            loader (Callable | None): Called with a seller and marketplace to
+                return their credentials, or None, when they are not registered.
+            idle_timeout (float | None): Seconds after which an unused session
+                is evicted.
+            max_sessions (int | None): The most sessions to keep at once.
+            session_class (type[amapi.session.AmapiSession] | None): The class
+                of the sessions created.
+        """
+        self.loader = loader
+        self.idle_timeout = self.IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.max_sessions = self.MAX_SESSIONS if max_sessions is None else max_sessions
+        self.session_class = session_class or self.SESSION_CLASS
+        self.credentials: dict[SessionKey, SellerCredentials] = {}
+        self.sessions: OrderedDict[SessionKey, tuple[AmapiSession, float]] = (
+            OrderedDict()
+        )
+        self.users: dict[AmapiSession, int] = {}
+        self.removed: set[AmapiSession] = set()
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __contains__(self, key: SessionKey) -> bool:
+        return key in self.sessions
+
+    def register(
+        self,
+        seller: str,
+        marketplace: Marketplaces,
+        refresh_token: str,
+        app_id: str,
+        client_secret: str,
+    ) -> None:
+        """Set the credentials of a seller in a marketplace.
+
+        A session already created for the seller is replaced when next requested.
+        """
+        key = (seller, marketplace)
+        with self.lock:
+            self.credentials[key] = SellerCredentials(
+                refresh_token, app_id, client_secret
+            )
+            self.discard(key)
+
+    def unregister(self, seller: str, marketplace: Marketplaces) -> None:
+        """Remove the credentials and session of a seller in a marketplace."""
+        key = (seller, marketplace)
+        with self.lock:
+            self.credentials.pop(key, None)
+            self.discard(key)
+
+    def get_credentials(
+        self, seller: str, marketplace: Marketplaces
+    ) -> SellerCredentials:
+        """Return the credentials of a seller in a marketplace.
+
+        Raises:
+            amapi.exceptions.SellerNotRegisteredError: If the seller has no
+                credentials for the marketplace.
+        """
+        credentials = self.credentials.get((seller, marketplace))
+        if credentials is None and self.loader is not None:
+            credentials = self.loader(seller, marketplace)
+        if credentials is None:
+            raise exceptions.SellerNotRegisteredError(seller, marketplace.name)
+        return credentials
+
+    def get(self, seller: str, marketplace: Marketplaces) -> AmapiSession:
+        """Return the session of a seller in a marketplace.
+
+        The session is evicted, and its clients closed, once it is idle or
+        least recently used. Use use to hold a session for as long as requests
+        are made with it.
+
+        Raises:
+            amapi.exceptions.SellerNotRegisteredError: If the seller has no
+                credentials for the marketplace.
+        """
+        return self.checkout(seller, marketplace, hold=False)
+
+    @contextmanager
+    def use(self, seller: str, marketplace: Marketplaces) -> Iterator[AmapiSession]:
+        """Hold the session of a seller in a marketplace while the block runs.
+
+        The session is not evicted until the block exits, and its idle time is
+        counted from then.
+
+        Raises:
+            amapi.exceptions.SellerNotRegisteredError: If the seller has no
+                credentials for the marketplace.
+        """
+        session = self.checkout(seller, marketplace, hold=True)
+        try:
+            yield session
+        finally:
+            self.release((seller, marketplace), session)
+
+    def checkout(
+        self, seller: str, marketplace: Marketplaces, hold: bool
+    ) -> AmapiSession:
+        """Return the session of a seller in a marketplace, creating it if needed.
+
+        Credentials are loaded without holding the registry's lock, so a slow
+        loader does not delay requests for other sellers. If hold is True the
+        session is marked as in use.
+        """
+        key = (seller, marketplace)
+        with self.lock:
+            self.evict_idle()
+            session = self.touch(key, hold)
+            if session is not None:
+                return session
+        credentials = self.get_credentials(seller, marketplace)
+        with self.lock:
+            session = self.touch(key, hold)
+            if session is not None:
+                return session
+            credentials = self.credentials.get(key, credentials)
+            session = self.session_class(
+                refresh_token=credentials.refresh_token,
+                app_id=credentials.app_id,
+                client_secret=credentials.client_secret,
+                marketplace=marketplace,
+            )
+            self.sessions[key] = (session, time.monotonic())
+            if hold:
+                self.users[session] = self.users.get(session, 0) + 1
+            self.evict_least_recently_used()
+            return session
+
+    def touch(self, key: SessionKey, hold: bool) -> AmapiSession | None:
+        """Mark a pooled session as used now and return it, or None if not pooled."""
+        cached = self.sessions.pop(key, None)
+        if cached is None:
+            return None
+        session = cached[0]
+        self.sessions[key] = (session, time.monotonic())
+        if hold:
+            self.users[session] = self.users.get(session, 0) + 1
+        return session
+
+    def release(self, key: SessionKey, session: AmapiSession) -> None:
+        """Mark a session held by use as no longer in use by one holder."""
+        with self.lock:
+            self.users[session] -= 1
+            if self.users[session]:
+                return
+            del self.users[session]
+            if session not in self.removed:
+                self.touch(key, hold=False)
+                return
+            self.removed.discard(session)
+        session.clear_clients()
+
+    def in_use(self, key: SessionKey) -> bool:
+        """Return True if the pooled session for key is held by use."""
+        cached = self.sessions.get(key)
+        return cached is not None and cached[0] in self.users
+
+    def evict_idle(self, now: float | None = None) -> list[SessionKey]:
+        """Evict sessions not in use and unused for longer than the idle timeout.
+
+        Returns the keys of the sessions evicted.
+        """
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            evicted = []
+            for key, (_, last_used) in self.sessions.items():
+                if now - last_used <= self.idle_timeout:
+                    break
+                if not self.in_use(key):
+                    evicted.append(key)
+            for key in evicted:
+                self.discard(key)
+            return evicted
+
+    def evict_least_recently_used(self) -> None:
+        """Evict the least recently used sessions not in use above max_sessions."""
+        with self.lock:
+            excess = len(self.sessions) - self.max_sessions
+            if excess <= 0:
+                return
+            evicted = [key for key in self.sessions if not self.in_use(key)]
+            for key in evicted[:excess]:
+                self.discard(key)
+
+    def discard(self, key: SessionKey) -> None:
+        """Remove a session, closing its clients once it is no longer in use."""
+        with self.lock:
+            cached = self.sessions.pop(key, None)
+            if cached is None:
+                return
+            session = cached[0]
+            if session in self.users:
+                self.removed.add(session)
+                return
+        session.clear_clients()
+
+    def clear(self) -> None:
+        """Remove all sessions, keeping registered credentials."""
+        with self.lock:
+            for key in list(self.sessions):
+                self.discard(key)
@@ -1,45 +1,172 @@
 """Amapi requests."""
 
 import datetime as dt
-from typing import Any
-
+import hashlib
+import random
+import shutil
+import threading
+import time
+import zlib
+from enum import StrEnum
+from pathlib import Path
+from typing import Any, BinaryIO, ContextManager, Iterator, Sequence
+
+import requests
 from sp_api.api import Reports
-from sp_api.base import ApiResponse, Client
-
+from sp_api.base import (
+    ApiResponse,
+    Client,
+    Marketplaces,
+    SellingApiException,
+    SellingApiRequestThrottledException,
+)
+
+from . import exceptions, metrics
+from .cache import DocumentCache
+from .ratelimit import RateLimiter, rate_limiter
+from .retry import RetryPolicy
 from .session import AmapiSession
+from .transport import Transport, transport
 
 GET_FBA_ESTIMATE_FEES_REPORT = "GET_FBA_ESTIMATED_FBA_FEES_TXT_DATA"
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_TIMEOUT = 60.0
+WINDOW_TOLERANCE = dt.timedelta(minutes=5)
+
+
+class ProcessingStatus(StrEnum):
+    """Processing statuses of a requested report."""
+
+    IN_QUEUE = "IN_QUEUE"
+    IN_PROGRESS = "IN_PROGRESS"
+    DONE = "DONE"
+    CANCELLED = "CANCELLED"
+    FATAL = "FATAL"
+
+
+def request_marketplaces(
+    session: AmapiSession, marketplaces: Sequence[Marketplaces] | None = None
+) -> list[Marketplaces]:
+    """Return the marketplaces a request covers.
+
+    Args:
+        session (amapi.session.AmapiSession): A session instance.
+        marketplaces (Sequence[sp_api.base.Marketplaces] | None): Marketplaces in
+            the region of the session's marketplace. Defaults to the session's
+            marketplace.
+
+    Raises:
+        amapi.exceptions.MarketplaceRegionError: If a marketplace is not in the
+            region of the session's marketplace.
+    """
+    if not marketplaces:
+        return [session.marketplace]
+    region = session.marketplace.region
+    for marketplace in marketplaces:
+        if marketplace.region != region:
+            raise exceptions.MarketplaceRegionError(marketplace.name, region)
+    return list(marketplaces)
 
 
 class BaseRequest:
-    """Base class for amapi requests."""
+    """Base class for amapi requests.
+
+    A request covers the session's marketplace or, if marketplaces are given,
+    several marketplaces in the same region, which are made with one call.
+    """
 
     REQUEST_CLASS = Client
     REQUEST_METHOD = ""
-
-    def __init__(self, session: AmapiSession) -> None:
-        """Set session."""
+    RATE_LIMITER: RateLimiter = rate_limiter
+    RETRY_POLICY = RetryPolicy()
+    INSTRUMENTATION: metrics.Instrumentation = metrics.instrumentation
+    TRANSPORT: Transport = transport
+
+    def __init__(
+        self, session: AmapiSession, marketplaces: Sequence[Marketplaces] | None = None
+    ) -> None:
+        """Set session and the marketplaces the request covers.
+
+        Raises:
+            amapi.exceptions.MarketplaceRegionError: If a marketplace is not in
+                the region of the session's marketplace.
+        """
         self.session = session
+        self.marketplaces = request_marketplaces(session, marketplaces)
+
+    @property
+    def region(self) -> str:
+        """Return the region of the session's marketplace."""
+        return self.session.marketplace.region
+
+    @property
+    def rate_limit_key(self) -> tuple[str, str, str]:
+        """Return the key of the rate limits the request counts against.
+
+        SP-API limits apply to each selling partner and application in a region,
+        so the key is the region, the app ID and a hash of the refresh token.
+        """
+        token = hashlib.sha256(str(self.session.refresh_token).encode("utf8"))
+        return (self.region, str(self.session.app_id), token.hexdigest())
+
+    @property
+    def marketplace(self) -> str:
+        """Return the names of the request's marketplaces, separated by commas."""
+        if len(self.marketplaces) == 1:
+            return self.marketplaces[0].name
+        return ",".join(marketplace.name for marketplace in self.marketplaces)
+
+    def time(self, stage: str) -> ContextManager[metrics.Measurement]:
+        """Time a stage of the request with INSTRUMENTATION."""
+        return self.INSTRUMENTATION.time(stage, self.REQUEST_METHOD, self.marketplace)
 
     def get_request(self) -> Client:
-        """Return an instance of the request class."""
-        return self.REQUEST_CLASS(
-            credentials=self.session.get_credentials(),
-            marketplace=self.session.marketplace,
-        )
+        """Return the session's shared instance of the request class."""
+        return self.session.get_client(self.REQUEST_CLASS)
 
     def _request_args(self) -> dict[str, object]:
-        return {"marketplaceIds": [self.session.marketplace.marketplace_id]}
+        return {
+            "marketplaceIds": [
+                marketplace.marketplace_id for marketplace in self.marketplaces
+            ]
+        }
 
     def request_args(self, *args: Any, **kwargs: Any) -> dict[str, object]:
         """Return request arguments."""
         return kwargs
 
     def call(self, *args: Any, **kwargs: Any) -> Any:
-        """Make the request."""
-        request = self.get_request()
-        response = getattr(request, self.REQUEST_METHOD)(**self.request_args(**kwargs))
-        return self.handle_response(response)
+        """Make the request, retrying as allowed by RETRY_POLICY."""
+        attempt = 1
+        while True:
+            try:
+                return self.make_request(**kwargs)
+            except SellingApiException as error:
+                if not self.RETRY_POLICY.should_retry(error, attempt):
+                    raise
+                time.sleep(self.RETRY_POLICY.get_delay(error, attempt))
+                attempt += 1
+
+    def make_request(self, **kwargs: Any) -> Any:
+        """Make a single attempt at the request."""
+        response = self.TRANSPORT.send(self, self.request_args(**kwargs))
+        with self.time(metrics.RESPONSE):
+            return self.handle_response(response)
+
+    def send(self, args: dict[str, Any]) -> ApiResponse:
+        """Call REQUEST_METHOD of the request class with args and return the response."""
+        with self.time(metrics.CLIENT):
+            request = self.get_request()
+        with self.time(metrics.RATE_LIMIT):
+            self.RATE_LIMITER.wait(self.REQUEST_METHOD, self.rate_limit_key)
+        try:
+            with self.time(metrics.REQUEST):
+                response: ApiResponse = getattr(request, self.REQUEST_METHOD)(**args)
+        except SellingApiRequestThrottledException:
+            self.RATE_LIMITER.throttled(self.REQUEST_METHOD, self.rate_limit_key)
+            raise
+        self.RATE_LIMITER.update(self.REQUEST_METHOD, self.rate_limit_key, response)
+        return response
 
     def handle_response(self, response: ApiResponse) -> Any:
         """Return parsed response."""
@@ -51,15 +178,24 @@ class GenerateReportRequest(BaseRequest):
 
     REQUEST_CLASS = Reports
     REQUEST_METHOD = "create_report"
+    # A server error may come after the report was created, so only retry
+    # errors raised before the request was processed.
+    RETRY_POLICY = RetryPolicy(retryable_codes={429, 503})
+    DEFAULT_WINDOW = dt.timedelta(hours=72)
 
     def request_args(
-        self, report_type: str, date: dt.datetime | None = None
+        self,
+        report_type: str,
+        date: dt.datetime | None = None,
+        end_date: dt.datetime | None = None,
     ) -> dict[str, Any]:
         """Return request arguments."""
         args = super()._request_args()
-        date = date or dt.datetime.now(dt.timezone.utc) - dt.timedelta(hours=72)
+        date = date or dt.datetime.now(dt.timezone.utc) - self.DEFAULT_WINDOW
         args["reportType"] = report_type
         args["dataStartTime"] = date.isoformat()
+        if end_date is not None:
+            args["dataEndTime"] = end_date.isoformat()
         return args
 
     def handle_response(self, response: ApiResponse) -> Any:
@@ -68,8 +204,8 @@ class GenerateReportRequest(BaseRequest):
         return payload["reportId"]
 
 
-class GetDocumentIdRequest(BaseRequest):
-    """Request class for retriveing the ID of a generated report document."""
+class GetReportRequest(BaseRequest):
+    """Request class for retrieving the details of a requested report."""
 
     REQUEST_CLASS = Reports
     REQUEST_METHOD = "get_report"
@@ -80,14 +216,40 @@ class GetDocumentIdRequest(BaseRequest):
         args["reportId"] = report_id
         return args
 
+
+class GetReportsRequest(BaseRequest):
+    """Request class for listing finished reports of a given type."""
+
+    REQUEST_CLASS = Reports
+    REQUEST_METHOD = "get_reports"
+
+    def request_args(
+        self, report_type: str, created_since: dt.datetime
+    ) -> dict[str, Any]:
+        """Return request arguments."""
+        args = super()._request_args()
+        args["reportTypes"] = [report_type]
+        args["processingStatuses"] = [str(ProcessingStatus.DONE)]
+        args["createdSince"] = created_since.isoformat()
+        return args
+
+    def handle_response(self, response: ApiResponse) -> Any:
+        """Return the list of reports."""
+        payload = super().handle_response(response)
+        return payload.get("reports", [])
+
+
+class GetDocumentIdRequest(GetReportRequest):
+    """Request class for retriveing the ID of a generated report document."""
+
     def handle_response(self, response: ApiResponse) -> Any:
         """Return the ID of the document."""
         payload = super().handle_response(response)
         return payload["reportDocumentId"]
 
 
-class GetDocumentUrlRequest(BaseRequest):
-    """Request class for retrieving document URLs."""
+class GetDocumentRequest(BaseRequest):
+    """Request class for retrieving the details of a generated document."""
 
     REQUEST_CLASS = Reports
     REQUEST_METHOD = "get_report_document"
@@ -98,23 +260,291 @@ class GetDocumentUrlRequest(BaseRequest):
         args["reportDocumentId"] = document_id
         return args
 
+
+class GetDocumentUrlRequest(GetDocumentRequest):
+    """Request class for retrieving document URLs."""
+
     def handle_response(self, response: ApiResponse) -> Any:
         """Return the document's URL."""
         payload = super().handle_response(response)
         return payload["url"]
 
 
-def request_generate_report(session: AmapiSession, report_type: str) -> str:
+class BaseReportPoller:
+    """Base class for polling the processing status of a report until it finishes.
+
+    The delay between polls grows exponentially from INITIAL_DELAY up to MAX_DELAY,
+    with each delay randomly adjusted by up to JITTER of its value. Polling stops
+    when the report reaches a terminal status or TIMEOUT seconds have passed.
+    """
+
+    INITIAL_DELAY = 5.0
+    MAX_DELAY = 60.0
+    BACKOFF_FACTOR = 2.0
+    JITTER = 0.1
+    TIMEOUT = 1800.0
+    INSTRUMENTATION: metrics.Instrumentation = metrics.instrumentation
+
+    def __init__(
+        self,
+        initial_delay: float | None = None,
+        max_delay: float | None = None,
+        backoff_factor: float | None = None,
+        jitter: float | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        """Set polling options."""
+        self.initial_delay = (
+            self.INITIAL_DELAY if initial_delay is None else initial_delay
+        )
+        self.max_delay = self.MAX_DELAY if max_delay is None else max_delay
+        self.backoff_factor = (
+            self.BACKOFF_FACTOR if backoff_factor is None else backoff_factor
+        )
+        self.jitter = self.JITTER if jitter is None else jitter
+        self.timeout = self.TIMEOUT if timeout is None else timeout
+
+    def delays(self) -> Iterator[float]:
+        """Yield the delay to wait before each subsequent poll."""
+        delay = self.initial_delay
+        while True:
+            yield delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+            delay = min(delay * self.backoff_factor, self.max_delay)
+
+    def is_finished(self, report_id: str, report: dict[str, Any]) -> bool:
+        """Return True if the report is done, otherwise False.
+
+        Raises:
+            amapi.exceptions.ReportProcessingError: If the report is cancelled or
+                fails.
+        """
+        status = report["processingStatus"]
+        if status in (ProcessingStatus.CANCELLED, ProcessingStatus.FATAL):
+            raise exceptions.ReportProcessingError(report_id, status)
+        return bool(status == ProcessingStatus.DONE)
+
+    def wait_time(self, report_id: str, delay: float, deadline: float) -> float:
+        """Return the time to wait before the next poll.
+
+        Raises:
+            amapi.exceptions.ReportTimeoutError: If the deadline has passed.
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise exceptions.ReportTimeoutError(report_id, self.timeout)
+        return min(delay, remaining)
+
+
+class ReportPoller(BaseReportPoller):
+    """Poll the processing status of a report until it finishes.
+
+    If stop is given, polling is abandoned as soon as it is set.
+    """
+
+    def __init__(
+        self,
+        session: AmapiSession,
+        stop: threading.Event | None = None,
+        **options: Any,
+    ) -> None:
+        """Set session and polling options."""
+        super().__init__(**options)
+        self.session = session
+        self.stop = stop
+
+    def sleep(self, report_id: str, seconds: float) -> None:
+        """Wait seconds before the next poll of a report.
+
+        Raises:
+            amapi.exceptions.ReportPollStoppedError: If stop is set while waiting.
+        """
+        if self.stop is None:
+            time.sleep(seconds)
+        elif self.stop.wait(seconds):
+            raise exceptions.ReportPollStoppedError(report_id)
+
+    def get_status(self, report_id: str) -> dict[str, Any]:
+        """Return the current details of a report."""
+        return request_report(self.session, report_id)
+
+    def poll(self, report_id: str) -> dict[str, Any]:
+        """Wait for a report to finish and return its details.
+
+        Raises:
+            amapi.exceptions.ReportProcessingError: If the report is cancelled or
+                fails.
+            amapi.exceptions.ReportTimeoutError: If the report does not finish
+                before the timeout.
+            amapi.exceptions.ReportPollStoppedError: If stop is set before the
+                report finishes.
+        """
+        with self.INSTRUMENTATION.time(
+            metrics.WAIT, GetReportRequest.REQUEST_METHOD, self.session.marketplace.name
+        ):
+            deadline = time.monotonic() + self.timeout
+            for delay in self.delays():
+                report = self.get_status(report_id)
+                if self.is_finished(report_id, report):
+                    return report
+                self.sleep(report_id, self.wait_time(report_id, delay, deadline))
+            raise exceptions.ReportTimeoutError(report_id, self.timeout)
+
+
+def parse_time(value: str | dt.datetime) -> dt.datetime:
+    """Return a timestamp as a timezone aware datetime, assuming UTC if naive."""
+    if isinstance(value, str):
+        value = dt.datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt.timezone.utc)
+    return value
+
+
+def report_covers_window(
+    report: dict[str, Any],
+    start: dt.datetime | None = None,
+    end: dt.datetime | None = None,
+) -> bool:
+    """Return True if a report covers the data window from start to end.
+
+    Missing bounds are those GenerateReportRequest requests: DEFAULT_WINDOW
+    before the report was created, up to when it was created. Times within
+    WINDOW_TOLERANCE of each other are treated as equal.
+
+    Args:
+        report (dict): A report as returned by GetReportsRequest.
+        start (datetime.datetime | None): The start of the data window.
+        end (datetime.datetime | None): The end of the data window.
+    """
+    if not report.get("dataStartTime") or not report.get("createdTime"):
+        return False
+    created = parse_time(report["createdTime"])
+    if start is None:
+        start = created - GenerateReportRequest.DEFAULT_WINDOW
+    report_start = parse_time(report["dataStartTime"])
+    report_end = parse_time(report.get("dataEndTime") or created)
+    return (
+        abs(report_start - parse_time(start)) <= WINDOW_TOLERANCE
+        and abs(report_end - parse_time(end or created)) <= WINDOW_TOLERANCE
+    )
+
+
+def select_recent_report(
+    session: AmapiSession,
+    reports: list[dict[str, Any]],
+    marketplaces: Sequence[Marketplaces] | None = None,
+    start: dt.datetime | None = None,
+    end: dt.datetime | None = None,
+) -> str | None:
+    """Return the ID of the newest report covering exactly the given marketplaces.
+
+    Only reports covering the data window from start to end are selected.
+
+    Args:
+        session (amapi.session.AmapiSession): A session instance.
+        reports (list[dict]): Reports as returned by GetReportsRequest.
+        marketplaces (Sequence[sp_api.base.Marketplaces] | None): The marketplaces
+            the report must cover. Defaults to the session's marketplace.
+        start (datetime.datetime | None): The start of the data window. Defaults
+            to the default window of GenerateReportRequest.
+        end (datetime.datetime | None): The end of the data window. Defaults to
+            when the report was created.
+    """
+    marketplace_ids = {
+        marketplace.marketplace_id
+        for marketplace in request_marketplaces(session, marketplaces)
+    }
+    matching = [
+        report
+        for report in reports
+        if set(report.get("marketplaceIds") or []) == marketplace_ids
+        and report_covers_window(report, start, end)
+    ]
+    if not matching:
+        return None
+    return str(max(matching, key=lambda report: report["createdTime"])["reportId"])
+
+
+def find_recent_report(
+    session: AmapiSession,
+    report_type: str,
+    max_age: dt.timedelta,
+    marketplaces: Sequence[Marketplaces] | None = None,
+    start: dt.datetime | None = None,
+    end: dt.datetime | None = None,
+) -> str | None:
+    """Return the ID of a finished report created within max_age, or None.
+
+    Args:
+        session (amapi.session.AmapiSession): A session instance.
+        report_type (str): The type of report to find.
+        max_age (datetime.timedelta): The maximum age of a report to return.
+        marketplaces (Sequence[sp_api.base.Marketplaces] | None): The marketplaces
+            the report must cover. Defaults to the session's marketplace.
+        start (datetime.datetime | None): The start of the report's data window.
+        end (datetime.datetime | None): The end of the report's data window.
+    """
+    created_since = dt.datetime.now(dt.timezone.utc) - max_age
+    reports = GetReportsRequest(session, marketplaces).call(
+        report_type=report_type, created_since=created_since
+    )
+    return select_recent_report(session, reports, marketplaces, start, end)
+
+
+def request_generate_report(
+    session: AmapiSession,
+    report_type: str,
+    max_age: dt.timedelta | None = None,
+    marketplaces: Sequence[Marketplaces] | None = None,
+    start: dt.datetime | None = None,
+    end: dt.datetime | None = None,
+) -> str:
     """Request the generation of a report.
 
+    If max_age is given and a report of the same type for the same marketplaces
+    and data window finished within max_age, its ID is returned instead of
+    creating a new report.
+
     Args:
         session (amapi.session.AmapiSession): A session instance.
         report_type (str): The type of report to genererate.
+        max_age (datetime.timedelta | None): The maximum age of an existing report
+            to reuse. Defaults to always creating a new report.
+        marketplaces (Sequence[sp_api.base.Marketplaces] | None): Marketplaces in
+            the session's region to include in one report. Defaults to the
+            session's marketplace.
+        start (datetime.datetime | None): The start of the report's data window.
+            Defaults to GenerateReportRequest.DEFAULT_WINDOW before now.
+        end (datetime.datetime | None): The end of the report's data window.
+            Defaults to now.
     """
-    report_id = GenerateReportRequest(session).call(report_type=report_type)
+    if max_age is not None:
+        report_id = find_recent_report(
+            session,
+            report_type,
+            max_age=max_age,
+            marketplaces=marketplaces,
+            start=start,
+            end=end,
+        )
+        if report_id is not None:
+            return report_id
+    report_id = GenerateReportRequest(session, marketplaces).call(
+        report_type=report_type, date=start, end_date=end
+    )
     return str(report_id)
 
 
+def request_report(session: AmapiSession, report_id: str) -> dict[str, Any]:
+    """
+    Request the current details of a report.
+
+    Args:
+        session (amapi.session.AmapiSession): A session instance.
+        report_id (str): The ID of the report request.
+    """
+    return dict(GetReportRequest(session).call(report_id=report_id))
+
+
 def request_document_id(session: AmapiSession, report_id: str) -> str:
     """
     Request the ID of a generated report document.
@@ -127,6 +557,22 @@ def request_document_id(session: AmapiSession, report_id: str) -> str:
     return str(docutment_id)
 
 
+def wait_for_report(
+    session: AmapiSession, report_id: str, timeout: float | None = None
+) -> str:
+    """
+    Wait for a report to finish processing and return the ID of its document.
+
+    Args:
+        session (amapi.session.AmapiSession): A session instance.
+        report_id (str): The ID of the report request.
+        timeout (float | None): Seconds to wait before giving up. Defaults to
+            ReportPoller.TIMEOUT.
+    """
+    report = ReportPoller(session, timeout=timeout).poll(report_id)
+    return str(report["reportDocumentId"])
+
+
 def request_document_url(session: AmapiSession, document_id: str) -> str:
     """Request the URL of a generated document.
 
@@ -136,3 +582,95 @@ def request_document_url(session: AmapiSession, document_id: str) -> str:
     """
     url = GetDocumentUrlRequest(session).call(document_id=document_id)
     return str(url)
+
+
+def request_document(session: AmapiSession, document_id: str) -> dict[str, Any]:
+    """Request the details of a generated document.
+
+    The returned dict contains the document's "url" and, if the document is
+    compressed, its "compressionAlgorithm".
+
+    args:
+        session (amapi.session.AmapiSession): A session instance.
+        document_id (str): The ID of the generated document.
+    """
+    document = GetDocumentRequest(session).call(document_id=document_id)
+    return dict(document)
+
+
+def download_document(
+    session: AmapiSession,
+    document_id: str,
+    dest: Path | str | BinaryIO,
+    cache: DocumentCache | None = None,
+) -> int:
+    """Download a generated document, returning the number of bytes written.
+
+    The document is streamed to dest in chunks of DOWNLOAD_CHUNK_SIZE bytes and
+    GZIP compressed documents are decompressed as they are written. If a cache
+    is given the document is copied from it when present, otherwise it is
+    downloaded into the cache first.
+
+    args:
+        session (amapi.session.AmapiSession): A session instance.
+        document_id (str): The ID of the generated document.
+        dest (pathlib.Path | str | BinaryIO): The path of the file to write or a
+            binary file-like object.
+        cache (amapi.cache.DocumentCache | None): A cache of downloaded documents.
+    """
+    if isinstance(dest, (str, Path)):
+        with open(dest, "wb") as f:
+            return download_document(session, document_id, f, cache=cache)
+    if cache is None:
+        document = request_document(session, document_id=document_id)
+        with GetDocumentRequest.INSTRUMENTATION.time(
+            metrics.DOWNLOAD,
+            GetDocumentRequest.REQUEST_METHOD,
+            session.marketplace.name,
+        ) as measurement:
+            measurement.bytes = stream_document(document, dest)
+        return measurement.bytes
+    path = cache.get(document_id)
+    if path is None:
+        path = cache.put(
+            document_id, lambda f: download_document(session, document_id, f)
+        )
+    with open(path, "rb") as cached:
+        shutil.copyfileobj(cached, dest, DOWNLOAD_CHUNK_SIZE)
+    return path.stat().st_size
+
+
+def stream_document(document: dict[str, Any], f: BinaryIO) -> int:
+    """Write the contents of a document to f, returning the number of bytes written.
+
+    args:
+        document (dict): Document details as returned by request_document.
+        f (BinaryIO): A binary file-like object.
+    """
+    decompressor = None
+    if document.get("compressionAlgorithm") == "GZIP":
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    written = 0
+    chunks = BaseRequest.TRANSPORT.iter_document(
+        document, lambda: fetch_document(document)
+    )
+    for chunk in chunks:
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk)
+        written += f.write(chunk)
+    if decompressor is not None:
+        written += f.write(decompressor.flush())
+    return written
+
+
+def fetch_document(document: dict[str, Any]) -> Iterator[bytes]:
+    """Yield the contents of a document from its URL in chunks.
+
+    args:
+        document (dict): Document details as returned by request_document.
+    """
+    with requests.get(
+        document["url"], stream=True, timeout=DOWNLOAD_TIMEOUT
+    ) as response:
+        response.raise_for_status()
+        yield from response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
@@ -0,0 +1,91 @@
+"""Retry policies for amapi requests."""
+
+import datetime as dt
+import random
+from email.utils import parsedate_to_datetime
+from typing import Iterable
+
+from sp_api.base import SellingApiException
+
+RETRY_AFTER_HEADER = "Retry-After"
+
+
+class RetryPolicy:
+    """Decide whether and when a failed request should be retried.
+
+    Requests failing with a SellingApiException whose HTTP status code is in
+    RETRYABLE_CODES are retried up to MAX_ATTEMPTS times in total. The delay
+    between attempts grows exponentially from INITIAL_DELAY up to MAX_DELAY,
+    with each delay randomly adjusted by up to JITTER of its value. A
+    Retry-After header on the error is honoured if it asks for a longer wait.
+    """
+
+    MAX_ATTEMPTS = 5
+    INITIAL_DELAY = 1.0
+    MAX_DELAY = 60.0
+    BACKOFF_FACTOR = 2.0
+    JITTER = 0.1
+    RETRYABLE_CODES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        max_attempts: int | None = None,
+        initial_delay: float | None = None,
+        max_delay: float | None = None,
+        backoff_factor: float | None = None,
+        jitter: float | None = None,
+        retryable_codes: Iterable[int] | None = None,
+    ) -> None:
+        """Set retry options."""
+        self.max_attempts = self.MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self.initial_delay = (
+            self.INITIAL_DELAY if initial_delay is None else initial_delay
+        )
+        self.max_delay = self.MAX_DELAY if max_delay is None else max_delay
+        self.backoff_factor = (
+            self.BACKOFF_FACTOR if backoff_factor is None else backoff_factor
+        )
+        self.jitter = self.JITTER if jitter is None else jitter
+        self.retryable_codes = frozenset(
+            self.RETRYABLE_CODES if retryable_codes is None else retryable_codes
+        )
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Return True if a request failing with error may succeed if retried."""
+        return (
+            isinstance(error, SellingApiException)
+            and error.code in self.retryable_codes
+        )
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """Return True if a request should be retried after failing attempt times."""
+        return attempt < self.max_attempts and self.is_retryable(error)
+
+    def retry_after(self, error: BaseException) -> float | None:
+        """Return the number of seconds requested by the error's Retry-After header."""
+        headers = getattr(error, "headers", None) or {}
+        value = headers.get(RETRY_AFTER_HEADER) or headers.get(
+            RETRY_AFTER_HEADER.lower()
+        )
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max((retry_at - dt.datetime.now(dt.timezone.utc)).total_seconds(), 0.0)
+
+    def get_delay(self, error: BaseException, attempt: int) -> float:
+        """Return the number of seconds to wait before retrying after attempt fails."""
+        delay = min(
+            self.initial_delay * self.backoff_factor ** (attempt - 1), self.max_delay
+        )
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        retry_after = self.retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
@@ -1,38 +1,196 @@
 """Session manager for ampi."""
 
+import os
+import threading
 from pathlib import Path
-from typing import Self
+from types import MethodType, TracebackType
+from typing import Any, Callable, Concatenate, Generic, ParamSpec, Self, TypeVar
+from urllib.parse import urlsplit
 
 import toml
-from sp_api.base import Marketplaces
+from sp_api.asyncio.base import Client as AsyncClient
+from sp_api.base import Client, Marketplaces
 
 from . import exceptions
+from .tokens import TokenCache
+
+ClientType = TypeVar("ClientType", bound=Client)
+AsyncClientType = TypeVar("AsyncClientType", bound=AsyncClient)
+P = ParamSpec("P")
+R = TypeVar("R")
+
+REGION_NAMES = {"us-east-1": "NA", "eu-west-1": "EU", "us-west-2": "FE"}
+
+
+def config_keys(name: str) -> tuple[str, str, str]:
+    """Return the config file keys of the refresh token, app ID and client secret.
+
+    Args:
+        name (str): The name of a marketplace, such as "UK", or of a region,
+            such as "EU".
+    """
+    return (f"REFRESH_TOKEN_{name}", f"LWA_APP_ID_{name}", f"LWA_CLIENT_SECRET_{name}")
+
+
+def region_name(marketplace: Marketplaces) -> str:
+    """Return the name of the SP-API region of a marketplace, such as "EU"."""
+    return REGION_NAMES.get(marketplace.region, marketplace.region)
+
+
+SESSIONS: dict[str, type["AmapiSession"]] = {}
+
+
+def region_marketplaces(region: str) -> list[Marketplaces]:
+    """Return the marketplaces in a region, by its name or AWS region."""
+    return [
+        marketplace
+        for marketplace in Marketplaces
+        if region in (marketplace.region, region_name(marketplace))
+    ]
+
+
+class hybridmethod(Generic[P, R]):
+    """Decorator for a method bound to an instance or, called on a class, to the class.
+
+    Attributes set on an instance shadow those of its class, so a hybrid method
+    uses an instance's own state where it has any and its class's otherwise.
+    """
+
+    def __init__(self, func: Callable[Concatenate[Any, P], R]) -> None:
+        """Wrap func."""
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance: object, owner: type) -> Callable[P, R]:
+        return MethodType(self.func, owner if instance is None else instance)
 
 
 class AmapiSession:
-    """Session manager for Amapi."""
+    """Session manager for Amapi.
+
+    Credentials and the marketplace are read from the class, as set by
+    set_login or a config file, unless they are passed when the session is
+    created. A session with its own credentials keeps its own clients, so
+    sessions for many sellers can be used at once from different threads.
+    """
 
     CONFIG_FILENAME = ".amapi.toml"
-    refresh_token = None
-    app_id = None
-    client_secret = None
+    CONFIG_PATH_ENV_VAR = "AMAPI_CONFIG"
+    refresh_token: str | None = None
+    app_id: str | None = None
+    client_secret: str | None = None
     marketplace: Marketplaces
 
     REFRESH_TOKEN_KEY: str
     APP_ID_KEY: str
     CLIENT_SECRET_KEY: str
+    REGION_KEYS: tuple[str, str, str] | None = None
+
+    TOKEN_CACHE: TokenCache | None = None
+    ENDPOINT: str | None = None
+    LWA_ENDPOINT: str | None = None
+    _clients: dict[tuple[object, ...], Client] = {}
+    _clients_lock = threading.Lock()
+    _config_paths: dict[tuple[Path, str], Path | None] = {}
+    _configs: dict[Path, tuple[tuple[int, int], dict[str, Any]]] = {}
+
+    def __init_subclass__(cls, name: str | None = None, **kwargs: Any) -> None:
+        """Set the config file keys of a session for the marketplace called name.
+
+        The keys end in name, such as "REFRESH_TOKEN_DE", with REGION_KEYS ending
+        in the name of the marketplace's region, such as "REFRESH_TOKEN_EU". The
+        class is added to SESSIONS under name.
+        """
+        super().__init_subclass__(**kwargs)
+        if name is not None:
+            keys = config_keys(name)
+            cls.REFRESH_TOKEN_KEY, cls.APP_ID_KEY, cls.CLIENT_SECRET_KEY = keys
+            cls.REGION_KEYS = config_keys(region_name(cls.marketplace))
+            SESSIONS[name] = cls
+
+    def __init__(
+        self,
+        refresh_token: str | None = None,
+        app_id: str | None = None,
+        client_secret: str | None = None,
+        marketplace: Marketplaces | None = None,
+    ) -> None:
+        """Create a session, optionally with its own credentials and marketplace.
+
+        Raises:
+            amapi.exceptions.LoginCredentialsNotSetError: If some but not all of
+                the credentials are given.
+        """
+        self._async_clients: dict[type[AsyncClient], AsyncClient] = {}
+        if marketplace is not None:
+            self.marketplace = marketplace
+        credentials = (refresh_token, app_id, client_secret)
+        if any(value is not None for value in credentials) and None in credentials:
+            raise exceptions.LoginCredentialsNotSetError()
+        if None not in credentials:
+            self.refresh_token = refresh_token
+            self.app_id = app_id
+            self.client_secret = client_secret
+            self._clients = {}
+            self._clients_lock = threading.Lock()
 
     def __enter__(self) -> Self:
-        if not self.__class__.credentials_are_set():
+        if not self.credentials_are_set():
             config_path = self.__class__.find_config_filepath()
             if config_path is not None:
                 self.__class__.load_from_config_file(config_file_path=config_path)
-        if not self.__class__.credentials_are_set():
+        if not self.credentials_are_set():
             raise exceptions.LoginCredentialsNotSetError()
         return self
 
-    def __exit__(self, exc_type: None, exc_value: None, exc_tb: None) -> None:
-        self.__class__.get_credentials()
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.get_credentials()
+
+    async def __aenter__(self) -> Self:
+        return self.__enter__()
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.__exit__(exc_type, exc_value, exc_tb)
+        await self.close_async_clients()
+
+    def get_async_client(self, client_class: type[AsyncClientType]) -> AsyncClientType:
+        """Return this session's instance of the asyncio client class client_class.
+
+        Asyncio clients hold a connection pool bound to the running event loop, so
+        they belong to the session instance rather than being shared between
+        sessions. They are closed when an async with block using the session exits.
+        """
+        if client_class not in self._async_clients:
+            if self.TOKEN_CACHE is None:
+                client = client_class(
+                    credentials=self.get_credentials(), marketplace=self.marketplace
+                )
+            else:
+                client = client_class(
+                    credentials=self.get_credentials(),
+                    marketplace=self.marketplace,
+                    auth_token_client_class=self.TOKEN_CACHE.async_client_class(),
+                )
+            self.configure_client(client)
+            self._async_clients[client_class] = client
+        return self._async_clients[client_class]  # type: ignore[return-value]
+
+    async def close_async_clients(self) -> None:
+        """Close this session's asyncio clients."""
+        clients = list(self._async_clients.values())
+        self._async_clients.clear()
+        for client in clients:
+            await client.aclose()
 
     @classmethod
     def set_login(
@@ -46,10 +204,10 @@ class AmapiSession:
         cls.app_id = app_id
         cls.client_secret = client_secret
 
-    @classmethod
-    def credentials_are_set(cls) -> bool:
+    @hybridmethod
+    def credentials_are_set(self) -> bool:
         """Return True if all auth credentials are set, otherwise False."""
-        if None in (cls.refresh_token, cls.app_id, cls.client_secret):
+        if None in (self.refresh_token, self.app_id, self.client_secret):
             return False
         else:
             return True
@@ -59,54 +217,302 @@ class AmapiSession:
         """
         Return the path to a shopify config file or None.
 
-        Recursivly scan backwards from the current working directory and return the
-        path to a file matching cls.CONFIG_FILENAME if one exists, otherwise returns
-        None.
+        If the environment variable named by cls.CONFIG_PATH_ENV_VAR is set its value
+        is returned. Otherwise recursivly scan backwards from the current working
+        directory and return the path to a file matching cls.CONFIG_FILENAME if one
+        exists, otherwise returns None.
+
+        The result of the scan is remembered for each working directory. A
+        remembered path is checked to still exist before it is returned, but a
+        config file created after a scan found none is not seen until
+        clear_config_cache is called.
         """
+        env_path = os.environ.get(cls.CONFIG_PATH_ENV_VAR)
+        if env_path:
+            return Path(env_path)
         if cls.CONFIG_FILENAME is None:
             return None
-        path = Path.cwd()
+        cwd = Path.cwd()
+        key = (cwd, cls.CONFIG_FILENAME)
+        if key in cls._config_paths:
+            config_file = cls._config_paths[key]
+            if config_file is None or config_file.is_file():
+                return config_file
+        config_file = cls._scan_for_config_file(cwd, cls.CONFIG_FILENAME)
+        cls._config_paths[key] = config_file
+        return config_file
+
+    @staticmethod
+    def _scan_for_config_file(path: Path, filename: str) -> Path | None:
         while path.parent != path:
-            config_file = path / cls.CONFIG_FILENAME
+            config_file = path / filename
             if config_file.exists():
                 return config_file
             path = path.parent
         return None
 
     @classmethod
-    def load_from_config_file(cls, config_file_path: Path | str) -> None:
-        """Set login credentials as specified in a toml file located at config_file_path."""
-        with open(config_file_path) as f:
+    def read_config_file(cls, config_file_path: Path | str) -> dict[str, Any]:
+        """Return the contents of a toml config file.
+
+        Parsed files are remembered and parsed again only if their modification
+        time or size changes.
+        """
+        path = Path(config_file_path).absolute()
+        stat = path.stat()
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = cls._configs.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with open(path) as f:
             config = toml.load(f)
-        cls.set_login(
-            refresh_token=config.get(cls.REFRESH_TOKEN_KEY),
-            app_id=config.get(cls.APP_ID_KEY),
-            client_secret=config.get(cls.CLIENT_SECRET_KEY),
+        cls._configs[path] = (version, config)
+        return config
+
+    @classmethod
+    def clear_config_cache(cls) -> None:
+        """Forget found config file paths and parsed config files."""
+        cls._config_paths.clear()
+        cls._configs.clear()
+
+    @classmethod
+    def load_from_config_file(cls, config_file_path: Path | str) -> None:
+        """Set login credentials as specified in a toml file located at config_file_path.
+
+        Credentials under the marketplace's keys are used if they are set,
+        otherwise those under the keys of its region, in REGION_KEYS.
+        """
+        config = cls.read_config_file(config_file_path)
+        credentials = [
+            config.get(key)
+            for key in (cls.REFRESH_TOKEN_KEY, cls.APP_ID_KEY, cls.CLIENT_SECRET_KEY)
+        ]
+        if None in credentials and cls.REGION_KEYS is not None:
+            credentials = [config.get(key) for key in cls.REGION_KEYS]
+        cls.set_login(*credentials)
+
+    @hybridmethod
+    def get_client(self, client_class: type[ClientType]) -> ClientType:
+        """Return a shared instance of client_class for this session.
+
+        Clients are cached by class, region and credentials so that repeated
+        requests reuse the client's connection pool and LWA access token, shared
+        by every marketplace in the region. Requests name their marketplaces in
+        their arguments, so a client may serve any marketplace in its region.
+        Clients refresh their own access tokens, so they are kept until cleared.
+        Sessions created with their own credentials cache their own clients,
+        otherwise clients are shared by every session.
+        """
+        key = (
+            client_class,
+            self.marketplace.region,
+            self.ENDPOINT,
+            self.LWA_ENDPOINT,
+            self.refresh_token,
+            self.app_id,
+            self.client_secret,
         )
+        with self._clients_lock:
+            cached = self._clients.get(key)
+            if cached is not None:
+                return cached  # type: ignore[return-value]
+            if self.TOKEN_CACHE is None:
+                client = client_class(
+                    credentials=self.get_credentials(), marketplace=self.marketplace
+                )
+            else:
+                client = client_class(
+                    credentials=self.get_credentials(),
+                    marketplace=self.marketplace,
+                    auth_token_client_class=self.TOKEN_CACHE.client_class(),
+                )
+            self.configure_client(client)
+            self._clients[key] = client
+            return client
+
+    @classmethod
+    def configure_client(cls, client: Client | AsyncClient) -> None:
+        """Point a client at ENDPOINT and LWA_ENDPOINT if they are set.
+
+        These replace the SP-API endpoint of the session's marketplace and the
+        LWA token URL, for example to use the SP-API sandbox or a local server.
+        """
+        if cls.ENDPOINT is not None:
+            client.endpoint = cls.ENDPOINT
+        if cls.LWA_ENDPOINT is not None:
+            url = urlsplit(cls.LWA_ENDPOINT)
+            client._auth.scheme = f"{url.scheme}://"
+            client._auth.host = url.netloc
+            client._auth.path = url.path
 
     @classmethod
-    def get_credentials(cls) -> dict[str, str]:
+    def set_token_cache(cls, directory: Path | str | None) -> None:
+        """Share LWA access tokens between processes through files in directory.
+
+        The cache is used by clients and by asyncio clients created after it is
+        set. Pass None to stop using a token cache.
+        """
+        cls.TOKEN_CACHE = None if directory is None else TokenCache(directory)
+        cls.clear_clients()
+
+    @hybridmethod
+    def clear_clients(self) -> None:
+        """Close and discard all cached clients."""
+        with self._clients_lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+    @hybridmethod
+    def get_credentials(self) -> dict[str, str]:
         """Return session credentials as a dict."""
         return dict(
-            refresh_token=str(cls.refresh_token),
-            lwa_app_id=str(cls.app_id),
-            lwa_client_secret=str(cls.client_secret),
+            refresh_token=str(self.refresh_token),
+            lwa_app_id=str(self.app_id),
+            lwa_client_secret=str(self.client_secret),
         )
 
 
-class AmapiSessionUK(AmapiSession):
+class AmapiSessionAE(AmapiSession, name="AE"):
+    """Amapi session for Amazon AE."""
+
+    marketplace = Marketplaces.AE
+
+
+class AmapiSessionBE(AmapiSession, name="BE"):
+    """Amapi session for Amazon BE."""
+
+    marketplace = Marketplaces.BE
+
+
+class AmapiSessionDE(AmapiSession, name="DE"):
+    """Amapi session for Amazon DE."""
+
+    marketplace = Marketplaces.DE
+
+
+class AmapiSessionPL(AmapiSession, name="PL"):
+    """Amapi session for Amazon PL."""
+
+    marketplace = Marketplaces.PL
+
+
+class AmapiSessionEG(AmapiSession, name="EG"):
+    """Amapi session for Amazon EG."""
+
+    marketplace = Marketplaces.EG
+
+
+class AmapiSessionES(AmapiSession, name="ES"):
+    """Amapi session for Amazon ES."""
+
+    marketplace = Marketplaces.ES
+
+
+class AmapiSessionFR(AmapiSession, name="FR"):
+    """Amapi session for Amazon FR."""
+
+    marketplace = Marketplaces.FR
+
+
+class AmapiSessionGB(AmapiSession, name="GB"):
+    """Amapi session for Amazon GB."""
+
+    marketplace = Marketplaces.GB
+
+
+class AmapiSessionIN(AmapiSession, name="IN"):
+    """Amapi session for Amazon IN."""
+
+    marketplace = Marketplaces.IN
+
+
+class AmapiSessionIT(AmapiSession, name="IT"):
+    """Amapi session for Amazon IT."""
+
+    marketplace = Marketplaces.IT
+
+
+class AmapiSessionIE(AmapiSession, name="IE"):
+    """Amapi session for Amazon IE."""
+
+    marketplace = Marketplaces.IE
+
+
+class AmapiSessionNL(AmapiSession, name="NL"):
+    """Amapi session for Amazon NL."""
+
+    marketplace = Marketplaces.NL
+
+
+class AmapiSessionSA(AmapiSession, name="SA"):
+    """Amapi session for Amazon SA."""
+
+    marketplace = Marketplaces.SA
+
+
+class AmapiSessionSE(AmapiSession, name="SE"):
+    """Amapi session for Amazon SE."""
+
+    marketplace = Marketplaces.SE
+
+
+class AmapiSessionTR(AmapiSession, name="TR"):
+    """Amapi session for Amazon TR."""
+
+    marketplace = Marketplaces.TR
+
+
+class AmapiSessionUK(AmapiSession, name="UK"):
     """Amapi session for Amazon UK."""
 
-    REFRESH_TOKEN_KEY = "REFRESH_TOKEN_UK"
-    APP_ID_KEY = "LWA_APP_ID_UK"
-    CLIENT_SECRET_KEY = "LWA_CLIENT_SECRET_UK"
     marketplace = Marketplaces.UK
 
 
-class AmapiSessionUS(AmapiSession):
+class AmapiSessionZA(AmapiSession, name="ZA"):
+    """Amapi session for Amazon ZA."""
+
+    marketplace = Marketplaces.ZA
+
+
+class AmapiSessionAU(AmapiSession, name="AU"):
+    """Amapi session for Amazon AU."""
+
+    marketplace = Marketplaces.AU
+
+
+class AmapiSessionJP(AmapiSession, name="JP"):
+    """Amapi session for Amazon JP."""
+
+    marketplace = Marketplaces.JP
+
+
+class AmapiSessionSG(AmapiSession, name="SG"):
+    """Amapi session for Amazon SG."""
+
+    marketplace = Marketplaces.SG
+
+
+class AmapiSessionUS(AmapiSession, name="US"):
     """Amapi session for Amazon US."""
 
-    REFRESH_TOKEN_KEY = "REFRESH_TOKEN_US"
-    APP_ID_KEY = "LWA_APP_ID_US"
-    CLIENT_SECRET_KEY = "LWA_CLIENT_SECRET_US"
     marketplace = Marketplaces.US
+
+
+class AmapiSessionBR(AmapiSession, name="BR"):
+    """Amapi session for Amazon BR."""
+
+    marketplace = Marketplaces.BR
+
+
+class AmapiSessionCA(AmapiSession, name="CA"):
+    """Amapi session for Amazon CA."""
+
+    marketplace = Marketplaces.CA
+
+
+class AmapiSessionMX(AmapiSession, name="MX"):
+    """Amapi session for Amazon MX."""
+
+    marketplace = Marketplaces.MX
@@ -0,0 +1,178 @@
+"""LWA access token caching shared between processes."""
+
+import asyncio
+import fcntl
+import functools
+import hashlib
+import json
+import time
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator
+
+from sp_api.auth import AccessTokenClient, AccessTokenResponse
+
+# isort: off
+# sp_api.asyncio.auth cannot be imported before sp_api.asyncio.base, which
+# imports it back while it is only partially initialised.
+import sp_api.asyncio.base  # noqa: F401
+from sp_api.asyncio.auth import AccessTokenClient as AsyncAccessTokenClient
+
+# isort: on
+
+from .atomic import AtomicWriter
+
+
+class TokenCache:
+    """File-backed cache of LWA access tokens shared between processes.
+
+    Each token is stored as JSON in a file named from a hash of the app ID and
+    refresh token it was issued for, together with the time it expires. Tokens
+    are fetched under an exclusive file lock, so when several processes need
+    the same token at once only one of them requests it from LWA. Tokens read
+    from disk are also kept in memory until they expire.
+    """
+
+    EXPIRY_MARGIN = 60.0
+    DEFAULT_EXPIRES_IN = 3600.0
+
+    def __init__(self, directory: Path | str) -> None:
+        """Set the directory in which tokens are stored."""
+        self.directory = Path(directory)
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.entries: dict[str, dict[str, Any]] = {}
+
+    @staticmethod
+    def key(app_id: str, refresh_token: str) -> str:
+        """Return the cache key for the tokens of an app and refresh token."""
+        return hashlib.sha256(f"{app_id}\0{refresh_token}".encode("utf8")).hexdigest()
+
+    def path(self, key: str) -> Path:
+        """Return the path of the file storing a token."""
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return a cached token, or None if there is no token that has not expired."""
+        entry = self.entries.get(key)
+        if entry is None or self.expired(entry):
+            try:
+                with open(self.path(key)) as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+            if self.expired(entry):
+                return None
+            self.entries[key] = entry
+        return dict(entry["token"])
+
+    def expired(self, entry: dict[str, Any]) -> bool:
+        """Return True if a cached token is expired or about to expire."""
+        return bool(entry.get("expires_at", 0) - self.EXPIRY_MARGIN <= time.time())
+
+    def set(self, key: str, token: dict[str, Any]) -> None:
+        """Store a token returned by LWA."""
+        expires_in = float(token.get("expires_in") or self.DEFAULT_EXPIRES_IN)
+        entry = {"token": token, "expires_at": time.time() + expires_in}
+        with AtomicWriter(self.path(key), "w") as f:
+            json.dump(entry, f)
+        self.entries[key] = entry
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """Hold an exclusive lock on a token across processes."""
+        with open(self.directory / f"{key}.lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @asynccontextmanager
+    async def async_lock(self, key: str) -> AsyncIterator[None]:
+        """Hold an exclusive lock on a token without blocking the event loop."""
+        with open(self.directory / f"{key}.lock", "a") as f:
+            await asyncio.to_thread(fcntl.flock, f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def get_or_fetch(
+        self, key: str, fetch: Callable[[], dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Return a cached token, calling fetch to request one if necessary."""
+        token = self.get(key)
+        if token is not None:
+            return token
+        with self.lock(key):
+            token = self.get(key)
+            if token is None:
+                token = fetch()
+                self.set(key, token)
+        return token
+
+    async def async_get_or_fetch(
+        self, key: str, fetch: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> dict[str, Any]:
+        """Return a cached token, awaiting fetch to request one if necessary."""
+        token = self.get(key)
+        if token is not None:
+            return token
+        async with self.async_lock(key):
+            token = self.get(key)
+            if token is None:
+                token = await fetch()
+                self.set(key, token)
+        return token
+
+    def client_class(self) -> Callable[..., AccessTokenClient]:
+        """Return an access token client factory using this cache for sp_api clients."""
+        return functools.partial(CachedAccessTokenClient, token_cache=self)
+
+    def async_client_class(self) -> Callable[..., AsyncAccessTokenClient]:
+        """Return an access token client factory using this cache for asyncio clients."""
+        return functools.partial(CachedAsyncAccessTokenClient, token_cache=self)
+
+
+class CachedAccessTokenClient(AccessTokenClient):
+    """LWA access token client storing tokens in a TokenCache."""
+
+    def __init__(self, *args: Any, token_cache: TokenCache, **kwargs: Any) -> None:
+        """Set the token cache."""
+        super().__init__(*args, **kwargs)
+        self.token_cache = token_cache
+
+    def fetch_token(self) -> dict[str, Any]:
+        """Request a new access token from LWA."""
+        return self._request(
+            self.scheme + self.host + self.path, self.data, self.headers
+        )
+
+    def get_auth(self) -> AccessTokenResponse:
+        """Return an access token, from the cache if it holds one."""
+        key = self.token_cache.key(self.cred.client_id, self.cred.refresh_token)
+        return AccessTokenResponse(
+            **self.token_cache.get_or_fetch(key, self.fetch_token)
+        )
+
+
+class CachedAsyncAccessTokenClient(AsyncAccessTokenClient):
+    """Asyncio LWA access token client storing tokens in a TokenCache."""
+
+    def __init__(self, *args: Any, token_cache: TokenCache, **kwargs: Any) -> None:
+        """Set the token cache."""
+        super().__init__(*args, **kwargs)
+        self.token_cache = token_cache
+
+    async def fetch_token(self) -> dict[str, Any]:
+        """Request a new access token from LWA."""
+        return await self._request(
+            self.scheme + self.host + self.path, self.data, self.headers
+        )
+
+    async def get_auth(self) -> AccessTokenResponse:
+        """Return an access token, from the cache if it holds one."""
+        key = self.token_cache.key(self.cred.client_id, self.cred.refresh_token)
+        return AccessTokenResponse(
+            **await self.token_cache.async_get_or_fetch(key, self.fetch_token)
+        )
@@ -0,0 +1,303 @@
+"""Transports making amapi's SP-API calls, and recording and replaying them."""
+
+import asyncio
+import base64
+import gzip
+import io
+import json
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterator
+
+from sp_api.base import ApiResponse, SellingApiException
+from sp_api.base.exceptions import get_exception_for_code
+
+from . import exceptions
+
+if TYPE_CHECKING:
+    from .aio import AsyncBaseRequest
+    from .request import BaseRequest
+
+CALL = "call"
+DOCUMENT = "document"
+DOCUMENT_CHUNK = "document_chunk"
+CHUNK_SIZE = 64 * 1024
+
+
+class Transport:
+    """Make SP-API calls and download documents over the network."""
+
+    def send(self, request: "BaseRequest", args: dict[str, Any]) -> ApiResponse:
+        """Make the call of request with args and return its response."""
+        return request.send(args)
+
+    async def async_send(
+        self, request: "AsyncBaseRequest", args: dict[str, Any]
+    ) -> ApiResponse:
+        """Make the call of an asyncio request with args and return its response."""
+        return await request.async_send(args)
+
+    def iter_document(
+        self, document: dict[str, Any], fetch: Callable[[], Iterator[bytes]]
+    ) -> Iterator[bytes]:
+        """Yield the contents of a document as returned by fetch, in chunks."""
+        return fetch()
+
+
+transport = Transport()
+
+
+def open_archive(path: Path, mode: str) -> IO[str]:
+    """Open a JSON lines archive, compressed with gzip if its name ends ".gz"."""
+    if path.suffix == ".gz":
+        return io.TextIOWrapper(gzip.GzipFile(path, mode + "b"), encoding="utf8")
+    return open(path, mode, encoding="utf8")
+
+
+def document_key(document: dict[str, Any]) -> str:
+    """Return the key a document's contents are recorded under."""
+    return str(document.get("reportDocumentId") or document["url"])
+
+
+def call_key(request: "BaseRequest", args: dict[str, Any]) -> tuple[str, str, str]:
+    """Return the key a call is recorded under."""
+    return (
+        request.REQUEST_METHOD,
+        request.marketplace,
+        json.dumps(args, sort_keys=True, default=str),
+    )
+
+
+class RecordingTransport(Transport):
+    """Transport recording every call and document to a JSON lines archive.
+
+    Each line of the archive records either a call, with its operation,
+    marketplace, arguments, response payload and headers or error, a chunk of
+    a document's raw contents, or a document once all its chunks are recorded.
+    Chunks are written as they are downloaded, so documents are never held in
+    memory. Archives whose names end ".gz" are compressed.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        """Open the archive for appending."""
+        self.path = Path(path)
+        self.file = open_archive(self.path, "a")
+        self.lock = threading.Lock()
+
+    def __enter__(self) -> "RecordingTransport":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the archive."""
+        self.file.close()
+
+    def write(self, entry: dict[str, Any]) -> None:
+        """Add an entry to the archive."""
+        line = json.dumps(entry, default=str)
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+    def record_call(
+        self,
+        request: "BaseRequest",
+        args: dict[str, Any],
+        duration: float,
+        response: ApiResponse | None = None,
+        error: SellingApiException | None = None,
+    ) -> None:
+        """Record a call and its response or error."""
+        operation, marketplace, _ = call_key(request, args)
+        entry: dict[str, Any] = {
+            "type": CALL,
+            "operation": operation,
+            "marketplace": marketplace,
+            "args": args,
+            "duration": duration,
+        }
+        if error is not None:
+            entry["error"] = {"code": error.code, "errors": error.error}
+            entry["headers"] = dict(error.headers or {})
+        elif response is not None:
+            entry["payload"] = response.payload
+            entry["headers"] = dict(response.headers or {})
+        self.write(entry)
+
+    def send(self, request: "BaseRequest", args: dict[str, Any]) -> ApiResponse:
+        """Make the call of request with args, recording its response."""
+        start = time.perf_counter()
+        try:
+            response = super().send(request, args)
+        except SellingApiException as error:
+            self.record_call(request, args, time.perf_counter() - start, error=error)
+            raise
+        self.record_call(request, args, time.perf_counter() - start, response)
+        return response
+
+    async def async_send(
+        self, request: "AsyncBaseRequest", args: dict[str, Any]
+    ) -> ApiResponse:
+        """Make the call of an asyncio request with args, recording its response."""
+        start = time.perf_counter()
+        try:
+            response = await super().async_send(request, args)
+        except SellingApiException as error:
+            self.record_call(request, args, time.perf_counter() - start, error=error)
+            raise
+        self.record_call(request, args, time.perf_counter() - start, response)
+        return response
+
+    def iter_document(
+        self, document: dict[str, Any], fetch: Callable[[], Iterator[bytes]]
+    ) -> Iterator[bytes]:
+        """Yield the contents of a document, recording each chunk as it is read."""
+        start = time.perf_counter()
+        key = document_key(document)
+        download = uuid.uuid4().hex
+        count = 0
+        for chunk in fetch():
+            self.write(
+                {
+                    "type": DOCUMENT_CHUNK,
+                    "key": key,
+                    "download": download,
+                    "body": base64.b64encode(chunk).decode("ascii"),
+                }
+            )
+            count += 1
+            yield chunk
+        self.write(
+            {
+                "type": DOCUMENT,
+                "key": key,
+                "download": download,
+                "chunks": count,
+                "duration": time.perf_counter() - start,
+            }
+        )
+
+
+class ReplayTransport(Transport):
+    """Transport answering calls and downloads from a recorded archive.
+
+    Nothing is sent over the network, no clients are created and rate limits
+    are not applied. Calls are matched by operation and marketplace and
+    answered in the order they were recorded. Recordings made with the same
+    arguments are used if there are any, so repeated polls of a report replay
+    its progress. Once every matching recording has been used the last one is
+    repeated.
+
+    If delay is None each response is delayed by the time the recorded call
+    took, otherwise by delay seconds.
+    """
+
+    def __init__(self, path: Path | str, delay: float | None = 0.0) -> None:
+        """Load the archive."""
+        self.path = Path(path)
+        self.delay = delay
+        self.calls: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        self.documents: dict[str, dict[str, Any]] = {}
+        self.chunks: dict[str, list[str]] = {}
+        self.used: set[int] = set()
+        self.lock = threading.Lock()
+        with open_archive(self.path, "r") as f:
+            for line in f:
+                if line.strip():
+                    self.add(json.loads(line))
+
+    def add(self, entry: dict[str, Any]) -> None:
+        """Add a recorded entry.
+
+        Chunks are kept until the document they belong to is added. Chunks of
+        downloads that were never completed are ignored.
+        """
+        if entry["type"] == DOCUMENT_CHUNK:
+            self.chunks.setdefault(entry["download"], []).append(entry["body"])
+        elif entry["type"] == DOCUMENT:
+            if "download" in entry:
+                entry["bodies"] = self.chunks.pop(entry["download"], [])
+            self.documents[entry["key"]] = entry
+        else:
+            key = (entry["operation"], entry["marketplace"])
+            self.calls.setdefault(key, []).append(entry)
+
+    def get_delay(self, entry: dict[str, Any]) -> float:
+        """Return the number of seconds to delay replaying a recorded entry."""
+        if self.delay is None:
+            return float(entry.get("duration", 0.0))
+        return self.delay
+
+    def wait(self, entry: dict[str, Any]) -> None:
+        """Sleep for the delay of a recorded entry."""
+        delay = self.get_delay(entry)
+        if delay > 0:
+            time.sleep(delay)
+
+    def find_call(self, request: "BaseRequest", args: dict[str, Any]) -> dict[str, Any]:
+        """Return the recorded call answering a call of request with args."""
+        operation, marketplace, args_key = call_key(request, args)
+        entries = self.calls.get((operation, marketplace))
+        if not entries:
+            raise exceptions.RecordingNotFoundError(operation, marketplace)
+        matching = [
+            entry
+            for entry in entries
+            if json.dumps(entry["args"], sort_keys=True, default=str) == args_key
+        ]
+        candidates = matching or entries
+        with self.lock:
+            for entry in candidates:
+                if id(entry) not in self.used:
+                    self.used.add(id(entry))
+                    return entry
+        return candidates[-1]
+
+    def response(self, entry: dict[str, Any]) -> ApiResponse:
+        """Return the response of a recorded call, or raise its error."""
+        headers = entry.get("headers") or {}
+        if "error" in entry:
+            error_class = get_exception_for_code(entry["error"]["code"])
+            raise error_class(entry["error"]["errors"], headers=headers)
+        return ApiResponse(payload=entry["payload"], headers=headers)
+
+    def send(self, request: "BaseRequest", args: dict[str, Any]) -> ApiResponse:
+        """Return the recorded response to a call."""
+        entry = self.find_call(request, args)
+        self.wait(entry)
+        return self.response(entry)
+
+    async def async_send(
+        self, request: "AsyncBaseRequest", args: dict[str, Any]
+    ) -> ApiResponse:
+        """Return the recorded response to a call without blocking."""
+        entry = self.find_call(request, args)
+        delay = self.get_delay(entry)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self.response(entry)
+
+    def iter_document(
+        self, document: dict[str, Any], fetch: Callable[[], Iterator[bytes]]
+    ) -> Iterator[bytes]:
+        """Yield the recorded contents of a document in chunks.
+
+        Documents recorded whole, in a single entry, are split into chunks of
+        CHUNK_SIZE bytes.
+        """
+        key = document_key(document)
+        if key not in self.documents:
+            raise exceptions.RecordingNotFoundError(DOCUMENT, key)
+        entry = self.documents[key]
+        self.wait(entry)
+        if "bodies" in entry:
+            for body in entry["bodies"]:
+                yield base64.b64decode(body)
+            return
+        body = base64.b64decode(entry["body"])
+        for start in range(0, len(body), CHUNK_SIZE):
+            yield body[start : start + CHUNK_SIZE]
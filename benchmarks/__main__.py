@@ -0,0 +1,5 @@
+"""Run the amapi benchmarks."""
+
+from .suite import main
+
+main()
@@ -0,0 +1,250 @@
+"""A local stand-in for the SP-API Reports API and LWA token endpoint."""
+
+import gzip
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Self
+
+REPORTS_PATH = "/reports/2021-06-30/reports"
+DOCUMENTS_PATH = "/reports/2021-06-30/documents/"
+CONTENT_PATH = "/content/"
+TOKEN_PATH = "/auth/o2/token"
+RATE_LIMIT_HEADER = "x-amzn-RateLimit-Limit"
+CONTENT_TYPE = "text/tab-separated-values"
+
+DOCUMENT_ROWS = 10_000
+DOCUMENT = b"sku\tasin\tyour-price\testimated-fee-total\n" + b"".join(
+    b"SKU-%06d\tB%09d\t%d.99\t%d.50\n" % (i, i, i % 100, i % 10)
+    for i in range(DOCUMENT_ROWS)
+)
+
+
+class FakeSpApiHandler(BaseHTTPRequestHandler):
+    """Handle requests to a FakeSpApiServer."""
+
+    server: "FakeSpApiServer"
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Do not log requests."""
+
+    def send_body(
+        self, status: int, body: bytes, content_type: str = "application/json"
+    ) -> None:
+        """Send a response with a body."""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header(RATE_LIMIT_HEADER, str(self.server.rate_limit))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_content(self, content: bytes) -> None:
+        """Send document content, or the part of it asked for by a Range header."""
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match is None:
+            self.send_body(200, content, CONTENT_TYPE)
+            return
+        start = int(match.group(1))
+        end = min(int(match.group(2) or len(content) - 1), len(content) - 1)
+        if start >= len(content):
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{len(content)}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(206)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(content)}")
+        self.end_headers()
+        self.wfile.write(content[start : end + 1])
+
+    def send_json(self, status: int, data: Any) -> None:
+        """Send a JSON response."""
+        self.send_body(status, json.dumps(data).encode("utf8"))
+
+    def read_body(self) -> bytes:
+        """Return the body of the request."""
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def begin(self) -> bool:
+        """Count the request, apply latency and return False if it is throttled."""
+        throttled = self.server.count_request()
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if throttled:
+            self.send_json(
+                429,
+                {"errors": [{"code": "QuotaExceeded", "message": "Throttled"}]},
+            )
+            return False
+        return True
+
+    def do_POST(self) -> None:
+        """Create a report or an access token."""
+        body = self.read_body()
+        if self.path.startswith(TOKEN_PATH):
+            self.send_json(200, self.server.create_token())
+        elif not self.begin():
+            return
+        elif self.path.split("?")[0] == REPORTS_PATH:
+            self.send_json(202, self.server.create_report(json.loads(body or b"{}")))
+        else:
+            self.send_json(404, {"errors": [{"code": "NotFound"}]})
+
+    def do_GET(self) -> None:
+        """Return a report, list of reports, document or document content."""
+        path = self.path.split("?")[0]
+        if path.startswith(CONTENT_PATH):
+            self.send_content(self.server.document_content())
+            return
+        if not self.begin():
+            return
+        if path == REPORTS_PATH:
+            self.send_json(200, {"reports": self.server.list_reports()})
+        elif match := re.fullmatch(REPORTS_PATH + r"/(\w+)", path):
+            report = self.server.get_report(match.group(1))
+            if report is None:
+                self.send_json(404, {"errors": [{"code": "NotFound"}]})
+            else:
+                self.send_json(200, report)
+        elif path.startswith(DOCUMENTS_PATH):
+            document_id = path[len(DOCUMENTS_PATH) :]
+            self.send_json(200, self.server.get_document(document_id))
+        else:
+            self.send_json(404, {"errors": [{"code": "NotFound"}]})
+
+
+class FakeSpApiServer(ThreadingHTTPServer):
+    """Local HTTP server simulating the SP-API Reports API and LWA.
+
+    Reports stay IN_PROGRESS for processing_polls calls to getReport before they
+    are DONE. If throttle_every is set every nth SP-API request is answered with
+    a 429 response, and every request is delayed by latency seconds. The server
+    runs in a background thread while used as a context manager.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        processing_polls: int = 2,
+        throttle_every: int = 0,
+        latency: float = 0.0,
+        document: bytes = DOCUMENT,
+        compress: bool = False,
+        rate_limit: float = 100.0,
+    ) -> None:
+        """Bind the server to a free local port."""
+        super().__init__(("127.0.0.1", 0), FakeSpApiHandler)
+        self.processing_polls = processing_polls
+        self.throttle_every = throttle_every
+        self.latency = latency
+        self.document = gzip.compress(document) if compress else document
+        self.compress = compress
+        self.rate_limit = rate_limit
+        self.reports: dict[str, dict[str, Any]] = {}
+        self.polls: dict[str, int] = {}
+        self.requests = 0
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the server."""
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    @property
+    def token_url(self) -> str:
+        """Return the URL of the LWA token endpoint."""
+        return self.url + TOKEN_PATH
+
+    def __enter__(self) -> Self:
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.shutdown()
+        self.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def count_request(self) -> bool:
+        """Count an SP-API request and return True if it should be throttled."""
+        with self.lock:
+            self.requests += 1
+            return (
+                bool(self.throttle_every) and self.requests % self.throttle_every == 0
+            )
+
+    def create_token(self) -> dict[str, Any]:
+        """Return a new LWA access token."""
+        return {
+            "access_token": f"Atza|{next(self.ids)}",
+            "refresh_token": "REFRESH_TOKEN",
+            "expires_in": 3600,
+            "token_type": "bearer",
+        }
+
+    def create_report(self, data: dict[str, Any]) -> dict[str, str]:
+        """Create a report and return its ID."""
+        with self.lock:
+            report_id = str(next(self.ids))
+            created = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            self.reports[report_id] = {
+                "reportId": report_id,
+                "reportType": data.get("reportType"),
+                "marketplaceIds": data.get("marketplaceIds", []),
+                "dataStartTime": data.get("dataStartTime"),
+                "dataEndTime": data.get("dataEndTime") or created,
+                "createdTime": created,
+                "processingStatus": "IN_QUEUE",
+            }
+            self.polls[report_id] = 0
+        return {"reportId": report_id}
+
+    def get_report(self, report_id: str) -> dict[str, Any] | None:
+        """Return the current details of a report, advancing its processing."""
+        with self.lock:
+            report = self.reports.get(report_id)
+            if report is None:
+                return None
+            self.polls[report_id] += 1
+            if self.polls[report_id] > self.processing_polls:
+                report["processingStatus"] = "DONE"
+                report["reportDocumentId"] = f"DOC-{report_id}"
+            else:
+                report["processingStatus"] = "IN_PROGRESS"
+            return dict(report)
+
+    def list_reports(self) -> list[dict[str, Any]]:
+        """Return every finished report."""
+        with self.lock:
+            return [
+                dict(report)
+                for report in self.reports.values()
+                if report["processingStatus"] == "DONE"
+            ]
+
+    def get_document(self, document_id: str) -> dict[str, Any]:
+        """Return the details of a document."""
+        document = {
+            "reportDocumentId": document_id,
+            "url": f"{self.url}{CONTENT_PATH}{document_id}",
+        }
+        if self.compress:
+            document["compressionAlgorithm"] = "GZIP"
+        return document
+
+    def document_content(self) -> bytes:
+        """Return the content of every document."""
+        return self.document
@@ -0,0 +1,254 @@
+"""Benchmarks of the amapi request path against a FakeSpApiServer."""
+
+import argparse
+import io
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator, NamedTuple
+
+from sp_api.base import Marketplaces
+
+from amapi.ratelimit import RateLimiter
+from amapi.request import (
+    GET_FBA_ESTIMATE_FEES_REPORT,
+    BaseRequest,
+    GenerateReportRequest,
+    GetReportRequest,
+    ReportPoller,
+    download_document,
+)
+from amapi.session import AmapiSession
+
+from .fake_spapi import FakeSpApiServer
+
+MARKETPLACES = ("UK", "US", "DE", "FR")
+POLL_DELAY = 0.01
+ITERATIONS = 50
+CONCURRENCY = 4
+
+
+class Result(NamedTuple):
+    """The measurements of a benchmark."""
+
+    name: str
+    iterations: int
+    requests: int
+    seconds: float
+    p50: float
+    p99: float
+    peak_memory: int
+
+    @property
+    def requests_per_second(self) -> float:
+        """Return the number of SP-API requests made per second."""
+        return self.requests / self.seconds if self.seconds else 0.0
+
+
+def session_class(server: FakeSpApiServer, marketplace: str) -> type[AmapiSession]:
+    """Return a logged in session class for a marketplace using server."""
+    session: type[AmapiSession] = type(
+        f"BenchmarkSession{marketplace}",
+        (AmapiSession,),
+        {
+            "marketplace": Marketplaces[marketplace],
+            "ENDPOINT": server.url,
+            "LWA_ENDPOINT": server.token_url,
+            "REFRESH_TOKEN_KEY": f"REFRESH_TOKEN_{marketplace}",
+            "APP_ID_KEY": f"LWA_APP_ID_{marketplace}",
+            "CLIENT_SECRET_KEY": f"LWA_CLIENT_SECRET_{marketplace}",
+        },
+    )
+    session.set_login(
+        refresh_token=f"REFRESH_TOKEN_{marketplace}",
+        app_id="APP_ID",
+        client_secret="CLIENT_SECRET",
+    )
+    return session
+
+
+def fetch_report(session: AmapiSession) -> int:
+    """Generate, wait for and download a report, returning its size."""
+    report_id = GenerateReportRequest(session).call(
+        report_type=GET_FBA_ESTIMATE_FEES_REPORT
+    )
+    poller = ReportPoller(session, initial_delay=POLL_DELAY, max_delay=POLL_DELAY)
+    report = poller.poll(str(report_id))
+    return download_document(session, str(report["reportDocumentId"]), io.BytesIO())
+
+
+def single_call(server: FakeSpApiServer) -> Callable[[], object]:
+    """Return a benchmark of one getReport call."""
+    session = session_class(server, "UK")()
+    report_id = server.create_report({"reportType": GET_FBA_ESTIMATE_FEES_REPORT})
+    request = GetReportRequest(session)
+    return lambda: request.call(report_id=report_id["reportId"])
+
+
+def pipeline(server: FakeSpApiServer) -> Callable[[], object]:
+    """Return a benchmark of generating and downloading one report."""
+    session = session_class(server, "UK")()
+    return lambda: fetch_report(session)
+
+
+def multi_marketplace(server: FakeSpApiServer) -> Callable[[], object]:
+    """Return a benchmark of fetching a report for every marketplace at once."""
+    sessions = [session_class(server, name)() for name in MARKETPLACES]
+    executor = ThreadPoolExecutor(max_workers=len(sessions))
+    return lambda: list(executor.map(fetch_report, sessions))
+
+
+BENCHMARKS: dict[str, Callable[[FakeSpApiServer], Callable[[], object]]] = {
+    "single_call": single_call,
+    "pipeline": pipeline,
+    "multi_marketplace": multi_marketplace,
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Return the q percentile of values."""
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[round(q) - 1]
+
+
+def measure(
+    name: str,
+    server: FakeSpApiServer,
+    iterations: int = ITERATIONS,
+    concurrency: int = 1,
+) -> Result:
+    """Run a benchmark and return its measurements.
+
+    Latency is measured for each iteration, with up to concurrency iterations
+    running at once. Peak memory is measured separately in one extra iteration
+    so that tracing does not slow down the timed iterations.
+    """
+    run = BENCHMARKS[name](server)
+    run()
+    latencies: list[float] = []
+
+    def timed() -> None:
+        start = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - start)
+
+    requests = server.requests
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(timed) for _ in range(iterations)]:
+            future.result()
+    seconds = time.perf_counter() - start
+    requests = server.requests - requests
+    tracemalloc.start()
+    try:
+        run()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return Result(
+        name=name,
+        iterations=iterations,
+        requests=requests,
+        seconds=seconds,
+        p50=percentile(latencies, 50),
+        p99=percentile(latencies, 99),
+        peak_memory=peak_memory,
+    )
+
+
+@contextmanager
+def unlimited_requests() -> Iterator[None]:
+    """Do not hold requests to the documented SP-API rate limits."""
+    rate_limiter = BaseRequest.RATE_LIMITER
+    BaseRequest.RATE_LIMITER = RateLimiter(limits={})
+    try:
+        yield
+    finally:
+        BaseRequest.RATE_LIMITER = rate_limiter
+        AmapiSession.clear_clients()
+
+
+def run_benchmarks(
+    names: list[str],
+    iterations: int = ITERATIONS,
+    concurrency: int = CONCURRENCY,
+    processing_polls: int = 2,
+    throttle_every: int = 0,
+    latency: float = 0.0,
+    compress: bool = False,
+) -> list[Result]:
+    """Run benchmarks against a new FakeSpApiServer and return their results."""
+    server = FakeSpApiServer(
+        processing_polls=processing_polls,
+        throttle_every=throttle_every,
+        latency=latency,
+        compress=compress,
+    )
+    with server, unlimited_requests():
+        return [
+            measure(name, server, iterations=iterations, concurrency=concurrency)
+            for name in names
+        ]
+
+
+def format_results(results: list[Result]) -> str:
+    """Return results as a table."""
+    lines = [
+        f"{'benchmark':<20}{'iterations':>12}{'req/s':>10}"
+        f"{'p50 ms':>10}{'p99 ms':>10}{'peak KiB':>10}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result.name:<20}{result.iterations:>12}"
+            f"{result.requests_per_second:>10.1f}{result.p50 * 1000:>10.2f}"
+            f"{result.p99 * 1000:>10.2f}{result.peak_memory / 1024:>10.0f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        metavar="benchmark",
+        help=f"Benchmarks to run from {', '.join(BENCHMARKS)}. Defaults to all.",
+    )
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--processing-polls", type=int, default=2)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--compress", action="store_true")
+    parser.add_argument("--json", action="store_true", help="Output JSON.")
+    args = parser.parse_args(argv)
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark {name!r}")
+    results = run_benchmarks(
+        args.benchmarks or list(BENCHMARKS),
+        iterations=args.iterations,
+        concurrency=args.concurrency,
+        processing_polls=args.processing_polls,
+        throttle_every=args.throttle_every,
+        latency=args.latency,
+        compress=args.compress,
+    )
+    if args.json:
+        json.dump(
+            [
+                dict(result._asdict(), requests_per_second=result.requests_per_second)
+                for result in results
+            ],
+            sys.stdout,
+            indent=2,
+        )
+        print()
+    else:
+        print(format_results(results))
@@ -0,0 +1,21 @@
+from typing import Any
+
+from sp_api.auth import AccessTokenResponse, Credentials
+
+class AccessTokenClient:
+    scheme: str
+    host: str
+    path: str
+    cred: Credentials
+    data: dict[str, str]
+    headers: dict[str, str]
+    def __init__(
+        self,
+        refresh_token: str | None = None,
+        credentials: Any = None,
+        proxies: Any = None,
+        verify: bool = True,
+    ) -> None: ...
+    async def _request(self, url: str, data: Any, headers: Any) -> dict[str, Any]: ...
+    async def get_auth(self) -> AccessTokenResponse: ...
+    async def aclose(self) -> None: ...
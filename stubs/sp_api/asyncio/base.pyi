@@ -0,0 +1,16 @@
+from typing import Callable
+
+from sp_api.asyncio.auth import AccessTokenClient
+from sp_api.base import Marketplaces
+
+class Client:
+    endpoint: str
+    _auth: AccessTokenClient
+    def __init__(
+        self,
+        marketplace: Marketplaces,
+        *,
+        credentials: dict[str, str] | None,
+        auth_token_client_class: Callable[..., AccessTokenClient] = ...,
+    ): ...
+    async def aclose(self) -> None: ...
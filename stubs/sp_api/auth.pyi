@@ -0,0 +1,30 @@
+from typing import Any
+
+class Credentials:
+    client_id: str
+    client_secret: str
+    refresh_token: str
+
+class AccessTokenResponse:
+    access_token: str
+    refresh_token: str
+    expires_in: int
+    token_type: str
+    def __init__(self, **kwargs: Any) -> None: ...
+
+class AccessTokenClient:
+    scheme: str
+    host: str
+    path: str
+    cred: Credentials
+    data: dict[str, str]
+    headers: dict[str, str]
+    def __init__(
+        self,
+        refresh_token: str | None = None,
+        credentials: Any = None,
+        proxies: Any = None,
+        verify: bool = True,
+    ) -> None: ...
+    def _request(self, url: str, data: Any, headers: Any) -> dict[str, Any]: ...
+    def get_auth(self) -> AccessTokenResponse: ...
@@ -0,0 +1,63 @@
+from enum import Enum
+from typing import Callable, Self
+
+from sp_api.auth import AccessTokenClient
+
+class Marketplaces(Enum):
+    endpioint: str
+    marketplace_id: str
+    region: str
+    def __init__(self, endpioint: str, marketplace_id: str, region: str): ...
+    AE = Self
+    BE = Self
+    DE = Self
+    PL = Self
+    EG = Self
+    ES = Self
+    FR = Self
+    GB = Self
+    IN = Self
+    IT = Self
+    IE = Self
+    NL = Self
+    SA = Self
+    SE = Self
+    TR = Self
+    UK = Self
+    ZA = Self
+    AU = Self
+    JP = Self
+    SG = Self
+    US = Self
+    BR = Self
+    CA = Self
+    MX = Self
+
+from sp_api.base.exceptions import SellingApiException as SellingApiException
+from sp_api.base.exceptions import (
+    SellingApiRequestThrottledException as SellingApiRequestThrottledException,
+)
+
+class Client:
+    endpoint: str
+    _auth: AccessTokenClient
+    def __init__(
+        self,
+        marketplace: Marketplaces,
+        *,
+        credentials: dict[str, str] | None,
+        auth_token_client_class: Callable[..., AccessTokenClient] = ...,
+    ): ...
+    def close(self) -> None: ...
+
+class ApiResponse:
+    payload: dict[str, object]
+    headers: dict[str, str] | None
+    def __init__(
+        self,
+        payload: object = None,
+        errors: object = None,
+        pagination: object = None,
+        headers: dict[str, str] | None = None,
+        **kwargs: object,
+    ) -> None: ...
@@ -0,0 +1,11 @@
+from typing import Any
+
+class SellingApiException(Exception):
+    code: int
+    error: Any
+    headers: dict[str, str] | None
+    def __init__(self, error: Any, headers: dict[str, str] | None) -> None: ...
+
+class SellingApiRequestThrottledException(SellingApiException): ...
+
+def get_exception_for_code(code: int) -> type[SellingApiException]: ...
@@ -0,0 +1,236 @@
+import asyncio
+import datetime as dt
+from unittest import mock
+
+import pytest
+from sp_api.asyncio.api import Reports
+from sp_api.base import SellingApiBadRequestException, SellingApiServerException
+
+from amapi import aio, exceptions
+from amapi.request import ProcessingStatus
+from amapi.retry import RetryPolicy
+
+
+@pytest.fixture
+def mock_session():
+    return mock.Mock()
+
+
+@pytest.fixture
+def mock_client(mock_session):
+    client = mock.Mock()
+    client.request_method = mock.AsyncMock()
+    mock_session.get_async_client.return_value = client
+    return client
+
+
+@pytest.mark.parametrize(
+    "request_class,request_method",
+    (
+        (aio.AsyncGenerateReportRequest, "create_report"),
+        (aio.AsyncGetReportRequest, "get_report"),
+        (aio.AsyncGetDocumentIdRequest, "get_report"),
+        (aio.AsyncGetDocumentRequest, "get_report_document"),
+        (aio.AsyncGetDocumentUrlRequest, "get_report_document"),
+    ),
+)
+def test_request_class_attributes(request_class, request_method):
+    assert request_class.ASYNC_REQUEST_CLASS == Reports
+    assert request_class.REQUEST_METHOD == request_method
+
+
+def test_get_async_request_method(mock_session):
+    request = aio.AsyncBaseRequest(session=mock_session)
+    value = request.get_async_request()
+    mock_session.get_async_client.assert_called_once_with(
+        aio.AsyncBaseRequest.ASYNC_REQUEST_CLASS
+    )
+    assert value == mock_session.get_async_client.return_value
+
+
+def test_make_request_method(mock_session, mock_client):
+    request = aio.AsyncBaseRequest(session=mock_session)
+    request.REQUEST_METHOD = "request_method"
+    request.request_args = mock.Mock(return_value={"arg": "value"})
+    request.handle_response = mock.Mock()
+    value = asyncio.run(request.make_request(a="b"))
+    request.request_args.assert_called_once_with(a="b")
+    mock_client.request_method.assert_awaited_once_with(arg="value")
+    request.handle_response.assert_called_once_with(
+        mock_client.request_method.return_value
+    )
+    assert value == request.handle_response.return_value
+
+
+def test_generate_report_request_call(mock_session, mock_client):
+    mock_client.create_report = mock.AsyncMock()
+    mock_client.create_report.return_value.payload = {"reportId": "report_id"}
+    request = aio.AsyncGenerateReportRequest(session=mock_session)
+    value = asyncio.run(request.call(report_type="report_type"))
+    kwargs = mock_client.create_report.await_args.kwargs
+    assert kwargs["reportType"] == "report_type"
+    assert value == "report_id"
+
+
+def test_report_poller_poll(mock_session):
+    poller = aio.AsyncReportPoller(mock_session, initial_delay=1, jitter=0)
+    poller.get_status = mock.AsyncMock(
+        side_effect=[
+            {"processingStatus": ProcessingStatus.IN_PROGRESS},
+            {"processingStatus": ProcessingStatus.DONE, "reportDocumentId": "1"},
+        ]
+    )
+    with mock.patch("amapi.aio.asyncio.sleep") as mock_sleep:
+        value = asyncio.run(poller.poll("report_id"))
+    mock_sleep.assert_awaited_once_with(1)
+    assert value["reportDocumentId"] == "1"
+
+
+def test_report_poller_poll_raises_for_failed_report(mock_session):
+    poller = aio.AsyncReportPoller(mock_session)
+    poller.get_status = mock.AsyncMock(return_value={"processingStatus": "FATAL"})
+    with pytest.raises(exceptions.ReportProcessingError):
+        asyncio.run(poller.poll("report_id"))
+
+
+@mock.patch("amapi.aio.AsyncGetReportRequest")
+def test_report_poller_get_status(mock_request_class, mock_session):
+    mock_request_class.return_value.call = mock.AsyncMock(return_value={"a": "b"})
+    value = asyncio.run(aio.AsyncReportPoller(mock_session).get_status("report_id"))
+    mock_request_class.assert_called_once_with(mock_session)
+    mock_request_class.return_value.call.assert_awaited_once_with(report_id="report_id")
+    assert value == {"a": "b"}
+
+
+@pytest.mark.parametrize(
+    "function,request_class,kwargs,request_args,call_kwargs",
+    (
+        (
+            aio.request_generate_report,
+            "AsyncGenerateReportRequest",
+            {"report_type": "report_type"},
+            (None,),
+            {"report_type": "report_type", "date": None, "end_date": None},
+        ),
+        (
+            aio.request_document_id,
+            "AsyncGetDocumentIdRequest",
+            {"report_id": "1"},
+            (),
+            {"report_id": "1"},
+        ),
+        (
+            aio.request_document_url,
+            "AsyncGetDocumentUrlRequest",
+            {"document_id": "1"},
+            (),
+            {"document_id": "1"},
+        ),
+    ),
+)
+def test_request_helpers(
+    mock_session, function, request_class, kwargs, request_args, call_kwargs
+):
+    with mock.patch(f"amapi.aio.{request_class}") as mock_request_class:
+        mock_request_class.return_value.call = mock.AsyncMock(return_value=123)
+        value = asyncio.run(function(mock_session, **kwargs))
+    mock_request_class.assert_called_once_with(mock_session, *request_args)
+    mock_request_class.return_value.call.assert_awaited_once_with(**call_kwargs)
+    assert value == "123"
+
+
+@mock.patch("amapi.aio.AsyncGetDocumentRequest")
+def test_request_document(mock_request_class, mock_session):
+    mock_request_class.return_value.call = mock.AsyncMock(return_value={"url": "u"})
+    value = asyncio.run(aio.request_document(mock_session, document_id="1"))
+    assert value == {"url": "u"}
+
+
+@mock.patch("amapi.aio.AsyncReportPoller")
+def test_wait_for_report(mock_poller_class, mock_session):
+    mock_poller_class.return_value.poll = mock.AsyncMock(
+        return_value={"reportDocumentId": "document_id"}
+    )
+    value = asyncio.run(aio.wait_for_report(mock_session, report_id="report_id"))
+    mock_poller_class.assert_called_once_with(mock_session, timeout=None)
+    assert value == "document_id"
+
+
+def test_make_request_method_is_rate_limited(mock_session, mock_client):
+    request = aio.AsyncBaseRequest(session=mock_session)
+    request.REQUEST_METHOD = "request_method"
+    request.RATE_LIMITER = mock.Mock()
+    request.RATE_LIMITER.reserve.return_value = 2
+    with mock.patch("amapi.aio.asyncio.sleep") as mock_sleep:
+        asyncio.run(request.make_request())
+    request.RATE_LIMITER.reserve.assert_called_once_with(
+        "request_method", request.rate_limit_key
+    )
+    mock_sleep.assert_awaited_once_with(2)
+    request.RATE_LIMITER.update.assert_called_once_with(
+        "request_method",
+        request.rate_limit_key,
+        mock_client.request_method.return_value,
+    )
+
+
+def test_call_method_retries_retryable_errors(mock_session):
+    request = aio.AsyncBaseRequest(session=mock_session)
+    error = SellingApiServerException([], {})
+    request.make_request = mock.AsyncMock(side_effect=[error, "value"])
+    request.RETRY_POLICY = RetryPolicy(initial_delay=1, jitter=0)
+    with mock.patch("amapi.aio.asyncio.sleep") as mock_sleep:
+        value = asyncio.run(request.call(a="b"))
+    mock_sleep.assert_awaited_once_with(1)
+    assert request.make_request.await_count == 2
+    assert value == "value"
+
+
+def test_call_method_raises_non_retryable_errors(mock_session):
+    request = aio.AsyncBaseRequest(session=mock_session)
+    request.make_request = mock.AsyncMock(
+        side_effect=SellingApiBadRequestException([], {})
+    )
+    with pytest.raises(SellingApiBadRequestException):
+        asyncio.run(request.call())
+    request.make_request.assert_awaited_once_with()
+
+
+@mock.patch("amapi.aio.AsyncGenerateReportRequest")
+@mock.patch("amapi.aio.AsyncGetReportsRequest")
+def test_request_generate_report_reuses_recent_report(
+    mock_get_reports_class, mock_generate_class, mock_session
+):
+    mock_session.marketplace.marketplace_id = "MARKETPLACE"
+    mock_get_reports_class.return_value.call = mock.AsyncMock(
+        return_value=[
+            {
+                "reportId": "1",
+                "marketplaceIds": ["MARKETPLACE"],
+                "dataStartTime": "2024-01-01T00:00:00+00:00",
+                "createdTime": "2024-01-04T00:00:00+00:00",
+            }
+        ]
+    )
+    value = asyncio.run(
+        aio.request_generate_report(
+            mock_session, "report_type", max_age=dt.timedelta(hours=1)
+        )
+    )
+    mock_generate_class.assert_not_called()
+    assert value == "1"
+
+
+@mock.patch("amapi.aio.AsyncGenerateReportRequest")
+@mock.patch("amapi.aio.AsyncGetReportsRequest")
+def test_request_generate_report_creates_report_without_recent_report(
+    mock_get_reports_class, mock_generate_class, mock_session
+):
+    mock_get_reports_class.return_value.call = mock.AsyncMock(return_value=[])
+    mock_generate_class.return_value.call = mock.AsyncMock(return_value="2")
+    value = asyncio.run(
+        aio.request_generate_report(
+            mock_session, "report_type", max_age=dt.timedelta(hours=1)
+        )
+    )
+    assert value == "2"
@@ -0,0 +1,61 @@
+import pytest
+
+from amapi.atomic import AtomicWriter
+
+
+def test_writes_file(tmp_path):
+    path = tmp_path / "file.txt"
+    with AtomicWriter(path, "w") as f:
+        f.write("contents")
+    assert path.read_text() == "contents"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_replaces_existing_file(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_text("old")
+    with AtomicWriter(path, "w") as f:
+        f.write("new")
+    assert path.read_text() == "new"
+
+
+def test_file_is_not_replaced_until_complete(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_text("old")
+    with AtomicWriter(path, "w") as f:
+        f.write("new")
+        f.flush()
+        assert path.read_text() == "old"
+
+
+def test_error_leaves_file_unchanged(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        with AtomicWriter(path, "w") as f:
+            f.write("new")
+            raise RuntimeError()
+    assert path.read_text() == "old"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_path_set_within_block(tmp_path):
+    writer = AtomicWriter(directory=tmp_path, suffix=".part")
+    with writer as f:
+        f.write(b"data")
+        assert writer.temp_path.suffix == ".part"
+        writer.path = tmp_path / "named"
+    assert (tmp_path / "named").read_bytes() == b"data"
+    assert list(tmp_path.iterdir()) == [tmp_path / "named"]
+
+
+def test_missing_path_removes_temporary_file(tmp_path):
+    with pytest.raises(ValueError):
+        with AtomicWriter(directory=tmp_path) as f:
+            f.write(b"data")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_path_or_directory_required():
+    with pytest.raises(ValueError):
+        AtomicWriter()
@@ -0,0 +1,110 @@
+import datetime as dt
+import io
+from unittest import mock
+
+import pytest
+
+from amapi import backfill, parser
+from amapi.batch import BatchResult
+from amapi.incremental import DataWindow
+
+START = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+END = dt.datetime(2024, 1, 4, tzinfo=dt.timezone.utc)
+
+
+@pytest.fixture
+def mock_session_class():
+    return mock.MagicMock()
+
+
+def test_split_range():
+    assert backfill.split_range(START, END, 3) == [
+        DataWindow(START, START + dt.timedelta(days=1)),
+        DataWindow(START + dt.timedelta(days=1), START + dt.timedelta(days=2)),
+        DataWindow(START + dt.timedelta(days=2), END),
+    ]
+
+
+def test_split_range_into_one_window():
+    assert backfill.split_range(START, END, 1) == [DataWindow(START, END)]
+
+
+def test_split_range_ends_at_end():
+    windows = backfill.split_range(START, START + dt.timedelta(seconds=10), 3)
+    assert windows[-1].end == START + dt.timedelta(seconds=10)
+    assert all(a.end == b.start for a, b in zip(windows, windows[1:], strict=False))
+
+
+@pytest.mark.parametrize("count", (0, -1))
+def test_split_range_with_invalid_count(count):
+    with pytest.raises(ValueError):
+        backfill.split_range(START, END, count)
+
+
+def test_split_range_with_empty_range():
+    with pytest.raises(ValueError):
+        backfill.split_range(END, START, 2)
+
+
+def test_download_table(mock_session_class):
+    def download(session, document_id, dest):
+        dest.write(b"sku\tqty\nA\t1\n")
+
+    with mock.patch(
+        "amapi.backfill.download_document", side_effect=download
+    ) as mock_download:
+        table = backfill.download_table(mock_session_class, "REPORT", "document_id")
+    session = mock_session_class.return_value.__enter__.return_value
+    assert mock_download.call_args.args == (session,)
+    assert mock_download.call_args.kwargs["document_id"] == "document_id"
+    assert table["sku"] == ["A"]
+
+
+def table(content):
+    return parser.parse_report(io.BytesIO(content))
+
+
+@pytest.fixture
+def mock_report_batch():
+    with mock.patch("amapi.backfill.ReportBatch") as m:
+        m.side_effect = lambda specs, timeout: [
+            BatchResult(spec, f"report_{i}", f"document_{i}")
+            for i, spec in reversed(list(enumerate(specs)))
+        ]
+        yield m
+
+
+@pytest.fixture
+def mock_download_table():
+    tables = {
+        "document_0": table(b"sku\tqty\nA\t1\nB\t2\n"),
+        "document_1": table(b"sku\tqty\nB\t2\nC\t3\n"),
+    }
+    with mock.patch("amapi.backfill.download_table") as m:
+        m.side_effect = lambda session_class, report_type, document_id: tables[
+            document_id
+        ]
+        yield m
+
+
+def test_backfill(mock_session_class, mock_report_batch, mock_download_table):
+    result = backfill.backfill(mock_session_class, "REPORT", START, END, windows=2)
+    specs = mock_report_batch.call_args.args[0]
+    assert [(spec.start, spec.end) for spec in specs] == backfill.split_range(
+        START, END, 2
+    )
+    assert all(spec.report_type == "REPORT" for spec in specs)
+    assert mock_report_batch.call_args.kwargs == {"timeout": None}
+    assert result["sku"] == ["A", "B", "C"]
+
+
+def test_backfill_raises_window_error(mock_session_class, mock_download_table):
+    error = Exception("failed")
+    with mock.patch("amapi.backfill.ReportBatch") as mock_batch:
+        mock_batch.side_effect = lambda specs, timeout: [
+            BatchResult(specs[0], error=error)
+        ]
+        with pytest.raises(Exception) as exc_info:
+            backfill.backfill(mock_session_class, "REPORT", START, END, windows=2)
+    assert exc_info.value is error
+    mock_download_table.assert_not_called()
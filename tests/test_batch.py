@@ -0,0 +1,169 @@
+import datetime as dt
+from unittest import mock
+
+import pytest
+
+from amapi import batch, exceptions
+
+
+@pytest.fixture
+def mock_session_class():
+    return mock.MagicMock()
+
+
+@pytest.fixture
+def session(mock_session_class):
+    return mock_session_class.return_value.__enter__.return_value
+
+
+@pytest.fixture
+def specs(mock_session_class):
+    return [
+        batch.ReportSpec(mock_session_class, "REPORT_A"),
+        batch.ReportSpec(
+            mock_session_class,
+            "REPORT_B",
+            start=dt.datetime(2024, 1, 1),
+            end=dt.datetime(2024, 1, 2),
+        ),
+    ]
+
+
+@pytest.fixture
+def mock_generate_request():
+    with mock.patch("amapi.batch.GenerateReportRequest") as m:
+        m.return_value.call.side_effect = ["report_a", "report_b"]
+        yield m
+
+
+@pytest.fixture
+def mock_get_report_request():
+    with mock.patch("amapi.request.GetReportRequest") as m:
+        yield m
+
+
+@pytest.fixture
+def mock_sleep():
+    with mock.patch("amapi.batch.time.sleep") as m:
+        yield m
+
+
+@pytest.fixture
+def mock_monotonic():
+    with mock.patch("amapi.batch.time.monotonic") as m:
+        m.return_value = 0
+        yield m
+
+
+def statuses(mapping):
+    def get_report(report_id):
+        status = mapping[report_id].pop(0)
+        return {"processingStatus": status, "reportDocumentId": f"doc_{report_id}"}
+
+    return get_report
+
+
+def test_batch_result_ok(specs):
+    assert batch.BatchResult(specs[0], "1", document_id="2").ok is True
+    assert batch.BatchResult(specs[0], error=ValueError()).ok is False
+
+
+def test_submits_all_reports_before_polling(
+    specs,
+    session,
+    mock_generate_request,
+    mock_get_report_request,
+    mock_sleep,
+    mock_monotonic,
+):
+    mock_get_report_request.return_value.call.side_effect = statuses(
+        {"report_a": ["DONE"], "report_b": ["DONE"]}
+    )
+    results = list(batch.ReportBatch(specs))
+    assert mock_generate_request.return_value.call.call_args_list == [
+        mock.call(report_type="REPORT_A", date=None, end_date=None),
+        mock.call(
+            report_type="REPORT_B",
+            date=dt.datetime(2024, 1, 1),
+            end_date=dt.datetime(2024, 1, 2),
+        ),
+    ]
+    mock_generate_request.assert_called_with(session)
+    assert results == [
+        batch.BatchResult(specs[0], "report_a", document_id="doc_report_a"),
+        batch.BatchResult(specs[1], "report_b", document_id="doc_report_b"),
+    ]
+    mock_sleep.assert_not_called()
+
+
+def test_yields_reports_as_they_finish(
+    specs, mock_generate_request, mock_get_report_request, mock_sleep, mock_monotonic
+):
+    mock_get_report_request.return_value.call.side_effect = statuses(
+        {"report_a": ["IN_PROGRESS", "IN_PROGRESS", "DONE"], "report_b": ["DONE"]}
+    )
+    results = list(batch.ReportBatch(specs, initial_delay=1, jitter=0))
+    assert [result.report_id for result in results] == ["report_b", "report_a"]
+    assert mock_get_report_request.return_value.call.call_count == 4
+    assert mock_sleep.call_args_list == [mock.call(1), mock.call(2)]
+
+
+def test_enters_each_session_class_once(
+    specs,
+    mock_session_class,
+    mock_generate_request,
+    mock_get_report_request,
+    mock_monotonic,
+):
+    mock_get_report_request.return_value.call.side_effect = statuses(
+        {"report_a": ["DONE"], "report_b": ["DONE"]}
+    )
+    list(batch.ReportBatch(specs))
+    mock_session_class.assert_called_once_with()
+    mock_session_class.return_value.__exit__.assert_called_once()
+
+
+def test_submit_error_is_returned(
+    specs, mock_generate_request, mock_get_report_request, mock_monotonic
+):
+    error = ValueError()
+    mock_generate_request.return_value.call.side_effect = [error, "report_b"]
+    mock_get_report_request.return_value.call.side_effect = statuses(
+        {"report_b": ["DONE"]}
+    )
+    results = list(batch.ReportBatch(specs))
+    assert results[0] == batch.BatchResult(specs[0], error=error)
+    assert results[1].ok
+
+
+def test_failed_report_is_returned(
+    specs, mock_generate_request, mock_get_report_request, mock_monotonic
+):
+    mock_get_report_request.return_value.call.side_effect = statuses(
+        {"report_a": ["FATAL"], "report_b": ["DONE"]}
+    )
+    results = list(batch.ReportBatch(specs))
+    assert isinstance(results[0].error, exceptions.ReportProcessingError)
+    assert results[0].report_id == "report_a"
+    assert results[1].ok
+
+
+def test_pending_reports_time_out(
+    specs, mock_generate_request, mock_get_report_request, mock_sleep, mock_monotonic
+):
+    mock_monotonic.side_effect = [0, 11]
+    mock_get_report_request.return_value.call.side_effect = statuses(
+        {"report_a": ["IN_QUEUE"], "report_b": ["IN_QUEUE"]}
+    )
+    results = list(batch.ReportBatch(specs, timeout=10))
+    assert [result.report_id for result in results] == ["report_a", "report_b"]
+    for result in results:
+        assert isinstance(result.error, exceptions.ReportTimeoutError)
+    mock_sleep.assert_not_called()
+
+
+@mock.patch("amapi.batch.ReportBatch")
+def test_generate_reports(mock_batch_class, specs):
+    mock_batch_class.return_value.__iter__.return_value = iter(["result"])
+    assert list(batch.generate_reports(specs, timeout=5)) == ["result"]
+    mock_batch_class.assert_called_once_with(specs, timeout=5)
@@ -0,0 +1,76 @@
+import io
+import json
+
+import pytest
+
+from amapi.parser import parse_report
+from amapi.request import GET_FBA_ESTIMATE_FEES_REPORT, BaseRequest
+from amapi.session import AmapiSession
+from benchmarks import suite
+from benchmarks.fake_spapi import DOCUMENT, FakeSpApiServer
+
+
+@pytest.fixture
+def server():
+    with FakeSpApiServer(processing_polls=1) as server, suite.unlimited_requests():
+        yield server
+
+
+def test_fetch_report_from_fake_server(server):
+    session = suite.session_class(server, "DE")()
+    f = io.BytesIO()
+    report_id = suite.GenerateReportRequest(session).call(
+        report_type=GET_FBA_ESTIMATE_FEES_REPORT
+    )
+    report = suite.ReportPoller(session, initial_delay=0.01).poll(report_id)
+    suite.download_document(session, report["reportDocumentId"], f)
+    assert f.getvalue() == DOCUMENT
+    assert server.reports[report_id]["marketplaceIds"] == [
+        session.marketplace.marketplace_id
+    ]
+    assert len(parse_report(io.BytesIO(f.getvalue()))) == 10_000
+
+
+def test_fake_server_compresses_documents():
+    with FakeSpApiServer(processing_polls=0, compress=True) as server:
+        with suite.unlimited_requests():
+            session = suite.session_class(server, "UK")()
+            assert suite.fetch_report(session) == len(DOCUMENT)
+
+
+def test_unlimited_requests_restores_rate_limiter():
+    rate_limiter = BaseRequest.RATE_LIMITER
+    with suite.unlimited_requests():
+        assert BaseRequest.RATE_LIMITER is not rate_limiter
+    assert BaseRequest.RATE_LIMITER is rate_limiter
+
+
+@pytest.mark.parametrize("name", list(suite.BENCHMARKS))
+def test_measure(server, name):
+    result = suite.measure(name, server, iterations=2, concurrency=2)
+    assert result.name == name
+    assert result.iterations == 2
+    assert result.requests > 0
+    assert result.requests_per_second > 0
+    assert 0 < result.p50 <= result.p99
+    assert result.peak_memory > 0
+
+
+def test_percentile():
+    values = [float(value) for value in range(1, 101)]
+    assert suite.percentile(values, 50) == pytest.approx(50.5)
+    assert suite.percentile(values, 99) == pytest.approx(99.01)
+    assert suite.percentile([1.0], 99) == 1.0
+    assert suite.percentile([], 99) == 0.0
+
+
+def test_main_outputs_json(capsys):
+    suite.main(["single_call", "--iterations", "2", "--json"])
+    results = json.loads(capsys.readouterr().out)
+    assert [result["name"] for result in results] == ["single_call"]
+    AmapiSession.clear_clients()
+
+
+def test_main_rejects_unknown_benchmark():
+    with pytest.raises(SystemExit):
+        suite.main(["unknown"])
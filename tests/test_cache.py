@@ -0,0 +1,103 @@
+import hashlib
+import os
+
+import pytest
+
+from amapi.cache import DocumentCache
+
+CONTENT = b"sku\tfee\nABC\t1.23\n"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DocumentCache(tmp_path / "cache", max_size=100)
+
+
+def write(content):
+    return lambda f: f.write(content)
+
+
+def set_age(path, age):
+    stat = path.stat()
+    os.utime(path, (stat.st_atime - age, stat.st_mtime - age))
+
+
+def test_creates_directory(tmp_path):
+    DocumentCache(tmp_path / "a" / "b")
+    assert (tmp_path / "a" / "b").is_dir()
+
+
+def test_default_max_size(tmp_path):
+    assert DocumentCache(tmp_path).max_size == DocumentCache.MAX_SIZE
+
+
+def test_get_returns_None_for_missing_document(cache):
+    assert cache.get("document_id") is None
+
+
+def test_put_and_get(cache):
+    path = cache.put("document_id", write(CONTENT))
+    assert path.read_bytes() == CONTENT
+    assert path.name == (
+        f"{DocumentCache.key('document_id')}.{hashlib.sha256(CONTENT).hexdigest()}"
+    )
+    assert cache.get("document_id") == path
+
+
+def test_put_replaces_existing_document(cache):
+    cache.put("document_id", write(b"old"))
+    cache.put("document_id", write(b"old"))
+    assert len(cache.entries()) == 1
+
+
+def test_put_removes_temporary_file_on_error(cache):
+    def fail(f):
+        f.write(b"partial")
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        cache.put("document_id", fail)
+    assert list(cache.directory.iterdir()) == []
+    assert cache.get("document_id") is None
+
+
+def test_get_removes_corrupt_document(cache):
+    path = cache.put("document_id", write(CONTENT))
+    path.write_bytes(b"corrupt")
+    assert cache.get("document_id") is None
+    assert not path.exists()
+
+
+def test_get_without_verify_skips_integrity_check(cache):
+    path = cache.put("document_id", write(CONTENT))
+    path.write_bytes(b"corrupt")
+    assert cache.get("document_id", verify=False) == path
+
+
+def test_get_ignores_temporary_files(cache):
+    (cache.directory / f"{DocumentCache.key('document_id')}.tmp").write_bytes(b"")
+    assert cache.get("document_id") is None
+    assert cache.entries() == []
+
+
+def test_remove(cache):
+    cache.put("document_id", write(CONTENT))
+    cache.remove("document_id")
+    assert cache.get("document_id") is None
+
+
+def test_evicts_least_recently_used_documents(cache):
+    first = cache.put("first", write(b"a" * 40))
+    second = cache.put("second", write(b"b" * 40))
+    set_age(first, 20)
+    set_age(second, 10)
+    cache.get("first")
+    third = cache.put("third", write(b"c" * 40))
+    assert first.exists()
+    assert not second.exists()
+    assert third.exists()
+
+
+def test_keeps_document_larger_than_max_size(cache):
+    path = cache.put("document_id", write(b"a" * 200))
+    assert path.exists()
@@ -0,0 +1,151 @@
+import io
+import math
+import sys
+from unittest import mock
+
+import pytest
+
+from amapi import columnar, exceptions, parser
+from amapi.request import GET_FBA_ESTIMATE_FEES_REPORT
+
+DOCUMENT = (
+    "sku\tasin\tyour-price\testimated-fee-total\n"
+    "ABC-3\tB000000003\t12.00\t5.00\n"
+    "ABC-1\tB000000001\t10.50\t3.20\n"
+    "ABC-2\tB000000002\t\t4.10\n"
+    "ÄBC-4\tB000000001\t1.00\t0.50\n"
+).encode("utf8")
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "report.amc"
+
+
+@pytest.fixture
+def report(path):
+    columnar.convert_report(
+        io.BytesIO(DOCUMENT), path, report_type=GET_FBA_ESTIMATE_FEES_REPORT
+    )
+    with columnar.ColumnarReport(path) as report:
+        yield report
+
+
+def test_header_and_length(report):
+    assert report.header == ["sku", "asin", "your-price", "estimated-fee-total"]
+    assert len(report) == 4
+
+
+def test_lookup(report):
+    assert report.lookup("ABC-1") == {
+        "sku": "ABC-1",
+        "asin": "B000000001",
+        "your-price": 10.5,
+        "estimated-fee-total": 3.2,
+    }
+    assert report.lookup("ÄBC-4")["your-price"] == 1.0
+
+
+def test_lookup_missing(report):
+    assert report.lookup("ABC-0") is None
+    assert report.lookup("ZZZ") is None
+
+
+def test_value(report):
+    assert report.value("sku", 0) == "ABC-3"
+    assert math.isnan(report.value("your-price", 2))
+
+
+def test_value_out_of_range(report):
+    with pytest.raises(IndexError):
+        report.value("sku", 4)
+
+
+def test_column(report):
+    assert report.column("estimated-fee-total").tolist() == [5.0, 3.2, 4.1, 0.5]
+
+
+def test_column_of_strings(report):
+    with pytest.raises(TypeError):
+        report.column("sku")
+
+
+def test_rows(report):
+    assert [row["sku"] for row in report.rows()] == ["ABC-3", "ABC-1", "ABC-2", "ÄBC-4"]
+
+
+def test_index_of_other_column(path):
+    table = parser.parse_report(io.BytesIO(DOCUMENT))
+    columnar.write_columnar(table, path, keys=["sku", "asin"])
+    with columnar.ColumnarReport(path) as report:
+        assert report.find("B000000001", key="asin") == [1, 3]
+        assert report.lookup("ABC-2")["asin"] == "B000000002"
+
+
+def test_find_unindexed_column(report):
+    with pytest.raises(KeyError):
+        report.find("B000000001", key="asin")
+
+
+def test_write_unknown_key(path):
+    table = parser.parse_report(io.BytesIO(DOCUMENT))
+    with pytest.raises(KeyError):
+        columnar.write_columnar(table, path, keys=["missing"])
+    assert list(path.parent.iterdir()) == []
+
+
+def test_without_index(path):
+    columnar.write_columnar(parser.parse_report(io.BytesIO(DOCUMENT)), path)
+    with columnar.ColumnarReport(path) as report:
+        with pytest.raises(exceptions.ColumnarFormatError):
+            report.lookup("ABC-1")
+
+
+def test_to_table(report):
+    table = report.to_table()
+    expected = parser.parse_report(
+        io.BytesIO(DOCUMENT), report_type=GET_FBA_ESTIMATE_FEES_REPORT
+    )
+    assert table.header == expected.header
+    assert table["sku"] == expected["sku"]
+    assert table["estimated-fee-total"] == expected["estimated-fee-total"]
+
+
+def test_empty_report(path):
+    columnar.convert_report(
+        io.BytesIO(b"sku\tasin\n"), path, report_type=GET_FBA_ESTIMATE_FEES_REPORT
+    )
+    with columnar.ColumnarReport(path) as report:
+        assert len(report) == 0
+        assert report.lookup("ABC-1") is None
+
+
+def test_all_empty_string_column(path):
+    document = "sku\tbrand\tyour-price\nA\t\t1.50\nB\t\t2.00\n".encode("utf8")
+    columnar.convert_report(
+        io.BytesIO(document), path, report_type=GET_FBA_ESTIMATE_FEES_REPORT
+    )
+    with columnar.ColumnarReport(path) as report:
+        assert report.lookup("A") == {"sku": "A", "brand": "", "your-price": 1.5}
+        assert report.lookup("B") == {"sku": "B", "brand": "", "your-price": 2.0}
+
+
+def test_close_releases_views(path, report):
+    report.column("your-price")
+    report.lookup("ABC-1")
+    report.close()
+    assert report.mmap.closed
+
+
+@pytest.mark.parametrize("contents", (b"", b"sku\tasin\n", columnar.MAGIC + b"\0" * 32))
+def test_invalid_file(path, contents):
+    path.write_bytes(contents)
+    with pytest.raises(exceptions.ColumnarFormatError):
+        columnar.ColumnarReport(path)
+
+
+def test_other_byteorder(path, report):
+    other = "big" if sys.byteorder == "little" else "little"
+    with mock.patch("amapi.columnar.sys.byteorder", other):
+        with pytest.raises(exceptions.ColumnarFormatError):
+            columnar.ColumnarReport(path)
@@ -0,0 +1,135 @@
+import io
+
+import pytest
+
+from amapi import columnar, diff
+from amapi.request import GET_FBA_ESTIMATE_FEES_REPORT
+
+OLD = (
+    "sku\tasin\tyour-price\testimated-fee-total\n"
+    "ABC-1\tB000000001\t10.50\t3.20\n"
+    "ABC-2\tB000000002\t\t4.10\n"
+    "ABC-3\tB000000003\t12.00\t5.00\n"
+    "ABC-4\tB000000004\t1.00\t0.50\n"
+).encode("utf8")
+
+NEW = (
+    "sku\tasin\tyour-price\testimated-fee-total\n"
+    "ABC-2\tB000000002\t\t4.10\n"
+    "ABC-1\tB000000001\t10.5\t3.40\n"
+    "ABC-4\tB000000004\t1.00\t0.50\n"
+    "ABC-5\tB000000005\t2.00\t0.75\n"
+).encode("utf8")
+
+
+def by_key(changes):
+    return {change.key: change for change in changes}
+
+
+def check_changes(changes):
+    assert set(changes) == {"ABC-1", "ABC-3", "ABC-5"}
+    assert changes["ABC-1"].kind == diff.CHANGED
+    assert changes["ABC-1"].columns == ("estimated-fee-total",)
+    assert changes["ABC-1"].old["estimated-fee-total"] == 3.2
+    assert changes["ABC-1"].new["estimated-fee-total"] == 3.4
+    assert changes["ABC-3"].kind == diff.REMOVED
+    assert changes["ABC-3"].old["your-price"] == 12.0
+    assert changes["ABC-3"].new is None
+    assert changes["ABC-5"].kind == diff.ADDED
+    assert changes["ABC-5"].old is None
+    assert changes["ABC-5"].new["asin"] == "B000000005"
+
+
+@pytest.mark.parametrize("partitions", (1, 2, diff.PARTITIONS))
+def test_diff_reports(partitions):
+    changes = diff.diff_reports(
+        io.BytesIO(OLD),
+        io.BytesIO(NEW),
+        report_type=GET_FBA_ESTIMATE_FEES_REPORT,
+        partitions=partitions,
+    )
+    check_changes(by_key(changes))
+
+
+def test_diff_reports_from_paths(tmp_path):
+    (tmp_path / "old.txt").write_bytes(OLD)
+    (tmp_path / "new.txt").write_bytes(NEW)
+    changes = diff.diff_reports(
+        tmp_path / "old.txt",
+        str(tmp_path / "new.txt"),
+        report_type=GET_FBA_ESTIMATE_FEES_REPORT,
+    )
+    check_changes(by_key(changes))
+
+
+def test_diff_reports_without_schema_compares_text():
+    changes = by_key(diff.diff_reports(io.BytesIO(OLD), io.BytesIO(NEW), key="sku"))
+    assert changes["ABC-1"].columns == ("your-price", "estimated-fee-total")
+
+
+def test_diff_reports_identical():
+    changes = diff.diff_reports(
+        io.BytesIO(OLD), io.BytesIO(OLD), report_type=GET_FBA_ESTIMATE_FEES_REPORT
+    )
+    assert list(changes) == []
+
+
+def test_diff_reports_uses_first_of_repeated_keys():
+    old = b"sku\tprice\nA\t1\n"
+    new = b"sku\tprice\nA\t1\nA\t2\n"
+    assert list(diff.diff_reports(io.BytesIO(old), io.BytesIO(new), key="sku")) == []
+
+
+def test_diff_reports_skips_blank_lines():
+    old = b"sku\tprice\nA\t1\n"
+    new = b"sku\tprice\n\nA\t1\n\n"
+    assert list(diff.diff_reports(io.BytesIO(old), io.BytesIO(new), key="sku")) == []
+
+
+def test_diff_reports_with_new_column():
+    old = b"sku\tprice\nA\t1\n"
+    new = b"sku\tprice\tqty\nA\t1\t5\n"
+    changes = list(diff.diff_reports(io.BytesIO(old), io.BytesIO(new), key="sku"))
+    assert [change.columns for change in changes] == [("qty",)]
+
+
+def test_diff_reports_without_key():
+    with pytest.raises(ValueError):
+        list(diff.diff_reports(io.BytesIO(OLD), io.BytesIO(NEW)))
+
+
+def test_diff_reports_with_missing_key_column():
+    with pytest.raises(KeyError):
+        list(diff.diff_reports(io.BytesIO(OLD), io.BytesIO(NEW), key="missing"))
+
+
+def test_diff_columnar(tmp_path):
+    for name, document in (("old", OLD), ("new", NEW)):
+        columnar.convert_report(
+            io.BytesIO(document),
+            tmp_path / name,
+            report_type=GET_FBA_ESTIMATE_FEES_REPORT,
+        )
+    with columnar.ColumnarReport(tmp_path / "old") as old, columnar.ColumnarReport(
+        tmp_path / "new"
+    ) as new:
+        changes = list(diff.diff_columnar(old, new))
+    assert [change.key for change in changes] == ["ABC-1", "ABC-3", "ABC-5"]
+    check_changes(by_key(changes))
+
+
+def test_diff_columnar_unindexed_key(tmp_path):
+    columnar.convert_report(
+        io.BytesIO(OLD), tmp_path / "old", report_type=GET_FBA_ESTIMATE_FEES_REPORT
+    )
+    with columnar.ColumnarReport(tmp_path / "old") as old:
+        with pytest.raises(KeyError):
+            list(diff.diff_columnar(old, old, key="asin"))
+
+
+@pytest.mark.parametrize(
+    "a,b,expected",
+    ((1.0, 1.0, True), (float("nan"), float("nan"), True), ("1", "2", False)),
+)
+def test_values_equal(a, b, expected):
+    assert diff.values_equal(a, b) is expected
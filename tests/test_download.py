@@ -0,0 +1,238 @@
+import json
+from unittest import mock
+
+import pytest
+import requests
+
+from amapi import download, exceptions, metrics, request, transport
+from benchmarks.fake_spapi import CONTENT_PATH, DOCUMENT, FakeSpApiServer
+
+CHUNK_SIZE = 64 * 1024
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeSpApiServer() as server:
+        yield server
+
+
+@pytest.fixture
+def url(server):
+    return f"{server.url}{CONTENT_PATH}DOC-1"
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "report.txt.part"
+
+
+@pytest.fixture
+def downloader():
+    return download.RangedDownloader(
+        chunk_size=CHUNK_SIZE,
+        workers=4,
+        retry_policy=download.DownloadRetryPolicy(initial_delay=0, jitter=0),
+    )
+
+
+@pytest.fixture
+def mock_session():
+    session = mock.Mock()
+    session.marketplace.name = "UK"
+    return session
+
+
+def chunk_count():
+    return -(-len(DOCUMENT) // CHUNK_SIZE)
+
+
+def test_split_chunks():
+    assert download.split_chunks(10, 4) == [
+        download.Chunk(0, 0, 3),
+        download.Chunk(1, 4, 7),
+        download.Chunk(2, 8, 9),
+    ]
+    assert download.split_chunks(0, 4) == []
+
+
+def test_chunk_header():
+    chunk = download.Chunk(1, 4, 7)
+    assert chunk.length == 4
+    assert chunk.header == "bytes=4-7"
+
+
+def test_part_and_state_paths(tmp_path):
+    assert download.part_path(tmp_path / "a.txt") == tmp_path / "a.txt.part"
+    assert download.state_path(tmp_path / "a.txt.part") == tmp_path / "a.txt.part.json"
+
+
+def test_get_size(downloader, url):
+    assert downloader.get_size(url) == len(DOCUMENT)
+
+
+def test_download(downloader, url, path):
+    assert downloader.download(url, path, size=len(DOCUMENT)) == len(DOCUMENT)
+    assert path.read_bytes() == DOCUMENT
+    assert download.downloaded_bytes(path) == len(DOCUMENT)
+    downloader.finish(path)
+    assert not download.state_path(path).exists()
+
+
+def test_download_records_progress_and_resumes(downloader, url, path):
+    failing = {2, 5}
+    fetch_chunk = downloader.fetch_chunk
+
+    def fail_some(url, chunk, fd):
+        if chunk.number in failing:
+            raise ValueError("connection lost")
+        fetch_chunk(url, chunk, fd)
+
+    with mock.patch.object(downloader, "fetch_chunk", side_effect=fail_some):
+        with pytest.raises(ValueError):
+            downloader.download(url, path)
+    state = json.loads(download.state_path(path).read_text())
+    assert failing.isdisjoint(state["done"])
+    with mock.patch.object(
+        downloader, "fetch_chunk", side_effect=fetch_chunk
+    ) as mock_fetch:
+        downloader.download(url, path)
+    assert sorted(call.args[1].number for call in mock_fetch.call_args_list) == [
+        number for number in range(chunk_count()) if number not in state["done"]
+    ]
+    assert path.read_bytes() == DOCUMENT
+
+
+def test_download_restarts_when_size_changes(downloader, url, path):
+    downloader.save_done(path, len(DOCUMENT) + 1, {0, 1})
+    path.write_bytes(b"x" * 10)
+    with mock.patch.object(
+        downloader, "fetch_chunk", side_effect=downloader.fetch_chunk
+    ) as mock_fetch:
+        downloader.download(url, path)
+    assert mock_fetch.call_count == chunk_count()
+    assert path.read_bytes() == DOCUMENT
+
+
+def test_download_retries_chunks(downloader, url, path):
+    fetch_chunk = downloader.fetch_chunk
+    errors = [exceptions.DownloadSizeError(url, CHUNK_SIZE, 10)]
+
+    def fail_once(url, chunk, fd):
+        if chunk.number == 1 and errors:
+            raise errors.pop()
+        fetch_chunk(url, chunk, fd)
+
+    with mock.patch.object(downloader, "fetch_chunk", side_effect=fail_once):
+        downloader.download(url, path)
+    assert path.read_bytes() == DOCUMENT
+
+
+def test_download_unexpected_size(downloader, url, path):
+    with pytest.raises(exceptions.DownloadSizeError):
+        downloader.download(url, path, size=len(DOCUMENT) - 1)
+
+
+def test_download_without_range_support(downloader, url, path):
+    with mock.patch.object(downloader, "get_size", return_value=None):
+        assert downloader.download(url, path) == len(DOCUMENT)
+    assert path.read_bytes() == DOCUMENT
+    assert not download.state_path(path).exists()
+
+
+def test_download_empty_document(downloader, path):
+    with FakeSpApiServer(document=b"") as server:
+        assert downloader.download(f"{server.url}{CONTENT_PATH}DOC-1", path) == 0
+    assert path.read_bytes() == b""
+
+
+def test_downloaded_bytes_without_state(path):
+    assert download.downloaded_bytes(path) == 0
+    path.write_bytes(b"12345")
+    assert download.downloaded_bytes(path) == 5
+
+
+def test_fetch_chunk_rejects_full_response(downloader, url, path):
+    response = mock.MagicMock(status_code=200)
+    response.__enter__.return_value = response
+    with mock.patch("amapi.download.requests.get", return_value=response):
+        with pytest.raises(exceptions.DownloadSizeError):
+            downloader.fetch_chunk(url, download.Chunk(0, 0, 9), 0)
+
+
+@pytest.mark.parametrize(
+    "error,expected",
+    (
+        (requests.ConnectionError(), True),
+        (requests.Timeout(), True),
+        (exceptions.DownloadSizeError("url", 10, 5), True),
+        (requests.HTTPError(response=mock.Mock(status_code=503)), True),
+        (requests.HTTPError(response=mock.Mock(status_code=403)), False),
+        (ValueError(), False),
+    ),
+)
+def test_download_retry_policy(error, expected):
+    assert download.DownloadRetryPolicy().is_retryable(error) is expected
+
+
+@pytest.mark.parametrize("compress", (False, True))
+def test_download_document_ranged(mock_session, tmp_path, compress):
+    dest = tmp_path / "report.txt"
+    with FakeSpApiServer(compress=compress) as server:
+        document = server.get_document("DOC-1")
+        with mock.patch(
+            "amapi.download.request_document", return_value=document
+        ) as mock_request_document:
+            written = download.download_document_ranged(
+                mock_session, "DOC-1", dest, chunk_size=CHUNK_SIZE
+            )
+    mock_request_document.assert_called_once_with(mock_session, document_id="DOC-1")
+    assert written == len(DOCUMENT)
+    assert dest.read_bytes() == DOCUMENT
+    assert sorted(tmp_path.iterdir()) == [dest]
+
+
+def test_download_document_ranged_through_transport(mock_session, tmp_path):
+    archive = tmp_path / "recording.jsonl"
+    downloader = mock.Mock()
+    with FakeSpApiServer(compress=True) as server:
+        document = server.get_document("DOC-1")
+        with transport.RecordingTransport(archive) as recorder:
+            with mock.patch.object(request.BaseRequest, "TRANSPORT", recorder):
+                with mock.patch(
+                    "amapi.download.request_document", return_value=document
+                ):
+                    written = download.download_document_ranged(
+                        mock_session, "DOC-1", tmp_path / "recorded.txt", downloader
+                    )
+    downloader.download.assert_not_called()
+    assert written == len(DOCUMENT)
+    assert (tmp_path / "recorded.txt").read_bytes() == DOCUMENT
+    replay = transport.ReplayTransport(archive)
+    with mock.patch.object(request.BaseRequest, "TRANSPORT", replay):
+        with mock.patch("amapi.download.request_document", return_value=document):
+            with mock.patch("amapi.request.requests.get") as mock_get:
+                download.download_document_ranged(
+                    mock_session, "DOC-1", tmp_path / "replayed.txt", downloader
+                )
+    mock_get.assert_not_called()
+    assert (tmp_path / "replayed.txt").read_bytes() == DOCUMENT
+
+
+def test_download_document_ranged_times_download(mock_session, tmp_path):
+    events = []
+    instrumentation = metrics.Instrumentation()
+    instrumentation.add_listener(events.append)
+    with FakeSpApiServer() as server:
+        document = server.get_document("DOC-1")
+        with mock.patch("amapi.download.request_document", return_value=document):
+            with mock.patch.object(
+                download.GetDocumentRequest, "INSTRUMENTATION", instrumentation
+            ):
+                download.download_document_ranged(
+                    mock_session, "DOC-1", tmp_path / "report.txt"
+                )
+    assert len(events) == 1
+    assert events[0].stage == metrics.DOWNLOAD
+    assert events[0].operation == "get_report_document"
+    assert events[0].marketplace == "UK"
+    assert events[0].bytes == len(DOCUMENT)
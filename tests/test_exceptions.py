@@ -1,3 +1,6 @@
+import pickle
+from pathlib import Path
+
 import pytest
 
 from amapi import exceptions
@@ -9,3 +12,97 @@ def test_login_credentials_not_set_error():
         match="REFRESH_TOKEN_KEY, APP_ID_KEY and CLIENT_SECRET_KEY must be set.",
     ):
         raise exceptions.LoginCredentialsNotSetError
+
+
+def test_report_processing_error():
+    with pytest.raises(
+        exceptions.ReportProcessingError,
+        match="Report 123 finished with status FATAL.",
+    ) as excinfo:
+        raise exceptions.ReportProcessingError("123", "FATAL")
+    assert excinfo.value.report_id == "123"
+    assert excinfo.value.status == "FATAL"
+    unpickled = pickle.loads(pickle.dumps(excinfo.value))
+    assert unpickled.status == "FATAL"
+    assert str(unpickled) == str(excinfo.value)
+
+
+def test_report_timeout_error():
+    with pytest.raises(
+        exceptions.ReportTimeoutError,
+        match="Report 123 did not finish within 60 seconds.",
+    ) as excinfo:
+        raise exceptions.ReportTimeoutError("123", 60)
+    assert excinfo.value.report_id == "123"
+    assert isinstance(excinfo.value, TimeoutError)
+    unpickled = pickle.loads(pickle.dumps(excinfo.value))
+    assert unpickled.timeout == 60
+    assert str(unpickled) == str(excinfo.value)
+
+
+def test_seller_not_registered_error():
+    with pytest.raises(
+        exceptions.SellerNotRegisteredError,
+        match="No credentials for seller A1 in UK.",
+    ) as excinfo:
+        raise exceptions.SellerNotRegisteredError("A1", "UK")
+    assert excinfo.value.seller == "A1"
+    assert excinfo.value.marketplace == "UK"
+
+
+def test_marketplace_region_error():
+    with pytest.raises(
+        exceptions.MarketplaceRegionError,
+        match="Marketplace US is not in region eu-west-1.",
+    ) as excinfo:
+        raise exceptions.MarketplaceRegionError("US", "eu-west-1")
+    assert excinfo.value.marketplace == "US"
+    assert excinfo.value.region == "eu-west-1"
+
+
+def test_recording_not_found_error_pickles():
+    error = exceptions.RecordingNotFoundError("get_report", "UK")
+    unpickled = pickle.loads(pickle.dumps(error))
+    assert unpickled.key == "UK"
+    assert str(unpickled) == str(error)
+
+
+def test_columnar_format_error_pickles():
+    error = exceptions.ColumnarFormatError(Path("report.col"), "bad magic")
+    unpickled = pickle.loads(pickle.dumps(error))
+    assert unpickled.reason == "bad magic"
+    assert str(unpickled) == str(error)
+
+
+def test_job_lease_lost_error_pickles():
+    error = exceptions.JobLeaseLostError(1, "worker")
+    unpickled = pickle.loads(pickle.dumps(error))
+    assert unpickled.job_id == 1
+    assert str(unpickled) == str(error)
+
+
+def test_download_size_error_pickles():
+    error = exceptions.DownloadSizeError("https://example.com/1?sig=x", 10, None)
+    unpickled = pickle.loads(pickle.dumps(error))
+    assert unpickled.actual is None
+    assert str(unpickled) == str(error)
+
+
+def test_seller_not_registered_error_pickles():
+    error = exceptions.SellerNotRegisteredError("A1", "UK")
+    unpickled = pickle.loads(pickle.dumps(error))
+    assert unpickled.seller == "A1"
+    assert str(unpickled) == str(error)
+
+
+def test_marketplace_region_error_pickles():
+    error = exceptions.MarketplaceRegionError("US", "eu-west-1")
+    unpickled = pickle.loads(pickle.dumps(error))
+    assert unpickled.region == "eu-west-1"
+    assert str(unpickled) == str(error)
+
+
+def test_report_poll_stopped_error():
+    error = exceptions.ReportPollStoppedError("123")
+    assert str(error) == "Polling report 123 was stopped."
+    assert pickle.loads(pickle.dumps(error)).report_id == "123"
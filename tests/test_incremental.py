@@ -0,0 +1,266 @@
+import datetime as dt
+import io
+import sqlite3
+from contextlib import closing
+from unittest import mock
+
+import pytest
+from sp_api.base import Marketplaces
+
+from amapi import incremental
+
+END = dt.datetime(2024, 5, 10, tzinfo=dt.timezone.utc)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return incremental.WatermarkStore(tmp_path / "watermarks.db")
+
+
+@pytest.fixture
+def mock_session():
+    session = mock.Mock()
+    session.marketplace = Marketplaces.UK
+    return session
+
+
+@pytest.fixture
+def mock_generate_report_request():
+    with mock.patch("amapi.incremental.GenerateReportRequest") as m:
+        m.return_value.call.return_value = "report_id"
+        yield m
+
+
+@pytest.fixture
+def mock_wait_for_report():
+    with mock.patch("amapi.incremental.wait_for_report") as m:
+        m.return_value = "document_id"
+        yield m
+
+
+@pytest.fixture
+def mock_download_document():
+    with mock.patch("amapi.incremental.download_document") as m:
+        m.side_effect = lambda session, document_id, dest: dest.write(
+            b"sku\tqty\nABC\t1\n"
+        )
+        yield m
+
+
+def test_store_get_returns_None_when_not_set(store):
+    assert store.get("marketplace_id", "report_type") is None
+
+
+def test_store_set_and_get(store):
+    store.set("marketplace_id", "report_type", END)
+    assert store.get("marketplace_id", "report_type") == END
+
+
+def test_store_set_replaces_watermark(store):
+    store.set("marketplace_id", "report_type", END)
+    store.set("marketplace_id", "report_type", END + dt.timedelta(days=1))
+    assert store.get("marketplace_id", "report_type") == END + dt.timedelta(days=1)
+
+
+def test_store_keys_by_marketplace_and_report_type(store):
+    store.set("marketplace_id", "report_type", END)
+    assert store.get("other", "report_type") is None
+    assert store.get("marketplace_id", "other") is None
+
+
+def test_store_set_and_get_size(store):
+    assert store.get_size("A", "report_type") is None
+    store.set("A", "report_type", END, 10)
+    assert store.get_size("A", "report_type") == 10
+    store.set("A", "report_type", END)
+    assert store.get_size("A", "report_type") is None
+
+
+def test_store_adds_size_to_existing_database(tmp_path):
+    path = tmp_path / "watermarks.db"
+    with closing(sqlite3.connect(path)) as connection, connection:
+        connection.execute(
+            "CREATE TABLE watermarks (marketplace_id TEXT NOT NULL, "
+            "report_type TEXT NOT NULL, fetched_until TEXT NOT NULL, "
+            "PRIMARY KEY (marketplace_id, report_type))"
+        )
+        connection.execute(
+            "INSERT INTO watermarks VALUES (?, ?, ?)",
+            ("A", "report_type", END.isoformat()),
+        )
+    store = incremental.WatermarkStore(path)
+    assert store.get("A", "report_type") == END
+    assert store.get_size("A", "report_type") is None
+
+
+def test_store_persists(store):
+    store.set("marketplace_id", "report_type", END)
+    reopened = incremental.WatermarkStore(store.path)
+    assert reopened.get("marketplace_id", "report_type") == END
+
+
+def test_next_window_without_watermark(mock_session, store):
+    window = incremental.next_window(mock_session, store, "report_type", end=END)
+    assert window == incremental.DataWindow(END - incremental.INITIAL_WINDOW, END)
+
+
+def test_next_window_starts_at_watermark(mock_session, store):
+    start = END - dt.timedelta(hours=1)
+    store.set(Marketplaces.UK.marketplace_id, "report_type", start)
+    window = incremental.next_window(mock_session, store, "report_type", end=END)
+    assert window == incremental.DataWindow(start, END)
+
+
+def test_next_window_returns_None_when_up_to_date(mock_session, store):
+    store.set(Marketplaces.UK.marketplace_id, "report_type", END)
+    assert incremental.next_window(mock_session, store, "report_type", end=END) is None
+
+
+def test_next_window_defaults_to_lag_before_now(mock_session, store):
+    window = incremental.next_window(mock_session, store, "report_type")
+    expected = dt.datetime.now(dt.timezone.utc) - incremental.LAG
+    assert expected - window.end < dt.timedelta(minutes=1)
+    window = incremental.next_window(
+        mock_session, store, "report_type", lag=dt.timedelta(0)
+    )
+    assert dt.datetime.now(dt.timezone.utc) - window.end < dt.timedelta(minutes=1)
+
+
+def test_append_document_writes_new_file(tmp_path):
+    dest = tmp_path / "report.tsv"
+    written = incremental.append_document(io.BytesIO(b"sku\tqty\nABC\t1\n"), dest)
+    assert dest.read_bytes() == b"sku\tqty\nABC\t1\n"
+    assert written == 14
+
+
+def test_append_document_skips_header(tmp_path):
+    dest = tmp_path / "report.tsv"
+    dest.write_bytes(b"sku\tqty\nABC\t1\n")
+    incremental.append_document(io.BytesIO(b"sku\tqty\nDEF\t2\n"), dest)
+    assert dest.read_bytes() == b"sku\tqty\nABC\t1\nDEF\t2\n"
+
+
+def test_append_document_adds_missing_newline(tmp_path):
+    dest = tmp_path / "report.tsv"
+    dest.write_bytes(b"sku\tqty\nABC\t1")
+    incremental.append_document(io.BytesIO(b"sku\tqty\nDEF\t2\n"), dest)
+    assert dest.read_bytes() == b"sku\tqty\nABC\t1\nDEF\t2\n"
+
+
+def test_fetch_incremental(
+    mock_session,
+    store,
+    tmp_path,
+    mock_generate_report_request,
+    mock_wait_for_report,
+    mock_download_document,
+):
+    dest = tmp_path / "report.tsv"
+    window = incremental.fetch_incremental(
+        mock_session, store, "report_type", dest, end=END
+    )
+    assert window == incremental.DataWindow(END - incremental.INITIAL_WINDOW, END)
+    mock_generate_report_request.assert_called_once_with(mock_session)
+    mock_generate_report_request.return_value.call.assert_called_once_with(
+        report_type="report_type", date=window.start, end_date=END
+    )
+    mock_wait_for_report.assert_called_once_with(mock_session, report_id="report_id")
+    assert dest.read_bytes() == b"sku\tqty\nABC\t1\n"
+    assert store.get(Marketplaces.UK.marketplace_id, "report_type") == END
+
+
+def test_fetch_incremental_appends_to_previous_fetch(
+    mock_session,
+    store,
+    tmp_path,
+    mock_generate_report_request,
+    mock_wait_for_report,
+    mock_download_document,
+):
+    dest = tmp_path / "report.tsv"
+    incremental.fetch_incremental(mock_session, store, "report_type", dest, end=END)
+    later = END + dt.timedelta(hours=1)
+    window = incremental.fetch_incremental(
+        mock_session, store, "report_type", dest, end=later
+    )
+    assert window == incremental.DataWindow(END, later)
+    assert dest.read_bytes() == b"sku\tqty\nABC\t1\nABC\t1\n"
+    assert store.get(Marketplaces.UK.marketplace_id, "report_type") == later
+
+
+def test_fetch_incremental_does_nothing_when_up_to_date(
+    mock_session, store, tmp_path, mock_generate_report_request
+):
+    store.set(Marketplaces.UK.marketplace_id, "report_type", END)
+    window = incremental.fetch_incremental(
+        mock_session, store, "report_type", tmp_path / "report.tsv", end=END
+    )
+    assert window is None
+    mock_generate_report_request.assert_not_called()
+
+
+def test_fetch_incremental_keeps_watermark_on_failure(
+    mock_session,
+    store,
+    tmp_path,
+    mock_generate_report_request,
+    mock_wait_for_report,
+    mock_download_document,
+):
+    mock_download_document.side_effect = Exception()
+    with pytest.raises(Exception):
+        incremental.fetch_incremental(
+            mock_session, store, "report_type", tmp_path / "report.tsv", end=END
+        )
+    assert store.get(Marketplaces.UK.marketplace_id, "report_type") is None
+
+
+def test_fetch_incremental_retry_does_not_append_rows_twice(
+    mock_session,
+    store,
+    tmp_path,
+    mock_generate_report_request,
+    mock_wait_for_report,
+    mock_download_document,
+):
+    dest = tmp_path / "report.tsv"
+    incremental.fetch_incremental(mock_session, store, "report_type", dest, end=END)
+    later = END + dt.timedelta(hours=1)
+    with mock.patch.object(store, "set", side_effect=Exception()):
+        with pytest.raises(Exception):
+            incremental.fetch_incremental(
+                mock_session, store, "report_type", dest, end=later
+            )
+    assert dest.read_bytes() == b"sku\tqty\nABC\t1\nABC\t1\n"
+    incremental.fetch_incremental(mock_session, store, "report_type", dest, end=later)
+    assert dest.read_bytes() == b"sku\tqty\nABC\t1\nABC\t1\n"
+    assert store.get(Marketplaces.UK.marketplace_id, "report_type") == later
+
+
+def test_fetch_incremental_retry_of_first_fetch(
+    mock_session,
+    store,
+    tmp_path,
+    mock_generate_report_request,
+    mock_wait_for_report,
+    mock_download_document,
+):
+    dest = tmp_path / "report.tsv"
+    set_watermark = store.set
+
+    def set_start_only(marketplace_id, report_type, fetched_until, dest_size=None):
+        if fetched_until == END:
+            raise Exception()
+        set_watermark(marketplace_id, report_type, fetched_until, dest_size)
+
+    with mock.patch.object(store, "set", side_effect=set_start_only):
+        with pytest.raises(Exception):
+            incremental.fetch_incremental(
+                mock_session, store, "report_type", dest, end=END
+            )
+    assert dest.read_bytes() == b"sku\tqty\nABC\t1\n"
+    assert store.get_size(Marketplaces.UK.marketplace_id, "report_type") == 0
+    incremental.fetch_incremental(mock_session, store, "report_type", dest, end=END)
+    assert dest.read_bytes() == b"sku\tqty\nABC\t1\n"
+    assert store.get(Marketplaces.UK.marketplace_id, "report_type") == END
+    assert store.get_size(Marketplaces.UK.marketplace_id, "report_type") == 14
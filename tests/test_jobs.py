@@ -0,0 +1,359 @@
+import datetime as dt
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from amapi import exceptions, jobs
+from amapi.request import GET_FBA_ESTIMATE_FEES_REPORT
+from amapi.session import AmapiSessionUK, AmapiSessionUS
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return jobs.JobQueue(tmp_path / "jobs.db")
+
+
+@pytest.fixture
+def destination(tmp_path):
+    return tmp_path / "report.txt"
+
+
+@pytest.fixture
+def job_id(queue, destination):
+    return queue.add(AmapiSessionUK, GET_FBA_ESTIMATE_FEES_REPORT, destination)
+
+
+@pytest.fixture
+def mock_load_session():
+    with mock.patch("amapi.jobs.load_session") as m:
+        yield m
+
+
+@pytest.fixture
+def mock_request_generate_report():
+    with mock.patch("amapi.jobs.request_generate_report") as m:
+        m.return_value = "report_id"
+        yield m
+
+
+@pytest.fixture
+def mock_get_report_request():
+    with mock.patch("amapi.request.GetReportRequest") as m:
+        m.return_value.call.return_value = {
+            "processingStatus": "DONE",
+            "reportDocumentId": "document_id",
+        }
+        yield m
+
+
+@pytest.fixture
+def mock_download_document():
+    def download(session, document_id, dest):
+        Path(dest).write_bytes(b"sku\tqty\nABC\t1\n")
+        return 15
+
+    with mock.patch("amapi.jobs.download.download_document_ranged") as m:
+        m.side_effect = download
+        yield m
+
+
+@pytest.fixture
+def worker(queue):
+    return jobs.Worker(queue, name="worker", retry_delay=10, initial_delay=0)
+
+
+def claimed(queue, job_id, **fields):
+    job = queue.claim("worker", 60)
+    assert job.id == job_id
+    return queue.update(job, **fields) if fields else job
+
+
+def test_session_path_round_trip():
+    path = jobs.session_path(AmapiSessionUK)
+    assert path == "amapi.session.AmapiSessionUK"
+    assert jobs.load_session(path) is AmapiSessionUK
+
+
+def test_add(queue, job_id, destination):
+    job = queue.get(job_id)
+    assert job.session == "amapi.session.AmapiSessionUK"
+    assert job.report_type == GET_FBA_ESTIMATE_FEES_REPORT
+    assert job.destination == str(destination)
+    assert job.stage == jobs.GENERATE
+    assert job.max_age is None
+    assert job.part_path.name == "report.txt.part"
+
+
+def test_add_with_max_age(queue, destination):
+    job_id = queue.add(AmapiSessionUK, "report_type", destination, dt.timedelta(1))
+    assert queue.get(job_id).max_age == 86400
+
+
+def test_get_missing_job(queue):
+    with pytest.raises(KeyError):
+        queue.get(1)
+
+
+def test_jobs(queue, destination):
+    first = queue.add(AmapiSessionUK, "report_type", destination)
+    second = queue.add(AmapiSessionUS, "report_type", destination)
+    claimed(queue, first, stage=jobs.DONE)
+    assert [job.id for job in queue.jobs()] == [first, second]
+    assert [job.id for job in queue.jobs(jobs.GENERATE)] == [second]
+
+
+def test_claim_leases_oldest_job(queue, destination):
+    first = queue.add(AmapiSessionUK, "report_type", destination)
+    second = queue.add(AmapiSessionUS, "report_type", destination)
+    job = queue.claim("worker", 60)
+    assert job.id == first
+    assert job.worker == "worker"
+    assert job.lease_until > time.time()
+    assert queue.claim("other", 60).id == second
+    assert queue.claim("third", 60) is None
+
+
+def test_claim_expired_lease(queue, job_id):
+    queue.claim("worker", -1)
+    assert queue.claim("other", 60).worker == "other"
+
+
+@pytest.mark.parametrize("stage", (jobs.DONE, jobs.FAILED))
+def test_claim_skips_finished_jobs(queue, job_id, stage):
+    queue.release(claimed(queue, job_id), stage=stage)
+    assert queue.claim("worker", 60) is None
+
+
+def test_claim_skips_jobs_waiting_to_retry(queue, job_id):
+    queue.release(claimed(queue, job_id), available_at=time.time() + 60)
+    assert queue.claim("worker", 60) is None
+
+
+def test_update_after_lease_lost(queue, job_id):
+    job = queue.claim("worker", -1)
+    queue.claim("other", 60)
+    with pytest.raises(exceptions.JobLeaseLostError):
+        queue.update(job, stage=jobs.WAIT)
+
+
+def test_run_once(
+    queue,
+    job_id,
+    worker,
+    destination,
+    mock_load_session,
+    mock_request_generate_report,
+    mock_get_report_request,
+    mock_download_document,
+):
+    assert worker.run_once() is True
+    job = queue.get(job_id)
+    assert job.stage == jobs.DONE
+    assert job.report_id == "report_id"
+    assert job.document_id == "document_id"
+    assert job.download_offset == 15
+    assert job.worker is None
+    assert destination.read_bytes() == b"sku\tqty\nABC\t1\n"
+    assert not job.part_path.exists()
+    mock_load_session.assert_called_once_with("amapi.session.AmapiSessionUK")
+    session = mock_load_session.return_value.return_value.__enter__.return_value
+    mock_request_generate_report.assert_called_once_with(
+        session, report_type=GET_FBA_ESTIMATE_FEES_REPORT, max_age=None
+    )
+    mock_get_report_request.return_value.call.assert_called_once_with(
+        report_id="report_id"
+    )
+
+
+def test_run_once_without_jobs(worker):
+    assert worker.run_once() is False
+
+
+def test_run_once_resumes_waiting_job(
+    queue,
+    job_id,
+    worker,
+    mock_load_session,
+    mock_request_generate_report,
+    mock_get_report_request,
+    mock_download_document,
+):
+    queue.release(claimed(queue, job_id, stage=jobs.WAIT, report_id="existing"))
+    worker.run_once()
+    mock_request_generate_report.assert_not_called()
+    mock_get_report_request.return_value.call.assert_called_once_with(
+        report_id="existing"
+    )
+    assert queue.get(job_id).stage == jobs.DONE
+
+
+def test_run_once_resumes_download(
+    queue,
+    job_id,
+    worker,
+    mock_load_session,
+    mock_request_generate_report,
+    mock_get_report_request,
+    mock_download_document,
+):
+    job = claimed(queue, job_id, stage=jobs.DOWNLOAD, document_id="existing")
+    queue.release(job)
+    worker.run_once()
+    mock_request_generate_report.assert_not_called()
+    mock_get_report_request.assert_not_called()
+    assert mock_download_document.call_args.kwargs["document_id"] == "existing"
+    assert queue.get(job_id).stage == jobs.DONE
+
+
+def test_run_once_polls_until_done(
+    queue,
+    job_id,
+    worker,
+    mock_load_session,
+    mock_request_generate_report,
+    mock_get_report_request,
+    mock_download_document,
+):
+    mock_get_report_request.return_value.call.side_effect = [
+        {"processingStatus": "IN_PROGRESS"},
+        {"processingStatus": "DONE", "reportDocumentId": "document_id"},
+    ]
+    with mock.patch("amapi.request.time.sleep") as mock_sleep:
+        worker.run_once()
+    mock_sleep.assert_called_once()
+    assert queue.get(job_id).stage == jobs.DONE
+
+
+def test_wait_polls_with_worker_options(queue, job_id):
+    worker = jobs.Worker(queue, initial_delay=1, max_delay=2, timeout=3)
+    job = claimed(queue, job_id, stage=jobs.WAIT, report_id="report_id")
+    session = mock.Mock()
+    stop = threading.Event()
+    with mock.patch("amapi.jobs.ReportPoller") as mock_poller:
+        mock_poller.return_value.poll.return_value = {"reportDocumentId": "document_id"}
+        assert worker.wait(session, job, stop) == "document_id"
+    mock_poller.assert_called_once_with(
+        session, stop=stop, initial_delay=1, max_delay=2, timeout=3
+    )
+    mock_poller.return_value.poll.assert_called_once_with("report_id")
+
+
+def test_run_once_releases_job_when_stopped_while_waiting(
+    queue,
+    job_id,
+    worker,
+    mock_load_session,
+    mock_request_generate_report,
+    mock_get_report_request,
+):
+    mock_get_report_request.return_value.call.return_value = {
+        "processingStatus": "IN_PROGRESS"
+    }
+    stop = threading.Event()
+    stop.set()
+    assert worker.run_once(stop) is True
+    job = queue.get(job_id)
+    assert job.stage == jobs.WAIT
+    assert job.report_id == "report_id"
+    assert job.attempts == 0
+    assert job.worker is None
+
+
+def test_run_once_retries_failed_job(
+    queue, job_id, worker, mock_load_session, mock_request_generate_report
+):
+    mock_request_generate_report.side_effect = ValueError("error")
+    before = time.time()
+    worker.run_once()
+    job = queue.get(job_id)
+    assert job.stage == jobs.GENERATE
+    assert job.attempts == 1
+    assert job.error == "ValueError('error')"
+    assert job.worker is None
+    assert job.available_at >= before + 10
+    assert queue.claim("worker", 60) is None
+
+
+def test_run_once_fails_job_after_max_attempts(
+    queue, job_id, worker, mock_load_session, mock_request_generate_report
+):
+    mock_request_generate_report.side_effect = ValueError("error")
+    worker.retry_delay = 0
+    for _ in range(worker.max_attempts):
+        worker.run_once()
+    job = queue.get(job_id)
+    assert job.stage == jobs.FAILED
+    assert job.attempts == worker.max_attempts
+    assert worker.run_once() is False
+
+
+def test_run_once_regenerates_failed_report(
+    queue,
+    job_id,
+    worker,
+    mock_load_session,
+    mock_get_report_request,
+):
+    queue.release(claimed(queue, job_id, stage=jobs.WAIT, report_id="report_id"))
+    mock_get_report_request.return_value.call.return_value = {
+        "processingStatus": "FATAL"
+    }
+    worker.run_once()
+    job = queue.get(job_id)
+    assert job.stage == jobs.GENERATE
+    assert job.report_id is None
+    assert job.attempts == 1
+
+
+def test_heartbeat_renews_lease_and_records_progress(queue, job_id, worker):
+    worker.lease = 0.03
+    job = queue.claim(worker.name, worker.lease)
+    job.part_path.write_bytes(b"12345")
+    with worker.heartbeat(job):
+        time.sleep(0.1)
+    job = queue.get(job_id)
+    assert job.lease_until > time.time() - 0.03
+    assert job.download_offset == 5
+
+
+def test_run_workers(
+    queue,
+    tmp_path,
+    mock_load_session,
+    mock_request_generate_report,
+    mock_get_report_request,
+    mock_download_document,
+):
+    job_ids = [
+        queue.add(AmapiSessionUK, "report_type", tmp_path / f"{i}.txt")
+        for i in range(6)
+    ]
+    jobs.run_workers(queue, workers=3, initial_delay=0)
+    assert [queue.get(job_id).stage for job_id in job_ids] == [jobs.DONE] * 6
+
+
+def test_main_add(queue, destination, capsys):
+    jobs.main(
+        [
+            str(queue.path),
+            "add",
+            "amapi.session.AmapiSessionUS",
+            GET_FBA_ESTIMATE_FEES_REPORT,
+            str(destination),
+            "--max-age",
+            "3600",
+        ]
+    )
+    job = queue.get(int(capsys.readouterr().out))
+    assert job.session == "amapi.session.AmapiSessionUS"
+    assert job.max_age == 3600
+
+
+def test_main_work(queue):
+    with mock.patch("amapi.jobs.run_workers") as mock_run_workers:
+        with mock.patch("amapi.jobs.signal.signal"):
+            jobs.main([str(queue.path), "work", "--workers", "4"])
+    assert mock_run_workers.call_args.kwargs["workers"] == 4
@@ -0,0 +1,154 @@
+import math
+import socket
+from unittest import mock
+
+import pytest
+from sp_api.base import SellingApiServerException
+
+from amapi import metrics
+
+
+@pytest.fixture
+def instrumentation():
+    return metrics.Instrumentation()
+
+
+@pytest.fixture
+def events(instrumentation):
+    events = []
+    instrumentation.add_listener(events.append)
+    return events
+
+
+def event(stage="request", duration=0.1, status=metrics.OK, bytes=None):
+    return metrics.Event(stage, "get_report", "UK", duration, status, bytes)
+
+
+def test_time_emits_event(instrumentation, events):
+    with mock.patch("amapi.metrics.time.perf_counter", side_effect=[1.0, 1.5]):
+        with instrumentation.time("request", "get_report", "UK"):
+            pass
+    assert events == [metrics.Event("request", "get_report", "UK", 0.5, "ok", None)]
+
+
+def test_time_records_bytes(instrumentation, events):
+    with instrumentation.time("download", "get_report_document") as measurement:
+        measurement.bytes = 100
+    assert events[0].bytes == 100
+
+
+def test_time_records_error_status(instrumentation, events):
+    with pytest.raises(ValueError):
+        with instrumentation.time("request", "get_report"):
+            raise ValueError()
+    assert events[0].status == "ValueError"
+
+
+def test_time_records_selling_api_error_code(instrumentation, events):
+    with pytest.raises(SellingApiServerException):
+        with instrumentation.time("request", "get_report"):
+            raise SellingApiServerException([], {})
+    assert events[0].status == "500"
+
+
+def test_remove_listener(instrumentation, events):
+    instrumentation.remove_listener(events.append)
+    with instrumentation.time("request", "get_report"):
+        pass
+    assert events == []
+
+
+def test_histogram_observe():
+    histogram = metrics.Histogram(buckets=(1.0, 2.0))
+    for value in (0.5, 1.0, 1.5, 3.0):
+        histogram.observe(value)
+    assert histogram.count == 4
+    assert histogram.sum == 6.0
+    assert histogram.max == 3.0
+    assert histogram.cumulative_counts() == [(1.0, 2), (2.0, 3), (math.inf, 4)]
+
+
+def test_histogram_quantile():
+    histogram = metrics.Histogram(buckets=(1.0, 2.0))
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(value)
+    assert histogram.quantile(0.25) == 1.0
+    assert histogram.quantile(0.5) == 2.0
+    assert histogram.quantile(1.0) == 3.0
+
+
+def test_histogram_quantile_without_values():
+    assert math.isnan(metrics.Histogram().quantile(0.5))
+
+
+def test_collector():
+    collector = metrics.HistogramCollector()
+    collector(event(duration=0.1))
+    collector(event(duration=0.2))
+    collector(event(stage="download", bytes=10))
+    collector(event(stage="download", bytes=20))
+    histogram = collector.histograms[("request", "get_report", "UK", "ok")]
+    assert histogram.count == 2
+    assert histogram.sum == pytest.approx(0.3)
+    assert collector.bytes == {("download", "get_report", "UK", "ok"): 30}
+    collector.clear()
+    assert collector.histograms == {}
+    assert collector.bytes == {}
+
+
+def test_exporter_is_abstract():
+    with pytest.raises(TypeError):
+        metrics.MetricsExporter()  # type: ignore[abstract]
+
+
+def test_prometheus_exporter_render(tmp_path):
+    collector = metrics.HistogramCollector(buckets=(1.0,))
+    collector(event(duration=0.5))
+    collector(event(stage="download", duration=2.0, bytes=10))
+    text = metrics.PrometheusExporter(tmp_path / "amapi.prom").render(collector)
+    labels = 'stage="request",operation="get_report",marketplace="UK",status="ok"'
+    assert f'amapi_stage_duration_seconds_bucket{{{labels},le="1.0"}} 1' in text
+    assert f'amapi_stage_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+    assert f"amapi_stage_duration_seconds_sum{{{labels}}} 0.5" in text
+    assert f"amapi_stage_duration_seconds_count{{{labels}}} 1" in text
+    download = labels.replace("request", "download")
+    assert f"amapi_stage_bytes_total{{{download}}} 10" in text
+
+
+def test_prometheus_exporter_escapes_labels():
+    assert metrics.PrometheusExporter.escape('a"b\\c\nd') == 'a\\"b\\\\c\\nd'
+
+
+def test_prometheus_exporter_export(tmp_path):
+    collector = metrics.HistogramCollector()
+    collector(event())
+    exporter = metrics.PrometheusExporter(tmp_path / "amapi.prom")
+    exporter.export(collector)
+    assert exporter.path.read_text() == exporter.render(collector)
+    assert [path.name for path in tmp_path.iterdir()] == ["amapi.prom"]
+
+
+@pytest.fixture
+def udp_server():
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(1)
+    yield server
+    server.close()
+
+
+def test_statsd_listener(udp_server):
+    listener = metrics.StatsdListener(*udp_server.getsockname())
+    listener(event(stage="download", duration=0.25, bytes=10))
+    listener.close()
+    assert udp_server.recv(1024).decode("utf8").split("\n") == [
+        "amapi.download.get_report.UK.ok:250.000|ms",
+        "amapi.download.get_report.UK.ok.bytes:10|c",
+    ]
+
+
+def test_statsd_listener_ignores_send_errors():
+    listener = metrics.StatsdListener()
+    listener.socket = mock.Mock()
+    listener.socket.sendto.side_effect = OSError()
+    listener(event())
@@ -0,0 +1,220 @@
+import io
+import math
+from array import array
+
+import pytest
+
+from amapi import parser
+from amapi.request import GET_FBA_ESTIMATE_FEES_REPORT
+
+DOCUMENT = (
+    "sku\tasin\tyour-price\testimated-fee-total\n"
+    "ABC-1\tB000000001\t10.50\t3.20\n"
+    "ABC-2\tB000000002\t\t4.10\n"
+    "ABC-3\tB000000003\t12.00\n"
+).encode("utf8")
+
+
+@pytest.fixture
+def document():
+    return io.BytesIO(DOCUMENT)
+
+
+@pytest.fixture
+def schema():
+    return parser.ReportSchema(
+        {"your-price": parser.DECIMAL, "quantity": parser.INTEGER}, key="sku"
+    )
+
+
+@pytest.fixture
+def restore_schemas():
+    schemas = dict(parser.SCHEMAS)
+    yield
+    parser.SCHEMAS.clear()
+    parser.SCHEMAS.update(schemas)
+
+
+@pytest.mark.parametrize(
+    "value,expected", (("1.5", 1.5), ("-2", -2.0), ("1e3", 1000.0))
+)
+def test_to_decimal(value, expected):
+    assert parser.to_decimal(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "--", "N/A"])
+def test_to_decimal_returns_nan_for_invalid_values(value):
+    assert math.isnan(parser.to_decimal(value))
+
+
+def test_to_integer():
+    assert parser.to_integer("12") == 12
+    assert parser.to_integer("") == 0
+
+
+def test_schema_column_types(schema):
+    assert schema.column_type("your-price") == parser.DECIMAL
+    assert schema.column_type("quantity") == parser.INTEGER
+    assert schema.column_type("sku") == parser.STRING
+    assert schema.key == "sku"
+
+
+def test_schema_new_column(schema):
+    assert schema.new_column("your-price") == array("d")
+    assert schema.new_column("quantity") == array("q")
+    assert schema.new_column("sku") == []
+
+
+def test_get_schema_returns_registered_schema():
+    schema = parser.get_schema(GET_FBA_ESTIMATE_FEES_REPORT)
+    assert schema is parser.FBA_FEES_SCHEMA
+    assert schema.key == "sku"
+
+
+def test_get_schema_returns_default_schema_for_unknown_report():
+    schema = parser.get_schema("UNKNOWN")
+    assert schema.columns == {}
+    assert parser.get_schema(None).columns == {}
+
+
+def test_register_schema(schema, restore_schemas):
+    parser.register_schema("REPORT_TYPE", schema)
+    assert parser.get_schema("REPORT_TYPE") is schema
+
+
+def test_parse_report(document):
+    table = parser.parse_report(document, report_type=GET_FBA_ESTIMATE_FEES_REPORT)
+    assert len(table) == 3
+    assert table.header == ["sku", "asin", "your-price", "estimated-fee-total"]
+    assert table["sku"] == ["ABC-1", "ABC-2", "ABC-3"]
+    assert isinstance(table["your-price"], array)
+    assert table["your-price"].typecode == "d"
+    assert table["your-price"][0] == 10.5
+    assert math.isnan(table["your-price"][1])
+    assert math.isnan(table["estimated-fee-total"][2])
+
+
+def test_parse_report_interns_strings(document):
+    table = parser.parse_report(document)
+    assert table["sku"][0] is parser.sys.intern("ABC-1")
+
+
+def test_parse_report_from_path(tmp_path):
+    path = tmp_path / "report.txt"
+    path.write_bytes(DOCUMENT)
+    table = parser.parse_report(path, report_type=GET_FBA_ESTIMATE_FEES_REPORT)
+    assert len(table) == 3
+
+
+def test_parse_report_does_not_close_file_object(document):
+    parser.parse_report(document)
+    assert not document.closed
+
+
+def test_parse_report_chunks(document):
+    chunks = list(parser.parse_report_chunks(document, chunk_rows=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert chunks[1]["sku"] == ["ABC-3"]
+
+
+def test_parse_report_joins_chunks(document):
+    table = parser.parse_report(document, chunk_rows=1)
+    assert table["sku"] == ["ABC-1", "ABC-2", "ABC-3"]
+
+
+def test_parse_report_with_header_only():
+    table = parser.parse_report(io.BytesIO(b"sku\tasin\n"))
+    assert table.header == ["sku", "asin"]
+    assert len(table) == 0
+
+
+def test_parse_empty_report():
+    table = parser.parse_report(io.BytesIO(b""))
+    assert table.header == []
+    assert len(table) == 0
+
+
+def test_table_rows(document):
+    table = parser.parse_report(document, report_type=GET_FBA_ESTIMATE_FEES_REPORT)
+    rows = list(table.rows())
+    assert rows[0] == {
+        "sku": "ABC-1",
+        "asin": "B000000001",
+        "your-price": 10.5,
+        "estimated-fee-total": 3.2,
+    }
+    assert table.row(2)["sku"] == "ABC-3"
+
+
+def test_table_select(document):
+    table = parser.parse_report(document, report_type=GET_FBA_ESTIMATE_FEES_REPORT)
+    selected = table.select([2, 0])
+    assert selected["sku"] == ["ABC-3", "ABC-1"]
+    assert selected["your-price"] == array("d", [12.0, 10.5])
+
+
+def test_table_row_values(document):
+    table = parser.parse_report(document)
+    assert table.row_values(0) == ("ABC-1", "B000000001", "10.50", "3.20")
+
+
+def test_stitch_tables():
+    first = parser.parse_report(io.BytesIO(b"sku\tqty\nA\t1\nB\t2\n"))
+    second = parser.parse_report(io.BytesIO(b"sku\tqty\nB\t2\nC\t3\n"))
+    table = parser.stitch_tables([first, second])
+    assert table["sku"] == ["A", "B", "C"]
+    assert table["qty"] == ["1", "2", "3"]
+
+
+def test_stitch_tables_keeps_repeated_rows_within_a_table():
+    first = parser.parse_report(io.BytesIO(b"sku\tqty\nA\t1\nA\t1\n"))
+    second = parser.parse_report(io.BytesIO(b"sku\tqty\nA\t1\nA\t2\n"))
+    table = parser.stitch_tables([first, second])
+    assert table["qty"] == ["1", "1", "2"]
+
+
+def test_stitch_tables_drops_repeated_rows_with_empty_decimals(document):
+    table = parser.parse_report(document, report_type=GET_FBA_ESTIMATE_FEES_REPORT)
+    stitched = parser.stitch_tables([table, table])
+    assert stitched["sku"] == ["ABC-1", "ABC-2", "ABC-3"]
+
+
+def test_stitch_no_tables():
+    table = parser.stitch_tables([])
+    assert table.header == []
+    assert len(table) == 0
+
+
+MULTI_MARKETPLACE_DOCUMENT = (
+    "sku\tamazon-store\tyour-price\n"
+    "ABC-1\tUK\t10.50\n"
+    "ABC-1\tDE\t12.00\n"
+    "ABC-2\tUK\t8.00\n"
+).encode("utf8")
+
+
+def test_split_by_marketplace():
+    table = parser.parse_report(
+        io.BytesIO(MULTI_MARKETPLACE_DOCUMENT),
+        report_type=GET_FBA_ESTIMATE_FEES_REPORT,
+    )
+    tables = parser.split_by_marketplace(table)
+    assert list(tables) == ["UK", "DE"]
+    assert tables["UK"]["sku"] == ["ABC-1", "ABC-2"]
+    assert list(tables["UK"]["your-price"]) == [10.5, 8.0]
+    assert tables["DE"]["sku"] == ["ABC-1"]
+
+
+def test_split_by_marketplace_without_marketplace_column(document):
+    with pytest.raises(ValueError):
+        parser.split_by_marketplace(parser.parse_report(document))
+
+
+def test_parse_report_by_marketplace():
+    tables = parser.parse_report_by_marketplace(
+        io.BytesIO(MULTI_MARKETPLACE_DOCUMENT), column="amazon-store", chunk_rows=1
+    )
+    assert {name: table["sku"] for name, table in tables.items()} == {
+        "UK": ["ABC-1", "ABC-2"],
+        "DE": ["ABC-1"],
+    }
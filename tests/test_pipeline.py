@@ -0,0 +1,102 @@
+import threading
+from unittest import mock
+
+import pytest
+
+from amapi import pipeline
+
+
+@pytest.fixture
+def mock_session_class():
+    return mock.MagicMock()
+
+
+@pytest.fixture
+def job(mock_session_class):
+    return pipeline.ReportJob(mock_session_class, "report_type", "destination")
+
+
+@pytest.fixture
+def mock_request_generate_report():
+    with mock.patch("amapi.pipeline.request_generate_report") as m:
+        m.return_value = "report_id"
+        yield m
+
+
+@pytest.fixture
+def mock_wait_for_report():
+    with mock.patch("amapi.pipeline.wait_for_report") as m:
+        m.return_value = "document_id"
+        yield m
+
+
+@pytest.fixture
+def mock_download_document():
+    with mock.patch("amapi.pipeline.download_document") as m:
+        yield m
+
+
+def test_job_result_ok(job):
+    assert pipeline.JobResult(job=job, document_id="document_id").ok is True
+    assert pipeline.JobResult(job=job, error=ValueError()).ok is False
+
+
+def test_fetch_report(
+    job,
+    mock_session_class,
+    mock_request_generate_report,
+    mock_wait_for_report,
+    mock_download_document,
+):
+    session = mock_session_class.return_value.__enter__.return_value
+    value = pipeline.fetch_report(job)
+    mock_request_generate_report.assert_called_once_with(
+        session, report_type="report_type", max_age=None
+    )
+    mock_wait_for_report.assert_called_once_with(session, report_id="report_id")
+    mock_download_document.assert_called_once_with(
+        session, document_id="document_id", dest="destination"
+    )
+    assert value == "document_id"
+
+
+@mock.patch("amapi.pipeline.fetch_report")
+def test_run_job(mock_fetch_report, job):
+    value = pipeline.run_job(job)
+    mock_fetch_report.assert_called_once_with(job)
+    assert value == pipeline.JobResult(
+        job=job, document_id=mock_fetch_report.return_value
+    )
+
+
+@mock.patch("amapi.pipeline.fetch_report")
+def test_run_job_captures_error(mock_fetch_report, job):
+    error = ValueError("error")
+    mock_fetch_report.side_effect = error
+    value = pipeline.run_job(job)
+    assert value == pipeline.JobResult(job=job, error=error)
+
+
+def test_run_pipeline_with_no_jobs():
+    assert pipeline.run_pipeline([]) == []
+
+
+@mock.patch("amapi.pipeline.fetch_report")
+def test_run_pipeline_runs_jobs_concurrently(mock_fetch_report, mock_session_class):
+    jobs = [
+        pipeline.ReportJob(mock_session_class, f"report_type_{i}", f"dest_{i}")
+        for i in range(3)
+    ]
+    barrier = threading.Barrier(len(jobs), timeout=5)
+
+    def fetch_report(job):
+        barrier.wait()
+        if job.report_type == "report_type_1":
+            raise ValueError("error")
+        return job.destination
+
+    mock_fetch_report.side_effect = fetch_report
+    results = pipeline.run_pipeline(jobs)
+    assert [result.job for result in results] == jobs
+    assert [result.document_id for result in results] == ["dest_0", None, "dest_2"]
+    assert isinstance(results[1].error, ValueError)
@@ -0,0 +1,125 @@
+import threading
+from unittest import mock
+
+import pytest
+
+from amapi.ratelimit import RATE_LIMIT_HEADER, RateLimiter, TokenBucket
+
+
+@pytest.fixture
+def mock_monotonic():
+    with mock.patch("amapi.ratelimit.time.monotonic") as m:
+        m.return_value = 0
+        yield m
+
+
+@pytest.fixture
+def mock_sleep():
+    with mock.patch("amapi.ratelimit.time.sleep") as m:
+        yield m
+
+
+@pytest.fixture
+def limiter():
+    return RateLimiter(limits={"operation": (0.5, 2)})
+
+
+def test_token_bucket_allows_burst(mock_monotonic):
+    bucket = TokenBucket(rate=1, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+
+
+def test_token_bucket_queues_requests_beyond_burst(mock_monotonic):
+    bucket = TokenBucket(rate=0.5, burst=1)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 2
+    assert bucket.reserve() == 4
+
+
+def test_token_bucket_refills(mock_monotonic):
+    bucket = TokenBucket(rate=1, burst=2)
+    bucket.reserve()
+    bucket.reserve()
+    mock_monotonic.return_value = 1
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 1
+
+
+def test_token_bucket_does_not_refill_beyond_burst(mock_monotonic):
+    bucket = TokenBucket(rate=1, burst=2)
+    mock_monotonic.return_value = 100
+    bucket.reserve()
+    bucket.reserve()
+    assert bucket.reserve() == 1
+
+
+def test_token_bucket_set_rate(mock_monotonic):
+    bucket = TokenBucket(rate=1, burst=1)
+    bucket.reserve()
+    bucket.set_rate(0.25)
+    assert bucket.reserve() == 4
+
+
+def test_token_bucket_empty(mock_monotonic):
+    bucket = TokenBucket(rate=1, burst=5)
+    bucket.empty()
+    assert bucket.reserve() == 1
+
+
+def test_token_bucket_is_thread_safe():
+    bucket = TokenBucket(rate=0.001, burst=100)
+    delays = []
+
+    def reserve():
+        for _ in range(25):
+            delays.append(bucket.reserve())
+
+    threads = [threading.Thread(target=reserve) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert delays.count(0.0) == 100
+
+
+def test_rate_limiter_default_limits():
+    limiter = RateLimiter()
+    assert limiter.limits == RateLimiter.LIMITS
+    assert "create_report" in limiter.limits
+
+
+def test_get_bucket_is_keyed_by_operation_and_region(limiter):
+    bucket = limiter.get_bucket("operation", "eu-west-1")
+    assert isinstance(bucket, TokenBucket)
+    assert limiter.get_bucket("operation", "eu-west-1") is bucket
+    assert limiter.get_bucket("operation", "us-east-1") is not bucket
+
+
+def test_get_bucket_returns_None_for_unknown_operation(limiter):
+    assert limiter.get_bucket("unknown", "eu-west-1") is None
+    assert limiter.reserve("unknown", "eu-west-1") == 0
+
+
+def test_wait_sleeps_when_limited(limiter, mock_monotonic, mock_sleep):
+    limiter.wait("operation", "eu-west-1")
+    limiter.wait("operation", "eu-west-1")
+    mock_sleep.assert_not_called()
+    limiter.wait("operation", "eu-west-1")
+    mock_sleep.assert_called_once_with(2)
+
+
+def test_update_sets_rate_from_header(limiter, mock_monotonic):
+    response = mock.Mock(headers={RATE_LIMIT_HEADER: "0.1"})
+    limiter.update("operation", "eu-west-1", response)
+    assert limiter.get_bucket("operation", "eu-west-1").rate == 0.1
+
+
+@pytest.mark.parametrize("headers", [None, {}, {RATE_LIMIT_HEADER: "invalid"}])
+def test_update_ignores_missing_header(limiter, headers):
+    limiter.update("operation", "eu-west-1", mock.Mock(headers=headers))
+    assert limiter.get_bucket("operation", "eu-west-1").rate == 0.5
+
+
+def test_throttled_empties_bucket(limiter, mock_monotonic):
+    limiter.throttled("operation", "eu-west-1")
+    assert limiter.reserve("operation", "eu-west-1") == 2
@@ -0,0 +1,201 @@
+import threading
+from unittest import mock
+
+import pytest
+from sp_api.base import Marketplaces
+
+from amapi import exceptions
+from amapi.registry import SellerCredentials, SessionRegistry
+from amapi.session import AmapiSession
+
+
+@pytest.fixture
+def registry():
+    registry = SessionRegistry(idle_timeout=60, max_sessions=3)
+    for seller in ("A", "B", "C", "D"):
+        registry.register(seller, Marketplaces.UK, f"TOKEN_{seller}", "APP", "SECRET")
+    return registry
+
+
+@pytest.fixture
+def mock_monotonic():
+    with mock.patch("amapi.registry.time.monotonic") as m:
+        m.return_value = 0
+        yield m
+
+
+def test_get_creates_session_with_seller_credentials(registry):
+    session = registry.get("A", Marketplaces.UK)
+    assert isinstance(session, AmapiSession)
+    assert session.marketplace == Marketplaces.UK
+    assert session.get_credentials() == {
+        "refresh_token": "TOKEN_A",
+        "lwa_app_id": "APP",
+        "lwa_client_secret": "SECRET",
+    }
+
+
+def test_get_reuses_session(registry):
+    assert registry.get("A", Marketplaces.UK) is registry.get("A", Marketplaces.UK)
+    assert registry.get("A", Marketplaces.UK) is not registry.get("B", Marketplaces.UK)
+    assert len(registry) == 2
+
+
+def test_get_unregistered_seller(registry):
+    with pytest.raises(exceptions.SellerNotRegisteredError):
+        registry.get("A", Marketplaces.US)
+
+
+def test_get_uses_loader():
+    loader = mock.Mock(return_value=SellerCredentials("TOKEN", "APP", "SECRET"))
+    registry = SessionRegistry(loader=loader)
+    session = registry.get("A", Marketplaces.DE)
+    loader.assert_called_once_with("A", Marketplaces.DE)
+    assert session.refresh_token == "TOKEN"
+    registry.get("A", Marketplaces.DE)
+    loader.assert_called_once()
+
+
+def test_get_when_loader_returns_none():
+    registry = SessionRegistry(loader=mock.Mock(return_value=None))
+    with pytest.raises(exceptions.SellerNotRegisteredError):
+        registry.get("A", Marketplaces.DE)
+
+
+def test_register_replaces_session(registry):
+    session = registry.get("A", Marketplaces.UK)
+    registry.register("A", Marketplaces.UK, "NEW_TOKEN", "APP", "SECRET")
+    replaced = registry.get("A", Marketplaces.UK)
+    assert replaced is not session
+    assert replaced.refresh_token == "NEW_TOKEN"
+
+
+def test_unregister(registry):
+    registry.get("A", Marketplaces.UK)
+    registry.unregister("A", Marketplaces.UK)
+    assert ("A", Marketplaces.UK) not in registry
+    with pytest.raises(exceptions.SellerNotRegisteredError):
+        registry.get("A", Marketplaces.UK)
+
+
+def test_idle_sessions_are_evicted(registry, mock_monotonic):
+    first = registry.get("A", Marketplaces.UK)
+    mock_monotonic.return_value = 30
+    registry.get("B", Marketplaces.UK)
+    mock_monotonic.return_value = 61
+    registry.get("C", Marketplaces.UK)
+    assert ("A", Marketplaces.UK) not in registry
+    assert ("B", Marketplaces.UK) in registry
+    assert registry.get("A", Marketplaces.UK) is not first
+
+
+def test_evict_idle(registry, mock_monotonic):
+    registry.get("A", Marketplaces.UK)
+    registry.get("B", Marketplaces.UK)
+    assert registry.evict_idle(now=61) == [
+        ("A", Marketplaces.UK),
+        ("B", Marketplaces.UK),
+    ]
+    assert len(registry) == 0
+
+
+def test_least_recently_used_session_is_evicted(registry, mock_monotonic):
+    for seller in ("A", "B", "C"):
+        registry.get(seller, Marketplaces.UK)
+    registry.get("A", Marketplaces.UK)
+    registry.get("D", Marketplaces.UK)
+    assert len(registry) == 3
+    assert ("B", Marketplaces.UK) not in registry
+
+
+def test_evicted_session_clients_are_cleared(registry):
+    session = registry.get("A", Marketplaces.UK)
+    mock_client_class = mock.Mock()
+    session.get_client(mock_client_class)
+    registry.clear()
+    mock_client_class.return_value.close.assert_called_once_with()
+    session.get_client(mock_client_class)
+    assert mock_client_class.call_count == 2
+    assert len(registry) == 0
+
+
+def test_sessions_in_use_are_not_evicted(registry, mock_monotonic):
+    with registry.use("A", Marketplaces.UK) as session:
+        mock_monotonic.return_value = 100
+        registry.get("B", Marketplaces.UK)
+        assert ("A", Marketplaces.UK) in registry
+    mock_monotonic.return_value = 150
+    registry.get("B", Marketplaces.UK)
+    assert registry.get("A", Marketplaces.UK) is session
+    mock_monotonic.return_value = 250
+    registry.get("B", Marketplaces.UK)
+    assert ("A", Marketplaces.UK) not in registry
+
+
+def test_least_recently_used_session_in_use_is_not_evicted(registry, mock_monotonic):
+    with registry.use("A", Marketplaces.UK):
+        for seller in ("B", "C", "D"):
+            registry.get(seller, Marketplaces.UK)
+        assert ("A", Marketplaces.UK) in registry
+        assert ("B", Marketplaces.UK) not in registry
+
+
+def test_session_removed_in_use_is_closed_on_release(registry):
+    mock_client_class = mock.Mock()
+    with registry.use("A", Marketplaces.UK) as session:
+        session.get_client(mock_client_class)
+        registry.unregister("A", Marketplaces.UK)
+        assert ("A", Marketplaces.UK) not in registry
+        mock_client_class.return_value.close.assert_not_called()
+    mock_client_class.return_value.close.assert_called_once_with()
+    assert registry.users == {}
+    assert registry.removed == set()
+
+
+def test_nested_use_keeps_session_in_use(registry):
+    mock_client_class = mock.Mock()
+    with registry.use("A", Marketplaces.UK) as session:
+        with registry.use("A", Marketplaces.UK) as inner:
+            assert inner is session
+            session.get_client(mock_client_class)
+            registry.clear()
+        mock_client_class.return_value.close.assert_not_called()
+    mock_client_class.return_value.close.assert_called_once_with()
+
+
+def test_loader_is_called_without_lock(registry):
+    loading = threading.Event()
+    finish = threading.Event()
+
+    def loader(seller, marketplace):
+        loading.set()
+        finish.wait(5)
+        return SellerCredentials("TOKEN", "APP", "SECRET")
+
+    registry.loader = loader
+    thread = threading.Thread(target=registry.get, args=("E", Marketplaces.UK))
+    thread.start()
+    try:
+        assert loading.wait(5)
+        other = threading.Thread(target=registry.get, args=("A", Marketplaces.UK))
+        other.start()
+        other.join(1)
+        assert not other.is_alive()
+    finally:
+        finish.set()
+        thread.join()
+    assert ("E", Marketplaces.UK) in registry
+
+
+def test_get_from_threads(registry):
+    sessions = []
+
+    def get():
+        sessions.append(registry.get("A", Marketplaces.UK))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(session) for session in sessions}) == 1
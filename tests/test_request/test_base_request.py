@@ -1,8 +1,17 @@
 from unittest import mock
 
 import pytest
-
+from sp_api.base import (
+    Marketplaces,
+    SellingApiBadRequestException,
+    SellingApiRequestThrottledException,
+    SellingApiServerException,
+)
+
+from amapi import exceptions, metrics
 from amapi.request import BaseRequest
+from amapi.retry import RetryPolicy
+from amapi.session import AmapiSession
 
 
 @pytest.fixture
@@ -24,12 +33,8 @@ def test_baserequest_instance(mock_session, request_instance):
 
 def test_get_request_method(mock_session, request_instance):
     value = request_instance.get_request()
-    mock_session.get_credentials.assert_called_once_with()
-    request_instance.REQUEST_CLASS.assert_called_once_with(
-        credentials=mock_session.get_credentials.return_value,
-        marketplace=mock_session.marketplace,
-    )
-    assert value == request_instance.REQUEST_CLASS.return_value
+    mock_session.get_client.assert_called_once_with(request_instance.REQUEST_CLASS)
+    assert value == mock_session.get_client.return_value
 
 
 def test__request_args_method(mock_session, request_instance):
@@ -38,19 +43,37 @@ def test__request_args_method(mock_session, request_instance):
     }
 
 
+def test__request_args_method_with_marketplaces():
+    session = mock.Mock(marketplace=Marketplaces.UK)
+    request = BaseRequest(session, [Marketplaces.UK, Marketplaces.DE])
+    assert request._request_args() == {
+        "marketplaceIds": [
+            Marketplaces.UK.marketplace_id,
+            Marketplaces.DE.marketplace_id,
+        ]
+    }
+    assert request.marketplace == "GB,DE"
+
+
+def test_marketplaces_must_be_in_session_region():
+    session = mock.Mock(marketplace=Marketplaces.UK)
+    with pytest.raises(exceptions.MarketplaceRegionError):
+        BaseRequest(session, [Marketplaces.DE, Marketplaces.US])
+
+
 def test_request_args_method(request_instance):
     kwargs = {"a": "b"}
     value = request_instance.request_args(**kwargs)
     assert value == kwargs
 
 
-def test_call_method(request_instance, mock_session):
+def test_make_request_method(request_instance, mock_session):
     kwargs = {"a": "b"}
     request_instance.get_request = mock.MagicMock()
     request_instance.request_args = mock.MagicMock()
     request_instance.handle_response = mock.MagicMock()
     request_instance.REQUEST_METHOD = "request_method"
-    value = request_instance.call(**kwargs)
+    value = request_instance.make_request(**kwargs)
     request_instance.get_request.assert_called_once_with()
     request = request_instance.get_request.return_value
     request_instance.request_args.assert_called_once_with(**kwargs)
@@ -65,3 +88,125 @@ def test_handle_response_method(request_instance):
     response = mock.Mock()
     value = request_instance.handle_response(response)
     assert value == response.payload
+
+
+@pytest.fixture
+def mock_rate_limiter(request_instance):
+    request_instance.RATE_LIMITER = mock.Mock()
+    request_instance.REQUEST_METHOD = "request_method"
+    request_instance.get_request = mock.MagicMock()
+    return request_instance.RATE_LIMITER
+
+
+def test_region_property(mock_session, request_instance):
+    assert request_instance.region == mock_session.marketplace.region
+
+
+def test_rate_limit_key_is_per_seller():
+    def rate_limit_key(refresh_token):
+        session = AmapiSession(
+            refresh_token=refresh_token,
+            app_id="APP_ID",
+            client_secret="SECRET",
+            marketplace=Marketplaces.UK,
+        )
+        return BaseRequest(session).rate_limit_key
+
+    assert rate_limit_key("A") == rate_limit_key("A")
+    assert rate_limit_key("A") != rate_limit_key("B")
+    assert rate_limit_key("A")[:2] == (Marketplaces.UK.region, "APP_ID")
+    assert "A" not in rate_limit_key("A")
+
+
+def test_make_request_method_is_rate_limited(request_instance, mock_rate_limiter):
+    request_instance.make_request()
+    response = request_instance.get_request.return_value.request_method.return_value
+    mock_rate_limiter.wait.assert_called_once_with(
+        "request_method", request_instance.rate_limit_key
+    )
+    mock_rate_limiter.update.assert_called_once_with(
+        "request_method", request_instance.rate_limit_key, response
+    )
+
+
+def test_make_request_method_records_throttling(request_instance, mock_rate_limiter):
+    request = request_instance.get_request.return_value
+    request.request_method.side_effect = SellingApiRequestThrottledException([], {})
+    with pytest.raises(SellingApiRequestThrottledException):
+        request_instance.make_request()
+    mock_rate_limiter.throttled.assert_called_once_with(
+        "request_method", request_instance.rate_limit_key
+    )
+    mock_rate_limiter.update.assert_not_called()
+
+
+@pytest.fixture
+def mock_sleep():
+    with mock.patch("amapi.request.time.sleep") as m:
+        yield m
+
+
+def test_call_method(request_instance):
+    request_instance.make_request = mock.Mock()
+    value = request_instance.call(a="b")
+    request_instance.make_request.assert_called_once_with(a="b")
+    assert value == request_instance.make_request.return_value
+
+
+def test_call_method_retries_retryable_errors(request_instance, mock_sleep):
+    error = SellingApiServerException([], {})
+    request_instance.make_request = mock.Mock(side_effect=[error, error, "value"])
+    request_instance.RETRY_POLICY = RetryPolicy(initial_delay=1, jitter=0)
+    value = request_instance.call(a="b")
+    assert request_instance.make_request.call_count == 3
+    assert mock_sleep.call_args_list == [mock.call(1), mock.call(2)]
+    assert value == "value"
+
+
+def test_call_method_does_not_retry_other_errors(request_instance, mock_sleep):
+    error = SellingApiBadRequestException([], {})
+    request_instance.make_request = mock.Mock(side_effect=error)
+    with pytest.raises(SellingApiBadRequestException):
+        request_instance.call()
+    request_instance.make_request.assert_called_once_with()
+    mock_sleep.assert_not_called()
+
+
+def test_call_method_stops_after_max_attempts(request_instance, mock_sleep):
+    error = SellingApiServerException([], {})
+    request_instance.make_request = mock.Mock(side_effect=error)
+    request_instance.RETRY_POLICY = RetryPolicy(max_attempts=3)
+    with pytest.raises(SellingApiServerException):
+        request_instance.call()
+    assert request_instance.make_request.call_count == 3
+
+
+def test_marketplace_property(mock_session, request_instance):
+    assert request_instance.marketplace == mock_session.marketplace.name
+
+
+def test_make_request_method_times_stages(request_instance, mock_rate_limiter):
+    events = []
+    request_instance.INSTRUMENTATION = metrics.Instrumentation()
+    request_instance.INSTRUMENTATION.add_listener(events.append)
+    request_instance.make_request()
+    assert [event.stage for event in events] == [
+        metrics.CLIENT,
+        metrics.RATE_LIMIT,
+        metrics.REQUEST,
+        metrics.RESPONSE,
+    ]
+    assert {event.operation for event in events} == {"request_method"}
+    assert {event.marketplace for event in events} == {request_instance.marketplace}
+
+
+def test_make_request_method_times_failed_requests(request_instance, mock_rate_limiter):
+    events = []
+    request_instance.INSTRUMENTATION = metrics.Instrumentation()
+    request_instance.INSTRUMENTATION.add_listener(events.append)
+    request = request_instance.get_request.return_value
+    request.request_method.side_effect = SellingApiRequestThrottledException([], {})
+    with pytest.raises(SellingApiRequestThrottledException):
+        request_instance.make_request()
+    assert events[-1].stage == metrics.REQUEST
+    assert events[-1].status == "429"
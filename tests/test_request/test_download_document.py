@@ -0,0 +1,145 @@
+import gzip
+import io
+from unittest import mock
+
+import pytest
+
+from amapi import metrics, request
+from amapi.cache import DocumentCache
+
+CONTENT = b"sku\tasin\tfee\n" + b"ABC-123\tB000000000\t1.23\n" * 10000
+
+
+@pytest.fixture
+def mock_session():
+    return mock.Mock()
+
+
+@pytest.fixture
+def document_url():
+    return "https://example.com/document"
+
+
+@pytest.fixture
+def mock_request_document():
+    with mock.patch("amapi.request.request_document") as m:
+        yield m
+
+
+def mock_response(body):
+    response = mock.MagicMock()
+    response.__enter__.return_value = response
+    response.iter_content.side_effect = lambda chunk_size: (
+        body[i : i + chunk_size] for i in range(0, len(body), chunk_size)
+    )
+    return response
+
+
+@pytest.fixture
+def mock_get():
+    with mock.patch("amapi.request.requests.get") as m:
+        yield m
+
+
+@mock.patch("amapi.request.GetDocumentRequest")
+def test_request_document(mock_request_class, mock_session):
+    mock_request_class.return_value.call.return_value = {"url": "url"}
+    value = request.request_document(session=mock_session, document_id="document_id")
+    mock_request_class.assert_called_once_with(mock_session)
+    mock_request_class.return_value.call.assert_called_once_with(
+        document_id="document_id"
+    )
+    assert value == {"url": "url"}
+
+
+def test_stream_document(mock_get, document_url):
+    mock_get.return_value = mock_response(CONTENT)
+    f = io.BytesIO()
+    written = request.stream_document({"url": document_url}, f)
+    mock_get.assert_called_once_with(
+        document_url, stream=True, timeout=request.DOWNLOAD_TIMEOUT
+    )
+    mock_get.return_value.raise_for_status.assert_called_once_with()
+    assert f.getvalue() == CONTENT
+    assert written == len(CONTENT)
+
+
+def test_stream_document_decompresses_gzip(mock_get, document_url):
+    mock_get.return_value = mock_response(gzip.compress(CONTENT))
+    f = io.BytesIO()
+    document = {"url": document_url, "compressionAlgorithm": "GZIP"}
+    written = request.stream_document(document, f)
+    assert f.getvalue() == CONTENT
+    assert written == len(CONTENT)
+
+
+def test_download_document_to_file_object(
+    mock_session, mock_request_document, mock_get, document_url
+):
+    mock_request_document.return_value = {"url": document_url}
+    mock_get.return_value = mock_response(CONTENT)
+    f = io.BytesIO()
+    value = request.download_document(mock_session, "document_id", f)
+    mock_request_document.assert_called_once_with(
+        mock_session, document_id="document_id"
+    )
+    assert f.getvalue() == CONTENT
+    assert value == len(CONTENT)
+
+
+def test_download_document_times_download(
+    mock_session, mock_request_document, mock_get, document_url
+):
+    mock_request_document.return_value = {"url": document_url}
+    mock_get.return_value = mock_response(CONTENT)
+    events = []
+    instrumentation = metrics.Instrumentation()
+    instrumentation.add_listener(events.append)
+    with mock.patch.object(
+        request.GetDocumentRequest, "INSTRUMENTATION", instrumentation
+    ):
+        request.download_document(mock_session, "document_id", io.BytesIO())
+    assert len(events) == 1
+    assert events[0].stage == metrics.DOWNLOAD
+    assert events[0].operation == "get_report_document"
+    assert events[0].marketplace == mock_session.marketplace.name
+    assert events[0].bytes == len(CONTENT)
+
+
+def test_download_document_to_path(
+    tmp_path, mock_session, mock_request_document, mock_get, document_url
+):
+    mock_request_document.return_value = {"url": document_url}
+    mock_get.return_value = mock_response(CONTENT)
+    path = tmp_path / "report.txt"
+    request.download_document(mock_session, "document_id", path)
+    assert path.read_bytes() == CONTENT
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DocumentCache(tmp_path / "cache")
+
+
+def test_download_document_populates_cache(
+    cache, mock_session, mock_request_document, mock_get, document_url
+):
+    mock_request_document.return_value = {"url": document_url}
+    mock_get.return_value = mock_response(CONTENT)
+    f = io.BytesIO()
+    value = request.download_document(mock_session, "document_id", f, cache=cache)
+    assert f.getvalue() == CONTENT
+    assert value == len(CONTENT)
+    assert cache.get("document_id").read_bytes() == CONTENT
+
+
+def test_download_document_serves_from_cache(
+    tmp_path, cache, mock_session, mock_request_document, mock_get
+):
+    cache.put("document_id", lambda f: f.write(CONTENT))
+    path = tmp_path / "report.txt"
+    value = request.download_document(mock_session, "document_id", path, cache=cache)
+    mock_request_document.assert_not_called()
+    mock_get.assert_not_called()
+    assert path.read_bytes() == CONTENT
+    assert value == len(CONTENT)
@@ -28,18 +28,18 @@ def test_request_method_attribue():
     assert GenerateReportRequest.REQUEST_METHOD == "create_report"
 
 
+def test_retry_policy_only_retries_unprocessed_requests():
+    assert GenerateReportRequest.RETRY_POLICY.retryable_codes == {429, 503}
+
+
 def test_GenerateReportRequest_instance(mock_session, request_instance):
     assert request_instance.session == mock_session
 
 
 def test_get_request_method(mock_session, request_instance):
     value = request_instance.get_request()
-    mock_session.get_credentials.assert_called_once_with()
-    request_instance.REQUEST_CLASS.assert_called_once_with(
-        credentials=mock_session.get_credentials.return_value,
-        marketplace=mock_session.marketplace,
-    )
-    assert value == request_instance.REQUEST_CLASS.return_value
+    mock_session.get_client.assert_called_once_with(request_instance.REQUEST_CLASS)
+    assert value == mock_session.get_client.return_value
 
 
 def test__request_args_method(mock_session, request_instance):
@@ -59,12 +59,12 @@ def test_request_args_method(mock_session, request_instance):
     }
 
 
-def test_call_method(request_instance, mock_session):
+def test_make_request_method(request_instance, mock_session):
     kwargs = {"a": "b"}
     request_instance.get_request = mock.MagicMock()
     request_instance.request_args = mock.MagicMock()
     request_instance.handle_response = mock.MagicMock()
-    value = request_instance.call(**kwargs)
+    value = request_instance.make_request(**kwargs)
     request_instance.get_request.assert_called_once_with()
     request = request_instance.get_request.return_value
     request_instance.request_args.assert_called_once_with(**kwargs)
@@ -79,3 +79,13 @@ def test_handle_response_method(request_instance):
     response = mock.MagicMock()
     value = request_instance.handle_response(response)
     assert value == response.payload["reportId"]
+
+
+def test_request_args_method_with_end_date(mock_session, request_instance):
+    date = dt.datetime(2024, 1, 1)
+    end_date = dt.datetime(2024, 1, 2)
+    value = request_instance.request_args(
+        report_type="report_type", date=date, end_date=end_date
+    )
+    assert value["dataStartTime"] == date.isoformat()
+    assert value["dataEndTime"] == end_date.isoformat()
@@ -33,12 +33,8 @@ def test_GetDocumentIdRequest_instance(mock_session, request_instance):
 
 def test_get_request_method(mock_session, request_instance):
     value = request_instance.get_request()
-    mock_session.get_credentials.assert_called_once_with()
-    request_instance.REQUEST_CLASS.assert_called_once_with(
-        credentials=mock_session.get_credentials.return_value,
-        marketplace=mock_session.marketplace,
-    )
-    assert value == request_instance.REQUEST_CLASS.return_value
+    mock_session.get_client.assert_called_once_with(request_instance.REQUEST_CLASS)
+    assert value == mock_session.get_client.return_value
 
 
 def test__request_args_method(mock_session, request_instance):
@@ -56,12 +52,12 @@ def test_request_args_method(mock_session, request_instance):
     }
 
 
-def test_call_method(request_instance, mock_session):
+def test_make_request_method(request_instance, mock_session):
     kwargs = {"a": "b"}
     request_instance.get_request = mock.MagicMock()
     request_instance.request_args = mock.MagicMock()
     request_instance.handle_response = mock.MagicMock()
-    value = request_instance.call(**kwargs)
+    value = request_instance.make_request(**kwargs)
     request_instance.get_request.assert_called_once_with()
     request = request_instance.get_request.return_value
     request_instance.request_args.assert_called_once_with(**kwargs)
@@ -0,0 +1,42 @@
+from unittest import mock
+
+import pytest
+from sp_api.api import Reports
+
+from amapi.request import GetDocumentRequest
+
+
+@pytest.fixture
+def mock_session():
+    session = mock.Mock()
+    return session
+
+
+@pytest.fixture
+def request_instance(mock_session):
+    request = GetDocumentRequest(session=mock_session)
+    request.REQUEST_CLASS = mock.Mock()
+    return request
+
+
+def test_request_class_attribue():
+    assert GetDocumentRequest.REQUEST_CLASS == Reports
+
+
+def test_request_method_attribue():
+    assert GetDocumentRequest.REQUEST_METHOD == "get_report_document"
+
+
+def test_request_args_method(mock_session, request_instance):
+    document_id = "document_id"
+    value = request_instance.request_args(document_id=document_id)
+    assert value == {
+        "marketplaceIds": [mock_session.marketplace.marketplace_id],
+        "reportDocumentId": document_id,
+    }
+
+
+def test_handle_response_method(request_instance):
+    response = mock.MagicMock()
+    value = request_instance.handle_response(response)
+    assert value == response.payload
@@ -0,0 +1,46 @@
+from unittest import mock
+
+import pytest
+from sp_api.api import Reports
+
+from amapi.request import GetReportRequest
+
+
+@pytest.fixture
+def mock_session():
+    session = mock.Mock()
+    return session
+
+
+@pytest.fixture
+def request_instance(mock_session):
+    request = GetReportRequest(session=mock_session)
+    request.REQUEST_CLASS = mock.Mock()
+    return request
+
+
+def test_request_class_attribue():
+    assert GetReportRequest.REQUEST_CLASS == Reports
+
+
+def test_request_method_attribue():
+    assert GetReportRequest.REQUEST_METHOD == "get_report"
+
+
+def test_GetReportRequest_instance(mock_session, request_instance):
+    assert request_instance.session == mock_session
+
+
+def test_request_args_method(mock_session, request_instance):
+    report_id = "report_id"
+    value = request_instance.request_args(report_id=report_id)
+    assert value == {
+        "marketplaceIds": [mock_session.marketplace.marketplace_id],
+        "reportId": report_id,
+    }
+
+
+def test_handle_response_method(request_instance):
+    response = mock.MagicMock()
+    value = request_instance.handle_response(response)
+    assert value == response.payload
@@ -0,0 +1,51 @@
+import datetime as dt
+from unittest import mock
+
+import pytest
+from sp_api.api import Reports
+
+from amapi.request import GetReportsRequest
+
+
+@pytest.fixture
+def mock_session():
+    session = mock.Mock()
+    return session
+
+
+@pytest.fixture
+def request_instance(mock_session):
+    request = GetReportsRequest(session=mock_session)
+    request.REQUEST_CLASS = mock.Mock()
+    return request
+
+
+def test_request_class_attribue():
+    assert GetReportsRequest.REQUEST_CLASS == Reports
+
+
+def test_request_method_attribue():
+    assert GetReportsRequest.REQUEST_METHOD == "get_reports"
+
+
+def test_request_args_method(mock_session, request_instance):
+    created_since = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+    value = request_instance.request_args(
+        report_type="report_type", created_since=created_since
+    )
+    assert value == {
+        "marketplaceIds": [mock_session.marketplace.marketplace_id],
+        "reportTypes": ["report_type"],
+        "processingStatuses": ["DONE"],
+        "createdSince": created_since.isoformat(),
+    }
+
+
+def test_handle_response_method(request_instance):
+    response = mock.Mock(payload={"reports": [{"reportId": "1"}]})
+    assert request_instance.handle_response(response) == [{"reportId": "1"}]
+
+
+def test_handle_response_method_without_reports(request_instance):
+    response = mock.Mock(payload={})
+    assert request_instance.handle_response(response) == []
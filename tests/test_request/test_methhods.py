@@ -1,6 +1,8 @@
+import datetime as dt
 from unittest import mock
 
 import pytest
+from sp_api.base import Marketplaces
 
 from amapi import request
 
@@ -16,9 +18,9 @@ def test_request_generate_report(mock_request_class, mock_session):
     value = request.request_generate_report(
         session=mock_session, report_type=report_type
     )
-    mock_request_class.assert_called_once_with(mock_session)
+    mock_request_class.assert_called_once_with(mock_session, None)
     mock_request_class.return_value.call.assert_called_once_with(
-        report_type=report_type
+        report_type=report_type, date=None, end_date=None
     )
     assert value == str(mock_request_class.return_value.call.return_value)
 
@@ -41,3 +43,218 @@ def test_request_document_url(mock_request_class, mock_session):
         document_id=document_id
     )
     assert value == str(mock_request_class.return_value.call.return_value)
+
+
+@mock.patch("amapi.request.ReportPoller")
+def test_wait_for_report(mock_poller_class, mock_session):
+    report_id = "report_id"
+    mock_poller_class.return_value.poll.return_value = {
+        "reportDocumentId": "document_id"
+    }
+    value = request.wait_for_report(session=mock_session, report_id=report_id)
+    mock_poller_class.assert_called_once_with(mock_session, timeout=None)
+    mock_poller_class.return_value.poll.assert_called_once_with(report_id)
+    assert value == "document_id"
+
+
+@pytest.fixture
+def marketplace_id(mock_session):
+    return mock_session.marketplace.marketplace_id
+
+
+def test_select_recent_report(mock_session, marketplace_id):
+    reports = [
+        {
+            "reportId": "1",
+            "marketplaceIds": [marketplace_id],
+            "dataStartTime": "2023-12-29T10:00:00+00:00",
+            "createdTime": "2024-01-01T10:00:00+00:00",
+        },
+        {
+            "reportId": "2",
+            "marketplaceIds": [marketplace_id],
+            "dataStartTime": "2023-12-29T11:00:00+00:00",
+            "createdTime": "2024-01-01T11:00:00+00:00",
+        },
+        {
+            "reportId": "3",
+            "marketplaceIds": [marketplace_id, "OTHER"],
+            "dataStartTime": "2023-12-29T12:00:00+00:00",
+            "createdTime": "2024-01-01T12:00:00+00:00",
+        },
+    ]
+    assert request.select_recent_report(mock_session, reports) == "2"
+
+
+def test_select_recent_report_without_matching_report(mock_session):
+    reports = [{"reportId": "1", "marketplaceIds": ["OTHER"], "createdTime": ""}]
+    assert request.select_recent_report(mock_session, reports) is None
+
+
+def test_select_recent_report_for_marketplaces():
+    session = mock.Mock(marketplace=Marketplaces.UK)
+    marketplaces = [Marketplaces.UK, Marketplaces.DE]
+    reports = [
+        {
+            "reportId": "1",
+            "marketplaceIds": [Marketplaces.UK.marketplace_id],
+            "dataStartTime": "2023-12-29T12:00:00+00:00",
+            "createdTime": "2024-01-01T12:00:00+00:00",
+        },
+        {
+            "reportId": "2",
+            "marketplaceIds": [
+                Marketplaces.DE.marketplace_id,
+                Marketplaces.UK.marketplace_id,
+            ],
+            "dataStartTime": "2023-12-29T11:00:00+00:00",
+            "createdTime": "2024-01-01T11:00:00+00:00",
+        },
+    ]
+    assert request.select_recent_report(session, reports, marketplaces) == "2"
+
+
+def test_select_recent_report_matches_data_window(mock_session, marketplace_id):
+    start = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+    end = dt.datetime(2024, 1, 2, tzinfo=dt.timezone.utc)
+    reports = [
+        {
+            "reportId": "1",
+            "marketplaceIds": [marketplace_id],
+            "dataStartTime": "2024-01-01T00:00:00+00:00",
+            "dataEndTime": "2024-01-02T00:00:00+00:00",
+            "createdTime": "2024-01-05T10:00:00+00:00",
+        },
+        {
+            "reportId": "2",
+            "marketplaceIds": [marketplace_id],
+            "dataStartTime": "2023-12-01T00:00:00+00:00",
+            "dataEndTime": "2024-01-02T00:00:00+00:00",
+            "createdTime": "2024-01-05T11:00:00+00:00",
+        },
+        {
+            "reportId": "3",
+            "marketplaceIds": [marketplace_id],
+            "dataStartTime": "2024-01-02T09:00:00Z",
+            "dataEndTime": "2024-01-05T09:00:00Z",
+            "createdTime": "2024-01-05T09:00:00Z",
+        },
+    ]
+    assert request.select_recent_report(mock_session, reports, None, start, end) == "1"
+    assert request.select_recent_report(mock_session, reports) == "3"
+    naive_start = dt.datetime(2024, 1, 1)
+    assert (
+        request.select_recent_report(mock_session, reports, None, naive_start, end)
+        == "1"
+    )
+
+
+def test_select_recent_report_ignores_other_windows(mock_session, marketplace_id):
+    reports = [
+        {
+            "reportId": "1",
+            "marketplaceIds": [marketplace_id],
+            "dataStartTime": "2023-01-01T00:00:00+00:00",
+            "dataEndTime": "2023-02-01T00:00:00+00:00",
+            "createdTime": "2024-01-05T10:00:00+00:00",
+        },
+        {"reportId": "2", "marketplaceIds": [marketplace_id], "createdTime": "x"},
+    ]
+    assert request.select_recent_report(mock_session, reports) is None
+
+
+@mock.patch("amapi.request.GenerateReportRequest")
+@mock.patch("amapi.request.find_recent_report")
+def test_request_generate_report_for_data_window(
+    mock_find_recent_report, mock_request_class, mock_session
+):
+    mock_find_recent_report.return_value = None
+    start = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+    end = dt.datetime(2024, 1, 2, tzinfo=dt.timezone.utc)
+    max_age = dt.timedelta(hours=1)
+    request.request_generate_report(
+        mock_session, "report_type", max_age=max_age, start=start, end=end
+    )
+    assert mock_find_recent_report.call_args.kwargs["start"] == start
+    assert mock_find_recent_report.call_args.kwargs["end"] == end
+    mock_request_class.return_value.call.assert_called_once_with(
+        report_type="report_type", date=start, end_date=end
+    )
+
+
+@mock.patch("amapi.request.GenerateReportRequest")
+def test_request_generate_report_for_marketplaces(mock_request_class, mock_session):
+    marketplaces = [Marketplaces.UK, Marketplaces.DE]
+    request.request_generate_report(
+        mock_session, report_type="report_type", marketplaces=marketplaces
+    )
+    mock_request_class.assert_called_once_with(mock_session, marketplaces)
+
+
+@mock.patch("amapi.request.select_recent_report")
+@mock.patch("amapi.request.GetReportsRequest")
+def test_find_recent_report(
+    mock_request_class, mock_select_recent_report, mock_session
+):
+    max_age = dt.timedelta(hours=1)
+    value = request.find_recent_report(mock_session, "report_type", max_age=max_age)
+    mock_request_class.assert_called_once_with(mock_session, None)
+    kwargs = mock_request_class.return_value.call.call_args.kwargs
+    assert kwargs["report_type"] == "report_type"
+    assert (
+        dt.datetime.now(dt.timezone.utc) - kwargs["created_since"] - max_age
+    ) < dt.timedelta(seconds=5)
+    mock_select_recent_report.assert_called_once_with(
+        mock_session,
+        mock_request_class.return_value.call.return_value,
+        None,
+        None,
+        None,
+    )
+    assert value == mock_select_recent_report.return_value
+
+
+@mock.patch("amapi.request.GenerateReportRequest")
+@mock.patch("amapi.request.find_recent_report")
+def test_request_generate_report_reuses_recent_report(
+    mock_find_recent_report, mock_request_class, mock_session
+):
+    max_age = dt.timedelta(hours=1)
+    mock_find_recent_report.return_value = "report_id"
+    value = request.request_generate_report(
+        mock_session, report_type="report_type", max_age=max_age
+    )
+    mock_find_recent_report.assert_called_once_with(
+        mock_session,
+        "report_type",
+        max_age=max_age,
+        marketplaces=None,
+        start=None,
+        end=None,
+    )
+    mock_request_class.assert_not_called()
+    assert value == "report_id"
+
+
+@mock.patch("amapi.request.GenerateReportRequest")
+@mock.patch("amapi.request.find_recent_report")
+def test_request_generate_report_creates_report_without_recent_report(
+    mock_find_recent_report, mock_request_class, mock_session
+):
+    mock_find_recent_report.return_value = None
+    value = request.request_generate_report(
+        mock_session, report_type="report_type", max_age=dt.timedelta(hours=1)
+    )
+    mock_request_class.return_value.call.assert_called_once_with(
+        report_type="report_type", date=None, end_date=None
+    )
+    assert value == str(mock_request_class.return_value.call.return_value)
+
+
+@mock.patch("amapi.request.GetReportRequest")
+def test_request_report(mock_request_class, mock_session):
+    mock_request_class.return_value.call.return_value = {"reportId": "1"}
+    value = request.request_report(mock_session, "1")
+    mock_request_class.assert_called_once_with(mock_session)
+    mock_request_class.return_value.call.assert_called_once_with(report_id="1")
+    assert value == {"reportId": "1"}
@@ -0,0 +1,143 @@
+import itertools
+import threading
+from unittest import mock
+
+import pytest
+
+from amapi import exceptions, metrics
+from amapi.request import ProcessingStatus, ReportPoller
+
+
+@pytest.fixture
+def mock_session():
+    return mock.Mock()
+
+
+@pytest.fixture
+def mock_sleep():
+    with mock.patch("amapi.request.time.sleep") as m:
+        yield m
+
+
+@pytest.fixture
+def mock_monotonic():
+    with mock.patch("amapi.request.time.monotonic") as m:
+        m.return_value = 0
+        yield m
+
+
+@pytest.fixture
+def mock_get_report_request():
+    with mock.patch("amapi.request.GetReportRequest") as m:
+        yield m
+
+
+@pytest.fixture
+def report_id():
+    return "report_id"
+
+
+def report(status):
+    return {"processingStatus": status, "reportDocumentId": "document_id"}
+
+
+def test_default_options(mock_session):
+    poller = ReportPoller(mock_session)
+    assert poller.session == mock_session
+    assert poller.initial_delay == ReportPoller.INITIAL_DELAY
+    assert poller.max_delay == ReportPoller.MAX_DELAY
+    assert poller.backoff_factor == ReportPoller.BACKOFF_FACTOR
+    assert poller.jitter == ReportPoller.JITTER
+    assert poller.timeout == ReportPoller.TIMEOUT
+
+
+def test_delays_back_off_exponentially(mock_session):
+    poller = ReportPoller(
+        mock_session, initial_delay=1, max_delay=5, backoff_factor=2, jitter=0
+    )
+    delays = poller.delays()
+    assert [next(delays) for _ in range(5)] == [1, 2, 4, 5, 5]
+
+
+def test_delays_are_jittered(mock_session):
+    poller = ReportPoller(mock_session, initial_delay=10, backoff_factor=1, jitter=0.5)
+    for delay in itertools.islice(poller.delays(), 50):
+        assert 5 <= delay <= 15
+
+
+def test_get_status(mock_session, mock_get_report_request, report_id):
+    mock_get_report_request.return_value.call.return_value = report("DONE")
+    value = ReportPoller(mock_session).get_status(report_id)
+    mock_get_report_request.assert_called_once_with(mock_session)
+    mock_get_report_request.return_value.call.assert_called_once_with(
+        report_id=report_id
+    )
+    assert value == report("DONE")
+
+
+def test_poll_returns_finished_report(
+    mock_session, mock_get_report_request, mock_sleep, mock_monotonic, report_id
+):
+    mock_get_report_request.return_value.call.side_effect = [
+        report(ProcessingStatus.IN_QUEUE),
+        report(ProcessingStatus.IN_PROGRESS),
+        report(ProcessingStatus.DONE),
+    ]
+    poller = ReportPoller(mock_session, initial_delay=1, jitter=0)
+    value = poller.poll(report_id)
+    assert value == report("DONE")
+    assert mock_sleep.call_args_list == [mock.call(1), mock.call(2)]
+
+
+def test_poll_times_wait(
+    mock_session, mock_get_report_request, mock_sleep, mock_monotonic, report_id
+):
+    mock_get_report_request.REQUEST_METHOD = "get_report"
+    mock_get_report_request.return_value.call.return_value = report("DONE")
+    events = []
+    poller = ReportPoller(mock_session)
+    poller.INSTRUMENTATION = metrics.Instrumentation()
+    poller.INSTRUMENTATION.add_listener(events.append)
+    poller.poll(report_id)
+    assert [(event.stage, event.operation) for event in events] == [
+        (metrics.WAIT, "get_report")
+    ]
+
+
+@pytest.mark.parametrize("status", [ProcessingStatus.CANCELLED, "FATAL"])
+def test_poll_raises_for_failed_report(
+    mock_session,
+    mock_get_report_request,
+    mock_sleep,
+    mock_monotonic,
+    report_id,
+    status,
+):
+    mock_get_report_request.return_value.call.return_value = report(status)
+    with pytest.raises(exceptions.ReportProcessingError) as excinfo:
+        ReportPoller(mock_session).poll(report_id)
+    assert excinfo.value.report_id == report_id
+    assert excinfo.value.status == status
+    mock_sleep.assert_not_called()
+
+
+def test_poll_raises_after_timeout(
+    mock_session, mock_get_report_request, mock_sleep, mock_monotonic, report_id
+):
+    mock_monotonic.side_effect = [0, 5, 11]
+    mock_get_report_request.return_value.call.return_value = report("IN_PROGRESS")
+    poller = ReportPoller(mock_session, initial_delay=8, jitter=0, timeout=10)
+    with pytest.raises(exceptions.ReportTimeoutError):
+        poller.poll(report_id)
+    assert mock_sleep.call_args_list == [mock.call(5)]
+
+
+def test_poll_stops_when_stop_is_set(mock_session, mock_get_report_request, report_id):
+    mock_get_report_request.return_value.call.return_value = report("IN_PROGRESS")
+    stop = threading.Event()
+    stop.set()
+    poller = ReportPoller(mock_session, stop=stop, initial_delay=60)
+    with mock.patch("amapi.request.time.sleep") as mock_sleep:
+        with pytest.raises(exceptions.ReportPollStoppedError):
+            poller.poll(report_id)
+    mock_sleep.assert_not_called()
@@ -0,0 +1,92 @@
+import datetime as dt
+from email.utils import format_datetime
+from unittest import mock
+
+import pytest
+from sp_api.base import (
+    SellingApiBadRequestException,
+    SellingApiRequestThrottledException,
+    SellingApiServerException,
+)
+
+from amapi.retry import RetryPolicy
+
+
+@pytest.fixture
+def policy():
+    return RetryPolicy(initial_delay=1, max_delay=10, jitter=0)
+
+
+def throttled(headers=None):
+    return SellingApiRequestThrottledException([], headers)
+
+
+def test_default_options():
+    policy = RetryPolicy()
+    assert policy.max_attempts == RetryPolicy.MAX_ATTEMPTS
+    assert policy.initial_delay == RetryPolicy.INITIAL_DELAY
+    assert policy.max_delay == RetryPolicy.MAX_DELAY
+    assert policy.backoff_factor == RetryPolicy.BACKOFF_FACTOR
+    assert policy.jitter == RetryPolicy.JITTER
+    assert policy.retryable_codes == RetryPolicy.RETRYABLE_CODES
+
+
+@pytest.mark.parametrize(
+    "error,expected",
+    (
+        (throttled(), True),
+        (SellingApiServerException([], None), True),
+        (SellingApiBadRequestException([], None), False),
+        (ValueError(), False),
+    ),
+)
+def test_is_retryable(policy, error, expected):
+    assert policy.is_retryable(error) is expected
+
+
+def test_is_retryable_with_custom_codes():
+    policy = RetryPolicy(retryable_codes={429})
+    assert policy.is_retryable(throttled()) is True
+    assert policy.is_retryable(SellingApiServerException([], None)) is False
+
+
+def test_should_retry(policy):
+    assert policy.should_retry(throttled(), 1) is True
+    assert policy.should_retry(throttled(), policy.max_attempts) is False
+    assert policy.should_retry(ValueError(), 1) is False
+
+
+def test_get_delay_backs_off_exponentially(policy):
+    delays = [policy.get_delay(throttled(), attempt) for attempt in range(1, 7)]
+    assert delays == [1, 2, 4, 8, 10, 10]
+
+
+def test_get_delay_is_jittered():
+    policy = RetryPolicy(initial_delay=10, jitter=0.5)
+    for _ in range(50):
+        assert 5 <= policy.get_delay(throttled(), 1) <= 15
+
+
+@pytest.mark.parametrize("header", ["Retry-After", "retry-after"])
+def test_retry_after_seconds(policy, header):
+    assert policy.retry_after(throttled({header: "30"})) == 30
+
+
+def test_retry_after_http_date(policy):
+    retry_at = dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=120)
+    value = policy.retry_after(throttled({"Retry-After": format_datetime(retry_at)}))
+    assert 100 < value <= 120
+
+
+@pytest.mark.parametrize("headers", [None, {}, {"Retry-After": "invalid"}])
+def test_retry_after_missing_or_invalid(policy, headers):
+    assert policy.retry_after(throttled(headers)) is None
+
+
+def test_get_delay_honours_retry_after(policy):
+    assert policy.get_delay(throttled({"Retry-After": "30"}), 1) == 30
+
+
+def test_get_delay_ignores_shorter_retry_after(policy):
+    with mock.patch.object(policy, "retry_after", return_value=0.5):
+        assert policy.get_delay(throttled(), 3) == 4
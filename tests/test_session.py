@@ -1,3 +1,4 @@
+import asyncio
 from pathlib import Path
 from unittest import mock
 
@@ -5,8 +6,9 @@ import pytest
 import toml
 from sp_api.base import Marketplaces
 
-from amapi import exceptions
+from amapi import exceptions, session
 from amapi.session import AmapiSession, AmapiSessionUK, AmapiSessionUS
+from amapi.tokens import CachedAsyncAccessTokenClient
 
 
 @pytest.fixture(autouse=True)
@@ -81,6 +83,9 @@ def reset_session():
     AmapiSessionUS.refresh_token = None
     AmapiSessionUS.app_id = None
     AmapiSessionUS.client_secret = None
+    AmapiSession.TOKEN_CACHE = None
+    AmapiSession.clear_clients()
+    AmapiSession.clear_config_cache()
 
 
 def test_enter_method_with_credentials_set(
@@ -177,6 +182,78 @@ def test_find_config_filepath_returns_None_without_config_file_in_cwd(
     assert path is None
 
 
+def test_find_config_filepath_returns_config_file_in_parent(
+    reset_session, temp_cwd, config_filename, config_file
+):
+    AmapiSession.CONFIG_FILENAME = config_filename
+    with temp_cwd.mkdir("child").as_cwd():
+        path = AmapiSession.find_config_filepath()
+    assert path == temp_cwd / config_filename
+
+
+def test_find_config_filepath_returns_path_from_env_var(
+    reset_session, monkeypatch, tmp_path
+):
+    monkeypatch.setenv(AmapiSession.CONFIG_PATH_ENV_VAR, str(tmp_path / "amapi.toml"))
+    with mock.patch("amapi.session.AmapiSession._scan_for_config_file") as mock_scan:
+        path = AmapiSession.find_config_filepath()
+    assert path == tmp_path / "amapi.toml"
+    mock_scan.assert_not_called()
+
+
+def test_find_config_filepath_remembers_result(
+    reset_session, config_filename, config_file
+):
+    AmapiSession.CONFIG_FILENAME = config_filename
+    with mock.patch(
+        "amapi.session.AmapiSession._scan_for_config_file",
+        wraps=AmapiSession._scan_for_config_file,
+    ) as mock_scan:
+        first = AmapiSession.find_config_filepath()
+        second = AmapiSession.find_config_filepath()
+    assert first == second == config_file
+    mock_scan.assert_called_once()
+
+
+def test_find_config_filepath_remembers_missing_config_file(
+    reset_session, config_filename
+):
+    AmapiSession.CONFIG_FILENAME = config_filename
+    assert AmapiSession.find_config_filepath() is None
+    (Path.cwd() / config_filename).touch()
+    assert AmapiSession.find_config_filepath() is None
+    AmapiSession.clear_config_cache()
+    assert AmapiSession.find_config_filepath() == Path.cwd() / config_filename
+
+
+def test_find_config_filepath_scans_again_when_config_file_removed(
+    reset_session, temp_cwd, config_filename, config_file
+):
+    AmapiSession.CONFIG_FILENAME = config_filename
+    AmapiSession.find_config_filepath()
+    config_file.unlink()
+    assert AmapiSession.find_config_filepath() is None
+
+
+def test_read_config_file_remembers_parsed_file(
+    reset_session, config_file, refresh_token
+):
+    with mock.patch("amapi.session.toml.load", wraps=toml.load) as mock_load:
+        first = AmapiSession.read_config_file(config_file)
+        second = AmapiSession.read_config_file(config_file)
+    assert first is second
+    assert first[AmapiSessionUK.REFRESH_TOKEN_KEY] == refresh_token
+    mock_load.assert_called_once()
+
+
+def test_read_config_file_reloads_changed_file(reset_session, config_file):
+    AmapiSession.read_config_file(config_file)
+    with open(config_file, "w") as f:
+        toml.dump({AmapiSessionUK.REFRESH_TOKEN_KEY: "NEW_REFRESH_TOKEN"}, f)
+    config = AmapiSession.read_config_file(config_file)
+    assert config[AmapiSessionUK.REFRESH_TOKEN_KEY] == "NEW_REFRESH_TOKEN"
+
+
 def test_load_from_config_file_sets_credendials(
     reset_session, config_file, refresh_token, app_id, client_secret
 ):
@@ -198,3 +275,293 @@ def test_amapi_session_us(reset_session):
     assert AmapiSessionUS.APP_ID_KEY == "LWA_APP_ID_US"
     assert AmapiSessionUS.CLIENT_SECRET_KEY == "LWA_CLIENT_SECRET_US"
     assert AmapiSessionUS.marketplace == Marketplaces.US
+
+
+@pytest.mark.parametrize("name,marketplace", Marketplaces.__members__.items())
+def test_session_classes(name, marketplace):
+    session_class = session.SESSIONS[name]
+    assert getattr(session, f"AmapiSession{name}") is session_class
+    assert session_class.__name__ == f"AmapiSession{name}"
+    assert session_class.__module__ == "amapi.session"
+    assert session_class.REFRESH_TOKEN_KEY == f"REFRESH_TOKEN_{name}"
+    assert session_class.APP_ID_KEY == f"LWA_APP_ID_{name}"
+    assert session_class.CLIENT_SECRET_KEY == f"LWA_CLIENT_SECRET_{name}"
+    assert session_class.marketplace == marketplace
+
+
+def test_session_subclass_keeps_config_keys():
+    class CustomSession(AmapiSessionUK):
+        CONFIG_FILENAME = "custom.toml"
+
+    assert CustomSession.REFRESH_TOKEN_KEY == "REFRESH_TOKEN_UK"
+    assert CustomSession.REGION_KEYS == session.config_keys("EU")
+    assert session.SESSIONS["UK"] is AmapiSessionUK
+
+
+def test_region_name():
+    assert session.region_name(Marketplaces.DE) == "EU"
+    assert session.region_name(Marketplaces.CA) == "NA"
+    assert session.region_name(Marketplaces.JP) == "FE"
+
+
+def test_region_marketplaces():
+    assert session.region_marketplaces("NA") == [
+        Marketplaces.US,
+        Marketplaces.BR,
+        Marketplaces.CA,
+        Marketplaces.MX,
+    ]
+    assert session.region_marketplaces("us-west-2") == session.region_marketplaces("FE")
+
+
+@pytest.fixture
+def reset_de_session():
+    yield session.SESSIONS["DE"]
+    session.SESSIONS["DE"].set_login()
+
+
+def test_load_from_config_file_uses_region_credentials(reset_de_session):
+    path = Path.cwd() / "region.toml"
+    path.write_text(
+        toml.dumps(
+            {
+                "REFRESH_TOKEN_EU": "EU_TOKEN",
+                "LWA_APP_ID_EU": "EU_APP",
+                "LWA_CLIENT_SECRET_EU": "EU_SECRET",
+            }
+        )
+    )
+    reset_de_session.load_from_config_file(path)
+    assert reset_de_session.get_credentials() == {
+        "refresh_token": "EU_TOKEN",
+        "lwa_app_id": "EU_APP",
+        "lwa_client_secret": "EU_SECRET",
+    }
+
+
+def test_load_from_config_file_prefers_marketplace_credentials(
+    reset_de_session, config_file
+):
+    config = toml.load(config_file)
+    config.update(dict(zip(session.config_keys("DE"), "ABC", strict=True)))
+    config.update(dict(zip(session.config_keys("EU"), "XYZ", strict=True)))
+    config_file.write_text(toml.dumps(config))
+    reset_de_session.load_from_config_file(config_file)
+    assert (
+        reset_de_session.refresh_token,
+        reset_de_session.app_id,
+        reset_de_session.client_secret,
+    ) == ("A", "B", "C")
+
+
+def test_get_client_shared_within_region(reset_session):
+    mock_client_class = mock.Mock()
+    credentials = dict(refresh_token="A", app_id="APP_ID", client_secret="SECRET")
+    for session_class in (session.SESSIONS["DE"], session.SESSIONS["FR"]):
+        session_class.set_login(**credentials)
+    try:
+        de = session.SESSIONS["DE"].get_client(mock_client_class)
+        fr = session.SESSIONS["FR"].get_client(mock_client_class)
+        session.SESSIONS["JP"](**credentials).get_client(mock_client_class)
+    finally:
+        for session_class in (session.SESSIONS["DE"], session.SESSIONS["FR"]):
+            session_class.set_login()
+    assert de is fr
+    assert mock_client_class.call_count == 2
+
+
+@pytest.fixture
+def mock_client_class():
+    return mock.Mock()
+
+
+@pytest.fixture
+def logged_in_session(reset_session, refresh_token, app_id, client_secret):
+    AmapiSessionUK.set_login(
+        refresh_token=refresh_token, app_id=app_id, client_secret=client_secret
+    )
+    return AmapiSessionUK
+
+
+def test_get_client_creates_client(logged_in_session, mock_client_class):
+    client = logged_in_session.get_client(mock_client_class)
+    mock_client_class.assert_called_once_with(
+        credentials=logged_in_session.get_credentials(),
+        marketplace=Marketplaces.UK,
+    )
+    assert client == mock_client_class.return_value
+
+
+def test_get_client_reuses_client(logged_in_session, mock_client_class):
+    first = logged_in_session.get_client(mock_client_class)
+    second = logged_in_session.get_client(mock_client_class)
+    mock_client_class.assert_called_once()
+    assert first is second
+
+
+def test_get_client_caches_by_credentials(logged_in_session, mock_client_class):
+    logged_in_session.get_client(mock_client_class)
+    logged_in_session.set_login(
+        refresh_token="OTHER", app_id="APP_ID", client_secret="CLIENT_SECRET"
+    )
+    logged_in_session.get_client(mock_client_class)
+    assert mock_client_class.call_count == 2
+
+
+def test_get_client_caches_by_marketplace(logged_in_session, mock_client_class):
+    AmapiSessionUS.set_login(
+        refresh_token="REFRESH_TOKEN", app_id="APP_ID", client_secret="CLIENT_SECRET"
+    )
+    logged_in_session.get_client(mock_client_class)
+    AmapiSessionUS.get_client(mock_client_class)
+    assert mock_client_class.call_count == 2
+
+
+def test_clear_clients(logged_in_session, mock_client_class):
+    logged_in_session.get_client(mock_client_class)
+    AmapiSession.clear_clients()
+    mock_client_class.return_value.close.assert_called_once_with()
+    logged_in_session.get_client(mock_client_class)
+    assert mock_client_class.call_count == 2
+
+
+def test_session_with_own_credentials(reset_session, mock_client_class):
+    session = AmapiSession(
+        refresh_token="SELLER_TOKEN",
+        app_id="APP_ID",
+        client_secret="CLIENT_SECRET",
+        marketplace=Marketplaces.DE,
+    )
+    assert session.credentials_are_set() is True
+    assert AmapiSession.credentials_are_set() is False
+    assert session.get_credentials()["refresh_token"] == "SELLER_TOKEN"
+    with session as entered:
+        entered.get_client(mock_client_class)
+    mock_client_class.assert_called_once_with(
+        credentials=session.get_credentials(), marketplace=Marketplaces.DE
+    )
+
+
+@pytest.mark.parametrize(
+    "credentials",
+    (
+        {"refresh_token": "SELLER_B_TOKEN"},
+        {"refresh_token": "SELLER_B_TOKEN", "app_id": "APP_B"},
+        {"client_secret": "SECRET_B"},
+    ),
+)
+def test_session_with_some_credentials(logged_in_session, credentials):
+    with pytest.raises(exceptions.LoginCredentialsNotSetError):
+        AmapiSessionUK(**credentials)
+
+
+def test_session_without_credentials_uses_class_credentials(
+    logged_in_session, mock_client_class
+):
+    session = AmapiSessionUK()
+    assert session.get_credentials() == AmapiSessionUK.get_credentials()
+    session.get_client(mock_client_class)
+    AmapiSessionUK.get_client(mock_client_class)
+    mock_client_class.assert_called_once()
+
+
+def test_session_with_own_credentials_keeps_own_clients(
+    logged_in_session, mock_client_class
+):
+    credentials = dict(refresh_token="A", app_id="APP_ID", client_secret="SECRET")
+    first = AmapiSessionUK(**credentials)
+    second = AmapiSessionUK(**credentials)
+    first.get_client(mock_client_class)
+    second.get_client(mock_client_class)
+    assert mock_client_class.call_count == 2
+    first.clear_clients()
+    first.get_client(mock_client_class)
+    second.get_client(mock_client_class)
+    logged_in_session.get_client(mock_client_class)
+    assert mock_client_class.call_count == 4
+
+
+def test_get_client_uses_token_cache(logged_in_session, mock_client_class, tmp_path):
+    AmapiSession.set_token_cache(tmp_path / "tokens")
+    logged_in_session.get_client(mock_client_class)
+    token_client_class = mock_client_class.call_args.kwargs["auth_token_client_class"]
+    assert token_client_class.keywords["token_cache"] is AmapiSession.TOKEN_CACHE
+
+
+def test_set_token_cache_clears_clients(logged_in_session, mock_client_class, tmp_path):
+    logged_in_session.get_client(mock_client_class)
+    AmapiSession.set_token_cache(tmp_path / "tokens")
+    logged_in_session.get_client(mock_client_class)
+    assert mock_client_class.call_count == 2
+    AmapiSession.set_token_cache(None)
+    assert AmapiSession.TOKEN_CACHE is None
+
+
+def test_configure_client_sets_endpoints(logged_in_session):
+    client = mock.Mock()
+    with mock.patch.multiple(
+        logged_in_session,
+        ENDPOINT="http://127.0.0.1:8000",
+        LWA_ENDPOINT="http://127.0.0.1:8001/auth/o2/token",
+    ):
+        logged_in_session.configure_client(client)
+    assert client.endpoint == "http://127.0.0.1:8000"
+    assert client._auth.scheme == "http://"
+    assert client._auth.host == "127.0.0.1:8001"
+    assert client._auth.path == "/auth/o2/token"
+
+
+def test_configure_client_without_endpoints(logged_in_session):
+    client = mock.Mock(spec=["endpoint", "_auth"])
+    client.endpoint = "https://sellingpartnerapi-eu.amazon.com"
+    logged_in_session.configure_client(client)
+    assert client.endpoint == "https://sellingpartnerapi-eu.amazon.com"
+
+
+def test_get_client_caches_by_endpoint(logged_in_session, mock_client_class):
+    logged_in_session.get_client(mock_client_class)
+    with mock.patch.object(logged_in_session, "ENDPOINT", "http://127.0.0.1:8000"):
+        client = logged_in_session.get_client(mock_client_class)
+    assert mock_client_class.call_count == 2
+    assert client.endpoint == "http://127.0.0.1:8000"
+
+
+def test_get_async_client_creates_client_per_session(
+    logged_in_session, mock_client_class
+):
+    session = logged_in_session()
+    first = session.get_async_client(mock_client_class)
+    second = session.get_async_client(mock_client_class)
+    mock_client_class.assert_called_once_with(
+        credentials=logged_in_session.get_credentials(),
+        marketplace=Marketplaces.UK,
+    )
+    assert first is second
+    logged_in_session().get_async_client(mock_client_class)
+    assert mock_client_class.call_count == 2
+
+
+def test_get_async_client_uses_token_cache(
+    logged_in_session, mock_client_class, tmp_path
+):
+    AmapiSession.set_token_cache(tmp_path / "tokens")
+    logged_in_session().get_async_client(mock_client_class)
+    token_client_class = mock_client_class.call_args.kwargs["auth_token_client_class"]
+    assert token_client_class.func is CachedAsyncAccessTokenClient
+    assert token_client_class.keywords["token_cache"] is AmapiSession.TOKEN_CACHE
+
+
+def test_async_context_manager_closes_async_clients(
+    logged_in_session, mock_client_class
+):
+    mock_client_class.return_value.aclose = mock.AsyncMock()
+
+    async def use_session():
+        async with logged_in_session() as session:
+            session.get_async_client(mock_client_class)
+            assert isinstance(session, AmapiSession)
+        return session
+
+    session = asyncio.run(use_session())
+    mock_client_class.return_value.aclose.assert_awaited_once_with()
+    assert session._async_clients == {}
@@ -0,0 +1,189 @@
+import asyncio
+import json
+import subprocess
+import sys
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from amapi.tokens import (
+    CachedAccessTokenClient,
+    CachedAsyncAccessTokenClient,
+    TokenCache,
+)
+
+TOKEN = {
+    "access_token": "ACCESS_TOKEN",
+    "refresh_token": "REFRESH_TOKEN",
+    "expires_in": 3600,
+    "token_type": "bearer",
+}
+
+CREDENTIALS = SimpleNamespace(
+    refresh_token="REFRESH_TOKEN", lwa_app_id="APP_ID", lwa_client_secret="SECRET"
+)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TokenCache(tmp_path / "tokens")
+
+
+@pytest.fixture
+def key(cache):
+    return cache.key("APP_ID", "REFRESH_TOKEN")
+
+
+def test_creates_directory(tmp_path):
+    TokenCache(tmp_path / "a" / "b")
+    assert (tmp_path / "a" / "b").is_dir()
+
+
+def test_key_depends_on_app_id_and_refresh_token(cache):
+    key = cache.key("APP_ID", "REFRESH_TOKEN")
+    assert key == cache.key("APP_ID", "REFRESH_TOKEN")
+    assert key != cache.key("OTHER", "REFRESH_TOKEN")
+    assert key != cache.key("APP_ID", "OTHER")
+    assert "REFRESH_TOKEN" not in key
+
+
+def test_get_returns_None_when_not_cached(cache, key):
+    assert cache.get(key) is None
+
+
+def test_set_and_get(cache, key):
+    cache.set(key, TOKEN)
+    assert cache.get(key) == TOKEN
+
+
+def test_get_reads_token_set_by_another_process(cache, key, tmp_path):
+    TokenCache(tmp_path / "tokens").set(key, TOKEN)
+    assert cache.get(key) == TOKEN
+
+
+def test_set_writes_expiry_time(cache, key):
+    with mock.patch("amapi.tokens.time.time", return_value=1000.0):
+        cache.set(key, TOKEN)
+    entry = json.loads(cache.path(key).read_text())
+    assert entry == {"token": TOKEN, "expires_at": 4600.0}
+
+
+def test_get_returns_None_for_expiring_token(cache, key):
+    with mock.patch("amapi.tokens.time.time") as mock_time:
+        mock_time.return_value = 0.0
+        cache.set(key, TOKEN)
+        mock_time.return_value = 3600.0 - cache.EXPIRY_MARGIN
+        assert cache.get(key) is None
+
+
+def test_get_returns_None_for_invalid_file(cache, key):
+    cache.path(key).write_text("not json")
+    assert cache.get(key) is None
+
+
+def test_set_leaves_no_temporary_files(cache, key):
+    cache.set(key, TOKEN)
+    assert [path.name for path in cache.directory.iterdir()] == [f"{key}.json"]
+
+
+def test_get_or_fetch_fetches_missing_token(cache, key):
+    fetch = mock.Mock(return_value=TOKEN)
+    assert cache.get_or_fetch(key, fetch) == TOKEN
+    fetch.assert_called_once_with()
+    assert cache.get(key) == TOKEN
+
+
+def test_get_or_fetch_uses_cached_token(cache, key):
+    cache.set(key, TOKEN)
+    fetch = mock.Mock()
+    assert cache.get_or_fetch(key, fetch) == TOKEN
+    fetch.assert_not_called()
+
+
+def test_get_or_fetch_checks_cache_after_locking(cache, key):
+    fetch = mock.Mock()
+    with mock.patch.object(cache, "get", side_effect=[None, TOKEN]):
+        assert cache.get_or_fetch(key, fetch) == TOKEN
+    fetch.assert_not_called()
+
+
+def test_get_or_fetch_does_not_cache_failures(cache, key):
+    fetch = mock.Mock(side_effect=Exception())
+    with pytest.raises(Exception):
+        cache.get_or_fetch(key, fetch)
+    assert cache.get(key) is None
+
+
+@pytest.fixture
+def token_client(cache):
+    client = CachedAccessTokenClient(
+        credentials=CREDENTIALS,
+        token_cache=cache,
+    )
+    with mock.patch.object(client, "_request", return_value=TOKEN):
+        yield client
+
+
+def test_client_class(cache):
+    client = cache.client_class()(credentials=CREDENTIALS)
+    assert isinstance(client, CachedAccessTokenClient)
+    assert client.token_cache is cache
+
+
+def test_get_auth_requests_token(token_client):
+    auth = token_client.get_auth()
+    assert auth.access_token == "ACCESS_TOKEN"
+    token_client._request.assert_called_once_with(
+        "https://api.amazon.com/auth/o2/token",
+        token_client.data,
+        token_client.headers,
+    )
+
+
+def test_get_auth_stores_token(token_client, cache, key):
+    token_client.get_auth()
+    assert cache.get(key) == TOKEN
+
+
+def test_get_auth_uses_cached_token(token_client, cache, key):
+    cache.set(key, dict(TOKEN, access_token="CACHED"))
+    assert token_client.get_auth().access_token == "CACHED"
+    token_client._request.assert_not_called()
+
+
+def test_async_get_or_fetch_checks_cache_after_locking(cache, key):
+    fetch = mock.AsyncMock()
+    with mock.patch.object(cache, "get", side_effect=[None, TOKEN]):
+        assert asyncio.run(cache.async_get_or_fetch(key, fetch)) == TOKEN
+    fetch.assert_not_awaited()
+
+
+def test_async_get_or_fetch_stores_token(cache, key):
+    fetch = mock.AsyncMock(return_value=TOKEN)
+    assert asyncio.run(cache.async_get_or_fetch(key, fetch)) == TOKEN
+    assert asyncio.run(cache.async_get_or_fetch(key, fetch)) == TOKEN
+    fetch.assert_awaited_once()
+    assert cache.get(key) == TOKEN
+
+
+def test_async_client_class(cache):
+    client = cache.async_client_class()(credentials=CREDENTIALS)
+    assert isinstance(client, CachedAsyncAccessTokenClient)
+    assert client.token_cache is cache
+
+
+def test_async_get_auth_uses_cache(cache, key):
+    client = CachedAsyncAccessTokenClient(credentials=CREDENTIALS, token_cache=cache)
+    with mock.patch.object(client, "_request", return_value=TOKEN) as mock_request:
+        first = asyncio.run(client.get_auth())
+        second = asyncio.run(client.get_auth())
+    assert first.access_token == second.access_token == "ACCESS_TOKEN"
+    mock_request.assert_awaited_once_with(
+        "https://api.amazon.com/auth/o2/token", client.data, client.headers
+    )
+    assert cache.get(key) == TOKEN
+
+
+def test_import_in_new_interpreter():
+    subprocess.run([sys.executable, "-c", "import amapi.tokens"], check=True)
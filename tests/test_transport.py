@@ -0,0 +1,261 @@
+import asyncio
+import base64
+import gzip
+import io
+import json
+from unittest import mock
+
+import pytest
+from sp_api.base import (
+    ApiResponse,
+    SellingApiBadRequestException,
+    SellingApiRequestThrottledException,
+)
+
+from amapi import aio, exceptions, request, transport
+from benchmarks.fake_spapi import DOCUMENT, FakeSpApiServer
+from benchmarks.suite import fetch_report, session_class, unlimited_requests
+
+
+@pytest.fixture
+def mock_session():
+    session = mock.Mock()
+    session.marketplace.name = "UK"
+    session.marketplace.marketplace_id = "A1F83G8C2ARO7P"
+    return session
+
+
+@pytest.fixture
+def get_report(mock_session):
+    return request.GetReportRequest(mock_session)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return tmp_path / "recording.jsonl"
+
+
+def write_archive(path, *entries):
+    path.write_text("".join(json.dumps(entry) + "\n" for entry in entries))
+
+
+def call_entry(payload, report_id="1", duration=0.5, **kwargs):
+    return {
+        "type": transport.CALL,
+        "operation": "get_report",
+        "marketplace": "UK",
+        "args": {"reportId": report_id},
+        "duration": duration,
+        "payload": payload,
+        "headers": {"x-amzn-RateLimit-Limit": "2.0"},
+        **kwargs,
+    }
+
+
+def test_default_transport_sends_request(get_report):
+    get_report.send = mock.Mock()
+    value = transport.Transport().send(get_report, {"reportId": "1"})
+    get_report.send.assert_called_once_with({"reportId": "1"})
+    assert value == get_report.send.return_value
+
+
+def test_base_request_uses_transport(get_report):
+    mock_transport = mock.Mock()
+    mock_transport.send.return_value = ApiResponse(payload={"reportId": "1"})
+    with mock.patch.object(request.BaseRequest, "TRANSPORT", mock_transport):
+        value = get_report.make_request(report_id="1")
+    mock_transport.send.assert_called_once_with(
+        get_report, get_report.request_args(report_id="1")
+    )
+    assert value == {"reportId": "1"}
+
+
+@pytest.mark.parametrize("name", ("recording.jsonl", "recording.jsonl.gz"))
+def test_recording_transport_records_calls(tmp_path, get_report, name):
+    path = tmp_path / name
+    get_report.send = mock.Mock(
+        return_value=ApiResponse(payload={"reportId": "1"}, headers={"a": "b"})
+    )
+    with transport.RecordingTransport(path) as recorder:
+        value = recorder.send(get_report, {"reportId": "1"})
+    assert value == get_report.send.return_value
+    with transport.open_archive(path, "r") as f:
+        entry = json.loads(f.readline())
+    assert entry["type"] == transport.CALL
+    assert entry["operation"] == "get_report"
+    assert entry["marketplace"] == "UK"
+    assert entry["args"] == {"reportId": "1"}
+    assert entry["payload"] == {"reportId": "1"}
+    assert entry["headers"] == {"a": "b"}
+    if name.endswith(".gz"):
+        assert gzip.decompress(path.read_bytes())
+
+
+def test_recording_transport_records_errors(archive, get_report):
+    error = SellingApiRequestThrottledException([{"code": "QuotaExceeded"}], {})
+    get_report.send = mock.Mock(side_effect=error)
+    with transport.RecordingTransport(archive) as recorder:
+        with pytest.raises(SellingApiRequestThrottledException):
+            recorder.send(get_report, {"reportId": "1"})
+    entry = json.loads(archive.read_text())
+    assert entry["error"] == {"code": 429, "errors": [{"code": "QuotaExceeded"}]}
+
+
+def test_replay_transport_replays_calls_in_order(archive, get_report):
+    write_archive(
+        archive,
+        call_entry({"processingStatus": "IN_PROGRESS"}),
+        call_entry({"processingStatus": "DONE"}),
+    )
+    replay = transport.ReplayTransport(archive)
+    statuses = [
+        replay.send(get_report, {"reportId": "1"}).payload["processingStatus"]
+        for _ in range(3)
+    ]
+    assert statuses == ["IN_PROGRESS", "DONE", "DONE"]
+
+
+def test_replay_transport_prefers_matching_args(archive, get_report):
+    write_archive(
+        archive,
+        call_entry({"reportId": "1"}, report_id="1"),
+        call_entry({"reportId": "2"}, report_id="2"),
+    )
+    replay = transport.ReplayTransport(archive)
+    assert replay.send(get_report, {"reportId": "2"}).payload == {"reportId": "2"}
+    assert replay.send(get_report, {"reportId": "2"}).payload == {"reportId": "2"}
+    assert replay.send(get_report, {"reportId": "3"}).payload == {"reportId": "1"}
+
+
+def test_replay_transport_replays_headers(archive, get_report):
+    write_archive(archive, call_entry({"reportId": "1"}))
+    response = transport.ReplayTransport(archive).send(get_report, {"reportId": "1"})
+    assert response.headers == {"x-amzn-RateLimit-Limit": "2.0"}
+
+
+def test_replay_transport_raises_recorded_errors(archive, get_report):
+    entry = call_entry(None, error={"code": 400, "errors": [{"code": "Invalid"}]})
+    write_archive(archive, entry)
+    with pytest.raises(SellingApiBadRequestException) as error:
+        transport.ReplayTransport(archive).send(get_report, {"reportId": "1"})
+    assert error.value.error == [{"code": "Invalid"}]
+
+
+def test_replay_transport_raises_for_missing_call(archive, mock_session):
+    write_archive(archive, call_entry({"reportId": "1"}))
+    replay = transport.ReplayTransport(archive)
+    with pytest.raises(exceptions.RecordingNotFoundError):
+        replay.send(request.GetReportsRequest(mock_session), {})
+
+
+def test_replay_transport_does_not_delay_by_default(archive, get_report):
+    write_archive(archive, call_entry({"reportId": "1"}))
+    with mock.patch("amapi.transport.time.sleep") as mock_sleep:
+        transport.ReplayTransport(archive).send(get_report, {"reportId": "1"})
+    mock_sleep.assert_not_called()
+
+
+@pytest.mark.parametrize("delay,expected", ((None, 0.5), (0.1, 0.1)))
+def test_replay_transport_delay(archive, get_report, delay, expected):
+    write_archive(archive, call_entry({"reportId": "1"}, duration=0.5))
+    with mock.patch("amapi.transport.time.sleep") as mock_sleep:
+        transport.ReplayTransport(archive, delay=delay).send(
+            get_report, {"reportId": "1"}
+        )
+    mock_sleep.assert_called_once_with(expected)
+
+
+def test_replay_transport_async_send(archive, mock_session):
+    write_archive(archive, call_entry({"reportId": "1"}, duration=0.5))
+    replay = transport.ReplayTransport(archive, delay=None)
+    request = aio.AsyncGetReportRequest(mock_session)
+    with mock.patch.object(aio.AsyncBaseRequest, "TRANSPORT", replay):
+        with mock.patch("amapi.transport.asyncio.sleep") as mock_sleep:
+            value = asyncio.run(request.make_request(report_id="1"))
+    mock_sleep.assert_called_once_with(0.5)
+    assert value == {"reportId": "1"}
+    mock_session.get_async_client.assert_not_called()
+
+
+def test_documents_are_recorded_and_replayed(archive):
+    document = {"reportDocumentId": "DOC-1", "url": "https://example.com/1"}
+    chunks = [b"sku\tasin\n", b"ABC\tB000\n"]
+    with transport.RecordingTransport(archive) as recorder:
+        with mock.patch.object(request.BaseRequest, "TRANSPORT", recorder):
+            with mock.patch("amapi.request.fetch_document", return_value=chunks):
+                request.stream_document(document, io.BytesIO())
+    replay = transport.ReplayTransport(archive)
+    f = io.BytesIO()
+    with mock.patch.object(request.BaseRequest, "TRANSPORT", replay):
+        with mock.patch("amapi.request.requests.get") as mock_get:
+            written = request.stream_document(document, f)
+    mock_get.assert_not_called()
+    assert f.getvalue() == b"".join(chunks)
+    assert written == len(f.getvalue())
+
+
+def test_documents_are_recorded_in_chunks(archive):
+    document = {"reportDocumentId": "DOC-1", "url": "https://example.com/1"}
+    chunks = [b"sku\tasin\n", b"ABC\tB000\n"]
+    with transport.RecordingTransport(archive) as recorder:
+        recorded = recorder.iter_document(document, lambda: iter(chunks))
+        assert next(recorded) == chunks[0]
+        entries = [json.loads(line) for line in archive.read_text().splitlines()]
+        assert [entry["type"] for entry in entries] == [transport.DOCUMENT_CHUNK]
+        assert list(recorded) == chunks[1:]
+    entries = [json.loads(line) for line in archive.read_text().splitlines()]
+    assert [entry["type"] for entry in entries] == [
+        transport.DOCUMENT_CHUNK,
+        transport.DOCUMENT_CHUNK,
+        transport.DOCUMENT,
+    ]
+    assert entries[-1]["chunks"] == 2
+    assert "body" not in entries[-1]
+
+
+def test_replay_transport_ignores_incomplete_downloads(archive):
+    document = {"reportDocumentId": "DOC-1", "url": "https://example.com/1"}
+    with transport.RecordingTransport(archive) as recorder:
+        incomplete = recorder.iter_document(document, lambda: iter([b"a", b"b"]))
+        next(incomplete)
+        incomplete.close()
+        list(recorder.iter_document(document, lambda: iter([b"c", b"d"])))
+    replay = transport.ReplayTransport(archive)
+    assert list(replay.iter_document(document, iter)) == [b"c", b"d"]
+
+
+def test_replay_transport_replays_documents_recorded_whole(archive):
+    body = b"x" * (transport.CHUNK_SIZE + 1)
+    entry = {
+        "type": transport.DOCUMENT,
+        "key": "DOC-1",
+        "body": base64.b64encode(body).decode("ascii"),
+        "duration": 0.5,
+    }
+    write_archive(archive, entry)
+    replay = transport.ReplayTransport(archive)
+    chunks = list(replay.iter_document({"reportDocumentId": "DOC-1"}, iter))
+    assert [len(chunk) for chunk in chunks] == [transport.CHUNK_SIZE, 1]
+    assert b"".join(chunks) == body
+
+
+def test_replay_transport_raises_for_missing_document(archive):
+    write_archive(archive, call_entry({"reportId": "1"}))
+    replay = transport.ReplayTransport(archive)
+    with pytest.raises(exceptions.RecordingNotFoundError):
+        list(replay.iter_document({"url": "https://example.com/1"}, iter))
+
+
+def test_record_then_replay_report(archive):
+    with unlimited_requests():
+        with FakeSpApiServer(processing_polls=1) as server:
+            session = session_class(server, "UK")()
+            with transport.RecordingTransport(archive) as recorder:
+                with mock.patch.object(request.BaseRequest, "TRANSPORT", recorder):
+                    recorded = fetch_report(session)
+        requests = server.requests
+        replay = transport.ReplayTransport(archive)
+        with mock.patch.object(request.BaseRequest, "TRANSPORT", replay):
+            replayed = fetch_report(session)
+    assert recorded == replayed == len(DOCUMENT)
+    assert server.requests == requests